@@ -0,0 +1,27 @@
+"""add comments part_id index
+
+Revision ID: 3f1c7a9e5b20
+Revises: ab67cbad7118
+Create Date: 2026-10-17 09:12:04.318552
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c7a9e5b20"
+down_revision: str | Sequence[str] | None = "ab67cbad7118"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_comments_part_id"), "comments", ["part_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_comments_part_id"), table_name="comments")
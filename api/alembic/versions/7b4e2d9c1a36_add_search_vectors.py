@@ -0,0 +1,69 @@
+"""add search vectors
+
+Revision ID: 7b4e2d9c1a36
+Revises: 3f1c7a9e5b20
+Create Date: 2026-10-17 11:40:27.905113
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b4e2d9c1a36"
+down_revision: str | Sequence[str] | None = "3f1c7a9e5b20"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "parts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_parts_search_vector",
+        "parts",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.add_column(
+        "comments",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', coalesce(content, ''))", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_comments_search_vector",
+        "comments",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_comments_search_vector", table_name="comments", postgresql_using="gin"
+    )
+    op.drop_column("comments", "search_vector")
+    op.drop_index("ix_parts_search_vector", table_name="parts", postgresql_using="gin")
+    op.drop_column("parts", "search_vector")
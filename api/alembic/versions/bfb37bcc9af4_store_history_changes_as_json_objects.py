@@ -0,0 +1,32 @@
+"""store history changes as json objects
+
+Revision ID: bfb37bcc9af4
+Revises: e2b9c4d7f813
+Create Date: 2026-10-17 19:02:51.164208
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "bfb37bcc9af4"
+down_revision: str | Sequence[str] | None = "e2b9c4d7f813"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # records written before the changes were stored as JSON objects hold them
+    # as a JSON string, which is decoded in place
+    op.execute(
+        "UPDATE history SET changes = (changes::jsonb #>> '{}')::jsonb"
+        " WHERE jsonb_typeof(changes::jsonb) = 'string'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the objects are read by the earlier versions as well
@@ -0,0 +1,46 @@
+"""add parts name trigram indexes
+
+Revision ID: c5a8e1f4d2b7
+Revises: 7b4e2d9c1a36
+Create Date: 2026-10-17 13:05:12.481920
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a8e1f4d2b7"
+down_revision: str | Sequence[str] | None = "7b4e2d9c1a36"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.create_index(
+        "ix_parts_name_trgm",
+        "parts",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_parts_name_trgm_gist",
+        "parts",
+        ["name"],
+        unique=False,
+        postgresql_using="gist",
+        postgresql_ops={"name": "gist_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_parts_name_trgm_gist", table_name="parts", postgresql_using="gist"
+    )
+    op.drop_index("ix_parts_name_trgm", table_name="parts", postgresql_using="gin")
@@ -0,0 +1,48 @@
+"""add soft delete to parts and comments
+
+Revision ID: e2b9c4d7f813
+Revises: c5a8e1f4d2b7
+Create Date: 2026-10-17 16:41:27.905314
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b9c4d7f813"
+down_revision: str | Sequence[str] | None = "c5a8e1f4d2b7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("parts", "comments")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.add_column(table, sa.Column("deleted_by", sa.Uuid(), nullable=True))
+        op.create_foreign_key(
+            op.f(f"fk_{table}_deleted_by_users"),
+            table,
+            "users",
+            ["deleted_by"],
+            ["id"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_constraint(
+            op.f(f"fk_{table}_deleted_by_users"), table, type_="foreignkey"
+        )
+        op.drop_column(table, "deleted_by")
+        op.drop_column(table, "deleted_at")
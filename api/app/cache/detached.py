@@ -0,0 +1,43 @@
+from typing import Any
+
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import instance_state, set_committed_value
+
+
+def detached_copy[T](
+    entity: T, *, relationships: bool = False, copies: dict[int, Any] | None = None
+) -> T:
+    """
+    Copies the loaded columns of an entity into an instance that belongs to no
+    session, which can be kept across sessions and threads. `Session.merge(copy,
+    load=False)` puts it back into a session without a query.
+
+    With `relationships` the loaded relationships are copied as well, `copies`
+    holds the entities copied so far by their id().
+    """
+    copies = {} if copies is None else copies
+    if id(entity) in copies:
+        return copies[id(entity)]
+
+    state = instance_state(entity)
+    mapper = state.mapper
+    copy = mapper.class_manager.new_instance()
+    copies[id(entity)] = copy
+    for prop in mapper.column_attrs:
+        if prop.key in state.dict:
+            set_committed_value(copy, prop.key, state.dict[prop.key])
+    if relationships:
+        for prop in mapper.relationships:
+            if prop.key not in state.dict:
+                continue
+            value = state.dict[prop.key]
+            if value is not None and prop.uselist:
+                value = [
+                    detached_copy(item, relationships=True, copies=copies)
+                    for item in value
+                ]
+            elif value is not None:
+                value = detached_copy(value, relationships=True, copies=copies)
+            set_committed_value(copy, prop.key, value)
+    make_transient_to_detached(copy)
+    return copy
@@ -0,0 +1,118 @@
+from collections.abc import Callable, Iterable
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import (
+    Mapper,
+    ORMExecuteState,
+    Session,
+    class_mapper,
+    object_session,
+)
+
+from app.cache.detached import detached_copy
+from app.cache.invalidation import invalidate_on_commit, is_invalidated, register_cache
+from app.cache.ttl_cache import TTLCache
+from app.metrics import watch_cache
+from app.models.mixins.id_mixin import IdMixin
+from app.replicas import ON_REPLICA_KEY, READ_PRIMARY_KEY
+
+# Execution option of the UPDATE and DELETE statements whose caller invalidates
+# the changed entities by their ID, so the statement doesn't invalidate them all
+KEYED_INVALIDATION_OPTION = "entity_cache_keyed_invalidation"
+
+# the entity caches by the mapper of their model
+entity_caches: dict[Mapper[Any], EntityCache[Any]] = {}
+
+
+class EntityCache[ModelType: IdMixin]:
+    """
+    Caches detached copies of the entities of a model by their ID, per
+    process. The cached entities are invalidated when their changes commit:
+    the changes flushed by the ORM, the UPDATE and DELETE statements on the
+    model and, with cache_notify, the changes committed by the other workers.
+    The TTL bounds how long a worker can serve an entity whose invalidation
+    it missed.
+    """
+
+    def __init__(self, model: type[ModelType], max_size: int, ttl: float):
+        self.model = model
+        self.name: str = model.__tablename__  # type: ignore
+        self.store: TTLCache[str, ModelType] = TTLCache(max_size, ttl)
+        register_cache(self.name, self.invalidate)
+        watch_cache(self.name, self.store)
+        entity_caches[class_mapper(model)] = self
+        event.listen(model, "after_update", self.__invalidate_flushed__)
+        event.listen(model, "after_delete", self.__invalidate_flushed__)
+
+    def get_or_load(
+        self,
+        db_session: Session,
+        entity_id: str,
+        load: Callable[[], ModelType | None],
+    ) -> ModelType | None:
+        """
+        Returns the entity with the ID, merged from the cache into the session
+        without a query, or loads and caches it. Entities the session already
+        holds, or that its transaction changes, are always loaded, and so are
+        the entities read by the clients that must see their latest writes.
+        What a replica reads is not cached, it may be older than the primary.
+        """
+        if READ_PRIMARY_KEY in db_session.info:
+            return load()
+        try:
+            key = str(UUID(entity_id))
+        except ValueError:
+            return load()
+        identity = Session.identity_key(self.model, UUID(key))
+        if identity in db_session.identity_map or is_invalidated(
+            db_session, self.name, key
+        ):
+            return load()
+
+        entity = self.store.get(key)
+        if entity is not None:
+            return db_session.merge(entity, load=False)
+
+        generation = self.store.generation
+        entity = load()
+        # the load may have flushed changes of the entity
+        if (
+            entity is not None
+            and ON_REPLICA_KEY not in db_session.info
+            and not is_invalidated(db_session, self.name, key)
+        ):
+            self.store.set(key, detached_copy(entity), generation=generation)
+        return entity
+
+    def invalidate(self, key: str | None) -> None:
+        if key is None:
+            self.store.clear()
+        else:
+            self.store.invalidate(key)
+
+    def invalidate_on_commit(
+        self, db_session: Session, entity_ids: Iterable[UUID]
+    ) -> None:
+        for entity_id in entity_ids:
+            invalidate_on_commit(db_session, self.name, str(entity_id))
+
+    def __invalidate_flushed__(
+        self, mapper: Mapper[Any], connection: Any, entity: ModelType
+    ) -> None:
+        db_session = object_session(entity)
+        if db_session is not None:
+            self.invalidate_on_commit(db_session, [entity.id])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_updated_entities(orm_execute_state: ORMExecuteState) -> None:
+    # UPDATE and DELETE statements don't tell which entities they change
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    entity_cache = entity_caches.get(orm_execute_state.bind_mapper)  # type: ignore
+    if entity_cache is not None and not orm_execute_state.execution_options.get(
+        KEYED_INVALIDATION_OPTION
+    ):
+        invalidate_on_commit(orm_execute_state.session, entity_cache.name, None)
@@ -0,0 +1,157 @@
+import logging
+import threading
+from collections.abc import Callable
+from functools import cache
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.settings import env
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel the invalidations of the caches are published on, as
+# `<cache name>:<key>` with `*` for all the keys
+INVALIDATION_CHANNEL = "cache_invalidation"
+ALL_KEYS = "*"
+# Session.info key of the cache keys invalidated by the session's transaction
+INVALIDATIONS_KEY = "cache_invalidations"
+
+type Invalidate = Callable[[str | None], None]
+
+caches: dict[str, Invalidate] = {}
+
+
+def register_cache(name: str, invalidate: Invalidate) -> None:
+    """
+    Registers how to invalidate a key of the named cache, or all of them when
+    the key is None.
+    """
+    caches[name] = invalidate
+
+
+def invalidate(name: str, key: str | None) -> None:
+    """Invalidates the key of the named cache in this process."""
+    invalidate_cache = caches.get(name)
+    if invalidate_cache is not None:
+        invalidate_cache(key)
+
+
+def invalidate_on_commit(db_session: Session, name: str, key: str | None) -> None:
+    """
+    Invalidates the key of the named cache once the session's transaction
+    commits, in this process and (with cache_notify) in the other workers.
+    """
+    db_session.info.setdefault(INVALIDATIONS_KEY, set()).add((name, key))
+
+
+def is_invalidated(db_session: Session, name: str, key: str) -> bool:
+    """Tells if the session's transaction invalidates the key of the named cache."""
+    invalidations = db_session.info.get(INVALIDATIONS_KEY, ())
+    return (name, key) in invalidations or (name, None) in invalidations
+
+
+def parse_invalidation(payload: str) -> tuple[str, str | None]:
+    name, _, key = payload.partition(":")
+    return name, None if key == ALL_KEYS else key
+
+
+class InvalidationListener:
+    """
+    Listens to the invalidations published by the other workers in a
+    background thread, with its own connection. The caches are cleared
+    whenever the connection is (re)established, as invalidations published
+    while it was down are lost.
+    """
+
+    def __init__(self, conninfo: str, *, reconnect_interval: float = 1.0):
+        self.conninfo = conninfo
+        self.reconnect_interval = reconnect_interval
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(
+                    target=self.__run__, name="cache-invalidation", daemon=True
+                )
+                self._thread.start()
+
+    def close(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopped.set()
+            thread.join()
+
+    def __run__(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.__listen__()
+            except psycopg.Error:
+                logger.exception("Lost the cache invalidation channel.")
+                self._stopped.wait(self.reconnect_interval)
+
+    def __listen__(self) -> None:
+        with psycopg.connect(self.conninfo, autocommit=True) as connection:
+            connection.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+            for name in list(caches):
+                invalidate(name, None)
+            while not self._stopped.is_set():
+                # wakes up regularly to notice when the listener is closed
+                for notify in connection.notifies(timeout=self.reconnect_interval):
+                    invalidate(*parse_invalidation(notify.payload))
+
+
+@cache
+def get_invalidation_listener() -> InvalidationListener:
+    return InvalidationListener(
+        make_conninfo(
+            host=env.db_hostname,
+            port=env.db_port,
+            user=env.db_user,
+            password=env.db_password,
+            dbname=env.db_database,
+        )
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def publish_invalidations(db_session: Session) -> None:
+    # releasing a savepoint fires the commit events too, the invalidations wait
+    # for the transaction to commit
+    if db_session.in_nested_transaction():
+        return
+    # the invalidations of the pending changes are only known once flushed
+    db_session.flush()
+    invalidations = db_session.info.get(INVALIDATIONS_KEY)
+    if not env.cache_notify or not invalidations:
+        return
+    # notifications are only delivered if the transaction commits
+    for name, key in invalidations:
+        db_session.execute(
+            select(func.pg_notify(INVALIDATION_CHANNEL, f"{name}:{key or ALL_KEYS}"))
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def apply_invalidations(db_session: Session) -> None:
+    if db_session.in_nested_transaction():
+        return
+    for name, key in db_session.info.pop(INVALIDATIONS_KEY, ()):
+        invalidate(name, key)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_invalidations(
+    db_session: Session, previous_transaction: SessionTransaction
+) -> None:
+    # a savepoint rolling back leaves the other changes of the transaction to
+    # commit, and their invalidations to apply
+    if not previous_transaction.nested:
+        db_session.info.pop(INVALIDATIONS_KEY, None)
@@ -0,0 +1,247 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    ORMExecuteState,
+    Session,
+    SessionTransaction,
+    UOWTransaction,
+)
+from sqlalchemy.util.concurrency import in_greenlet
+
+from app.cache.detached import detached_copy
+from app.models.base_model import BaseModel
+from app.replicas import READ_PRIMARY_KEY
+from app.settings import env
+
+# Session.info key telling that the session's transaction has written
+WRITES_KEY = "single_flight_writes"
+
+
+def copy_result(value: Any) -> Any:
+    """Copies the entities of a read result, so other sessions can merge them."""
+    if isinstance(value, BaseModel):
+        return detached_copy(value, relationships=True)
+    if isinstance(value, list):
+        copies: dict[int, Any] = {}
+        return [
+            detached_copy(item, relationships=True, copies=copies)
+            if isinstance(item, BaseModel)
+            else item
+            for item in value
+        ]
+    return value
+
+
+def merge_result(db_session: Session, value: Any) -> Any:
+    """Puts the copied entities of a read result into the session."""
+    if isinstance(value, BaseModel):
+        return db_session.merge(value, load=False)
+    if isinstance(value, list):
+        return [
+            db_session.merge(item, load=False) if isinstance(item, BaseModel) else item
+            for item in value
+        ]
+    return value
+
+
+class Flight:
+    """A read in flight, whose result (or error) its followers wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        # the result is only copied when callers joined the read
+        self.followers = 0
+
+
+class AsyncFlight:
+    """The async variant of Flight, awaited in the event loop."""
+
+    def __init__(self):
+        self.future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesces the concurrent identical reads of a process: the first caller
+    of a key runs the read, the callers of the same key that come while it
+    is in flight wait for it and get copies of its entities merged into their
+    own session.
+
+    Sessions whose transaction has written, or whose client must read its
+    latest writes, read on their own, so they see their writes. The key includes the number of write transactions the
+    process has committed, so a read that started before one of them is not
+    joined after it. A caller that waited read_coalescing_timeout_s for the
+    read it joined runs its own, so a stalled read doesn't hold up the others.
+    """
+
+    def __init__(self):
+        # reads run, and reads answered by the read of another caller
+        self.calls = 0
+        self.coalesced = 0
+        self.epoch = 0
+        self._flights: dict[Hashable, Flight] = {}
+        self._async_flights: dict[Hashable, AsyncFlight] = {}
+        self._lock = threading.Lock()
+
+    def do[T](self, db_session: Session, key: Hashable, read: Callable[[], T]) -> T:
+        # the sync reads of the async sessions run in the event loop, where
+        # waiting for another read would block it, they are coalesced by
+        # do_async
+        if in_greenlet() or self.__bypassed__(db_session):
+            return read()
+
+        key = (self.epoch, key)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = Flight()
+                self.calls += 1
+            else:
+                flight.followers += 1
+                self.coalesced += 1
+
+        if not leader:
+            if not flight.done.wait(env.read_coalescing_timeout_s):
+                return read()
+            if flight.error is not None:
+                raise flight.error
+            return merge_result(db_session, flight.result)
+
+        try:
+            value = read()
+        except BaseException as e:
+            flight.error = e
+            self.__land__(key, flight)
+            flight.done.set()
+            raise
+        try:
+            # nobody joins the read once it landed, so the result is only
+            # copied for the callers that joined it
+            if self.__land__(key, flight):
+                flight.result = copy_result(value)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            flight.done.set()
+        return value
+
+    async def do_async[T](
+        self,
+        db_session: AsyncSession,
+        key: Hashable,
+        read: Callable[[], Awaitable[T]],
+    ) -> T:
+        if self.__bypassed__(db_session.sync_session):
+            return await read()
+
+        key = (self.epoch, key)
+        flight = self._async_flights.get(key)
+        if flight is not None:
+            flight.followers += 1
+            self.__count__(coalesced=True)
+            try:
+                result = await asyncio.wait_for(
+                    asyncio.shield(flight.future), env.read_coalescing_timeout_s
+                )
+            except TimeoutError:
+                return await read()
+            except asyncio.CancelledError:
+                # the leader was cancelled, not this caller
+                if not flight.future.cancelled():
+                    raise
+                return await read()
+            return merge_result(db_session.sync_session, result)
+
+        flight = self._async_flights[key] = AsyncFlight()
+        future = flight.future
+        self.__count__(coalesced=False)
+        try:
+            value = await read()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # marks the error as retrieved when nobody waits for it
+            future.exception()
+            raise
+        else:
+            # the followers join in the event loop, so the ones counted now
+            # are all the callers the result is copied for
+            future.set_result(copy_result(value) if flight.followers else None)
+            return value
+        finally:
+            del self._async_flights[key]
+
+    def __land__(self, key: Hashable, flight: Flight) -> bool:
+        """Ends the read of the flight, and tells if callers joined it."""
+        with self._lock:
+            del self._flights[key]
+            return flight.followers > 0
+
+    def __count__(self, *, coalesced: bool) -> None:
+        with self._lock:
+            if coalesced:
+                self.coalesced += 1
+            else:
+                self.calls += 1
+
+    @staticmethod
+    def __bypassed__(db_session: Session) -> bool:
+        return (
+            not env.read_coalescing
+            or WRITES_KEY in db_session.info
+            or READ_PRIMARY_KEY in db_session.info
+            or bool(db_session.new or db_session.dirty or db_session.deleted)
+        )
+
+    def __committed__(self, db_session: Session) -> None:
+        if db_session.info.pop(WRITES_KEY, False):
+            with self._lock:
+                self.epoch += 1
+
+
+# the reads of the CRUD classes
+read_flights = SingleFlight()
+
+
+@event.listens_for(Session, "after_flush")
+def remember_flushed_writes(db_session: Session, flush_context: UOWTransaction) -> None:
+    db_session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def remember_executed_writes(orm_execute_state: ORMExecuteState) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def start_write_epoch(db_session: Session) -> None:
+    # releasing a savepoint fires the commit events too, the writes of the
+    # transaction are not committed yet
+    if not db_session.in_nested_transaction():
+        read_flights.__committed__(db_session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def forget_writes(
+    db_session: Session, previous_transaction: SessionTransaction
+) -> None:
+    # a savepoint rolling back leaves the other writes of the transaction
+    if not previous_transaction.nested:
+        db_session.info.pop(WRITES_KEY, None)
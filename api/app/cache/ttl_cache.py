@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+class TTLCache[K, V]:
+    """
+    A thread safe LRU cache whose entries expire `ttl` seconds after they were
+    set. A cache of size 0 keeps nothing.
+
+    Every invalidation starts a new generation: a value loaded before an
+    invalidation is not stored when it is set with the generation its load
+    started in, so a slow load can't put back what was just invalidated.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: K, value: V, *, generation: int | None = None) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: K, load: Callable[[], V]) -> V:
+        value = self.get(key)
+        if value is None:
+            generation = self._generation
+            value = load()
+            self.set(key, value, generation=generation)
+        return value
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[V], bool]) -> None:
+        """Invalidates the entries whose value matches the predicate."""
+        with self._lock:
+            self._generation += 1
+            for key in [
+                key for key, (_, value) in self._entries.items() if predicate(value)
+            ]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,62 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Mapper, ORMExecuteState, Session, object_session
+
+from app.cache.detached import detached_copy
+from app.cache.invalidation import invalidate_on_commit, register_cache
+from app.cache.ttl_cache import TTLCache
+from app.metrics import watch_cache
+from app.models.user_model import UserModel
+from app.settings import env
+
+USER_CACHE = "users"
+
+# the users identifying the callers, by their principal
+user_cache: TTLCache[str, UserModel] = TTLCache(
+    env.user_cache_size, env.user_cache_ttl_s
+)
+
+
+def invalidate_users(user_id: str | None) -> None:
+    if user_id is None:
+        user_cache.clear()
+    else:
+        user_cache.invalidate_where(lambda user: str(user.id) == user_id)
+
+
+register_cache(USER_CACHE, invalidate_users)
+watch_cache(USER_CACHE, user_cache)
+
+
+def get_cached_user(db_session: Session, principal: str) -> UserModel | None:
+    """
+    Returns the cached user of the principal, put into the session without
+    a query, or None if it is not cached.
+    """
+    user = user_cache.get(principal)
+    return None if user is None else db_session.merge(user, load=False)
+
+
+def cache_user(principal: str, user: UserModel, generation: int) -> None:
+    """
+    Caches the user of the principal, loaded in the given generation of the
+    cache.
+    """
+    user_cache.set(principal, detached_copy(user), generation=generation)
+
+
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def invalidate_flushed_user(mapper: Mapper, connection, user: UserModel) -> None:
+    db_session = object_session(user)
+    if db_session is not None:
+        invalidate_on_commit(db_session, USER_CACHE, str(user.id))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_updated_users(orm_execute_state: ORMExecuteState) -> None:
+    # UPDATE and DELETE statements (like the RETURNING writes of the CRUD
+    # classes) don't tell which users they change
+    if (
+        orm_execute_state.is_update or orm_execute_state.is_delete
+    ) and orm_execute_state.bind_mapper is inspect(UserModel):
+        invalidate_on_commit(orm_execute_state.session, USER_CACHE, None)
@@ -0,0 +1,252 @@
+from collections.abc import Collection, Sequence
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel as PydanticBaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.single_flight import read_flights
+from app.crud.base_crud import BaseCRUD
+from app.models.base_model import BaseModel
+from app.models.user_model import UserModel
+from app.schemas.base_schemas import (
+    BulkCreateResponseSchema,
+    PaginatedResponseSchema,
+    TotalStrategy,
+)
+
+
+class AsyncBaseCRUD[
+    ModelType: BaseModel,
+    CreateSchemaType: PydanticBaseModel,
+    UpdateSchemaType: PydanticBaseModel | None,
+]:
+    """
+    The BaseCRUD operations for an AsyncSession.
+
+    Each operation runs the sync CRUD inside AsyncSession.run_sync: the ORM code
+    is the same, but every round trip is awaited on the async driver instead of
+    blocking a worker thread. Filters, sorting, pagination and history therefore
+    behave exactly like on the sync path. The concurrent identical reads of the
+    event loop share one query.
+    """
+
+    @classmethod
+    def get_sync_crud(
+        cls,
+    ) -> type[BaseCRUD[ModelType, Any, CreateSchemaType, UpdateSchemaType]]:
+        raise NotImplementedError
+
+    @classmethod
+    async def get_all(cls, db_session: AsyncSession) -> list[ModelType]:
+        return await db_session.run_sync(cls.get_sync_crud().get_all)
+
+    @classmethod
+    async def get_all_by(
+        cls, db_session: AsyncSession, key: str, value: str | list[str]
+    ) -> list[ModelType]:
+        crud = cls.get_sync_crud()
+        return await read_flights.do_async(
+            db_session,
+            crud.__get_read_key__("get_all_by", key, value),
+            lambda: db_session.run_sync(crud.get_all_by, key=key, value=value),
+        )
+
+    @classmethod
+    async def get_one_or_null_by(
+        cls, db_session: AsyncSession, key: str, value: str
+    ) -> ModelType | None:
+        crud = cls.get_sync_crud()
+        return await read_flights.do_async(
+            db_session,
+            crud.__get_read_key__("get_one_or_null_by", key, value),
+            lambda: db_session.run_sync(crud.get_one_or_null_by, key=key, value=value),
+        )
+
+    @classmethod
+    async def get_one_by(
+        cls,
+        db_session: AsyncSession,
+        key: str,
+        value: str,
+        *,
+        fields: Collection[str] | None = None,
+    ) -> ModelType:
+        crud = cls.get_sync_crud()
+        return await read_flights.do_async(
+            db_session,
+            crud.__get_read_key__("get_one_by", key, value, fields),
+            lambda: db_session.run_sync(
+                crud.get_one_by, key=key, value=value, fields=fields
+            ),
+        )
+
+    @classmethod
+    async def get_paginated_list(
+        cls,
+        db_session: AsyncSession,
+        offset: int | None,
+        limit: int | None,
+        filters: dict[str, str | list[str]] | None = None,
+        sorting: dict[str, str] | None = None,
+        global_filter: str | None = None,
+        *,
+        after: str | None = None,
+        before: str | None = None,
+        total_strategy: TotalStrategy = TotalStrategy.EXACT,
+        search: str | None = None,
+        fields: Collection[str] | None = None,
+    ) -> PaginatedResponseSchema[ModelType]:
+        return await db_session.run_sync(
+            cls.get_sync_crud().get_paginated_list,
+            offset=offset,
+            limit=limit,
+            filters=filters,
+            sorting=sorting,
+            global_filter=global_filter,
+            after=after,
+            before=before,
+            total_strategy=total_strategy,
+            search=search,
+            fields=fields,
+        )
+
+    @classmethod
+    async def create(
+        cls,
+        db_session: AsyncSession,
+        input: CreateSchemaType,
+        current_user: UserModel,
+        *,
+        commit: bool = True,
+    ) -> ModelType:
+        return await db_session.run_sync(
+            cls.get_sync_crud().create,
+            input=input,
+            current_user=current_user,
+            commit=commit,
+        )
+
+    @classmethod
+    async def bulk_create(
+        cls,
+        db_session: AsyncSession,
+        inputs: Sequence[CreateSchemaType],
+        current_user: UserModel,
+        *,
+        chunk_size: int = 1000,
+        commit: bool = True,
+    ) -> BulkCreateResponseSchema[ModelType]:
+        return await db_session.run_sync(
+            cls.get_sync_crud().bulk_create,
+            inputs=inputs,
+            current_user=current_user,
+            chunk_size=chunk_size,
+            commit=commit,
+        )
+
+    @classmethod
+    async def upsert(
+        cls,
+        db_session: AsyncSession,
+        input: CreateSchemaType,
+        current_user: UserModel,
+        *,
+        commit: bool = True,
+    ) -> ModelType:
+        return await db_session.run_sync(
+            cls.get_sync_crud().upsert,
+            input=input,
+            current_user=current_user,
+            commit=commit,
+        )
+
+    @classmethod
+    async def bulk_upsert(
+        cls,
+        db_session: AsyncSession,
+        inputs: Sequence[CreateSchemaType],
+        current_user: UserModel,
+        *,
+        chunk_size: int = 1000,
+        commit: bool = True,
+    ) -> list[ModelType]:
+        return await db_session.run_sync(
+            cls.get_sync_crud().bulk_upsert,
+            inputs=inputs,
+            current_user=current_user,
+            chunk_size=chunk_size,
+            commit=commit,
+        )
+
+    @classmethod
+    async def update(
+        cls,
+        db_session: AsyncSession,
+        entity_id: UUID,
+        input: UpdateSchemaType,
+        current_user: UserModel,
+        *,
+        commit: bool = True,
+    ) -> ModelType:
+        return await db_session.run_sync(
+            cls.get_sync_crud().update,
+            entity_id=entity_id,
+            input=input,
+            current_user=current_user,
+            commit=commit,
+        )
+
+    @classmethod
+    async def soft_delete(
+        cls,
+        db_session: AsyncSession,
+        entity_id: UUID,
+        current_user: UserModel,
+        *,
+        commit: bool = True,
+    ) -> None:
+        await db_session.run_sync(
+            cls.get_sync_crud().soft_delete,
+            entity_id=entity_id,
+            current_user=current_user,
+            commit=commit,
+        )
+
+    @classmethod
+    async def bulk_update(
+        cls,
+        db_session: AsyncSession,
+        input: UpdateSchemaType,
+        current_user: UserModel,
+        *,
+        entity_ids: Collection[UUID] | None = None,
+        filters: dict[str, str | list[str]] | None = None,
+        commit: bool = True,
+    ) -> int:
+        return await db_session.run_sync(
+            cls.get_sync_crud().bulk_update,
+            input=input,
+            current_user=current_user,
+            entity_ids=entity_ids,
+            filters=filters,
+            commit=commit,
+        )
+
+    @classmethod
+    async def bulk_soft_delete(
+        cls,
+        db_session: AsyncSession,
+        current_user: UserModel,
+        *,
+        entity_ids: Collection[UUID] | None = None,
+        filters: dict[str, str | list[str]] | None = None,
+        commit: bool = True,
+    ) -> int:
+        return await db_session.run_sync(
+            cls.get_sync_crud().bulk_soft_delete,
+            current_user=current_user,
+            entity_ids=entity_ids,
+            filters=filters,
+            commit=commit,
+        )
@@ -1,37 +1,102 @@
+from collections.abc import Collection, Iterable, Iterator, Mapping, Sequence
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Any, TypeVar
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException
+from psycopg import Error as DatabaseError
 from psycopg.errors import UniqueViolation
 from pydantic import BaseModel as PydanticBaseModel
-from sqlalchemy import String, and_, cast, func, inspect, or_
+from sqlalchemy import (
+    Boolean,
+    Column,
+    String,
+    Uuid,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    func,
+    inspect,
+    literal_column,
+    null,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG, insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Query, Session
+from sqlalchemy.orm import (
+    ColumnProperty,
+    InstrumentedAttribute,
+    Query,
+    RelationshipProperty,
+    Session,
+    lazyload,
+    load_only,
+    selectinload,
+)
+from sqlalchemy.orm.interfaces import ORMOption
 from sqlalchemy.sql.elements import ColumnElement
-
-from app.crud.history_crud import HistoryCrud
+from sqlalchemy.sql.selectable import Subquery
+
+from app.cache.entity_cache import KEYED_INVALIDATION_OPTION, EntityCache
+from app.cache.single_flight import read_flights
+from app.crud.filter_operators import (
+    FilterOperator,
+    ValueShape,
+    build_condition,
+    build_prefix_tsquery,
+    default_operator,
+    get_value_shape,
+    split_filter_key,
+)
+from app.crud.history_capture import (
+    get_row_changes,
+    record_changes,
+    record_created,
+    record_row_changes,
+    record_upserted,
+)
+from app.crud.query_plans import (
+    CursorKey,
+    FilterPlan,
+    FilterPlanItem,
+    QueryType,
+    SortPlan,
+    apply_joins,
+)
 from app.errors import NotFoundError, NotUniqueError
+from app.metrics import crud_method
 from app.models.base_model import BaseModel
 from app.models.mixins.blameable_mixin import BlameableMixin
 from app.models.mixins.created_by_mixin import CreatedByMixin
-from app.models.mixins.id_mixin import IdMixin
+from app.models.mixins.history_mixin import HistoryMixin
+from app.models.mixins.searchable_mixin import SEARCH_CONFIG, SearchableMixin
 from app.models.mixins.soft_deletable_mixin import SoftDeletableMixin
 from app.models.user_model import UserModel
-from app.schemas.base_schemas import PaginatedResponseSchema
-from app.schemas.history_schemas import (
-    HistoryAction,
-    HistoryCreateSchema,
-    ValueChangeSchema,
+from app.schemas.base_schemas import (
+    BulkCreateResponseSchema,
+    BulkItemErrorSchema,
+    PaginatedResponseSchema,
+    TotalStrategy,
 )
+from app.schemas.history_schemas import HistoryAction
+from app.utils.cursor_utils import decode_cursor, encode_cursor
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 SchemaType = TypeVar("SchemaType", bound=PydanticBaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=PydanticBaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=PydanticBaseModel | None)
 
+# Number of filter/sort plans kept per plan type
+PLAN_CACHE_SIZE = 512
+
 
-class BaseCRUD[
+class BaseCRUD[  # noqa: PLR0904
     ModelType: BaseModel,
     SchemaType: PydanticBaseModel,
     CreateSchemaType: PydanticBaseModel,
@@ -39,21 +104,109 @@ class BaseCRUD[
 ]:
     # model fields that should be used during global search
     searchable_fields: list[str] = []
-    # List of related fields to refresh after create/update operations
+    # text fields that are filtered with the liberal ILIKE search instead of
+    # an exact match, when the filter does not name an operator
+    fuzzy_filter_fields: list[str] = []
+    # List of related fields to load after create/update operations
     related_to_refresh: list[str] = []
+    # columns of the unique constraint that identifies the entities to update
+    # when upserting, the model can't be upserted without them
+    upsert_keys: list[str] = []
+    # caches the entities get_one_by reads by ID, they are always queried
+    # without it
+    entity_cache: EntityCache[Any] | None = None
 
     @classmethod
     def get_model(cls) -> type[ModelType]:
         raise NotImplementedError
 
+    @classmethod
+    def __resolve_attribute__(
+        cls, key: str
+    ) -> tuple[InstrumentedAttribute[Any], type[BaseModel] | None]:
+        """
+        Resolves a model attribute, or a `relationship.attribute` path of
+        a related model, to the mapped attribute and the model to join for it.
+        """
+        model = cls.get_model()
+        if "." not in key:
+            if not hasattr(model, key):
+                raise AttributeError(f"Model {model.__name__} has no attribute {key}")
+            return getattr(model, key), None
+
+        # Handling parent property filtering
+        relationship, sub_property = key.split(".", 1)
+        if not hasattr(model, relationship):
+            raise AttributeError(
+                f"Model {model.__name__} has no relationship {relationship}"
+            )
+
+        related_model = getattr(model, relationship).property.mapper.class_
+        if not hasattr(related_model, sub_property):
+            raise AttributeError(
+                f"Related model {related_model.__name__} has no attribute {sub_property}"
+            )
+        return getattr(related_model, sub_property), related_model
+
+    # Plans are cached per CRUD class (the class is part of the cache key) and
+    # per filter/sort shape. Invalid shapes raise, so they are never cached.
+    @classmethod
+    @lru_cache(maxsize=PLAN_CACHE_SIZE)
+    def __get_filter_plan__(
+        cls, shape: tuple[tuple[str, ValueShape], ...]
+    ) -> FilterPlan:
+        joins: list[type[BaseModel]] = []
+        items: list[FilterPlanItem | None] = []
+        for filter_key, value_shape in shape:
+            # skip empty filter values
+            if value_shape == ValueShape.EMPTY:
+                items.append(None)
+                continue
+
+            key, operator = split_filter_key(filter_key)
+            column, related_model = cls.__resolve_attribute__(key)
+            if related_model is not None and related_model not in joins:
+                joins.append(related_model)
+
+            if operator is None:
+                operator = default_operator(
+                    column, value_shape, fuzzy=key in cls.fuzzy_filter_fields
+                )
+            items.append(FilterPlanItem(column, operator))
+
+        return FilterPlan(tuple(joins), tuple(items))
+
+    @classmethod
+    def __get_filter_plan_of__(cls, filters: dict[str, str | list[str]]) -> FilterPlan:
+        return cls.__get_filter_plan__(
+            tuple((key, get_value_shape(value)) for key, value in filters.items())
+        )
+
+    @staticmethod
+    def __get_filter_conditions__(
+        plan: FilterPlan, filters: dict[str, str | list[str]]
+    ) -> list[ColumnElement[bool]]:
+        """
+        The conditions of the filters, without those of the values that do
+        not filter anything (like an empty string).
+        """
+        conditions: list[ColumnElement[bool]] = []
+        for item, value in zip(plan.items, filters.values(), strict=True):
+            if item is None:
+                continue
+            condition = build_condition(item.column, item.operator, value)
+            if condition is not None:
+                conditions.append(condition)
+        return conditions
+
     @classmethod
     def __apply_filters__(
         cls,
-        query: Query[ModelType],
+        query: QueryType,
         filters: dict[str, str | list[str]] | None,
         *,
         and_operator: bool = True,  # if false, then we or the conditions together (used for global search)
-    ) -> Query[ModelType]:
+    ) -> QueryType:
         # Always filter out soft-deleted entities
         model = cls.get_model()
         if issubclass(model, SoftDeletableMixin):
@@ -62,74 +215,9 @@ class BaseCRUD[
         if not filters:
             return query
 
-        # Collect all the filters to apply an OR condition at the end
-        conditions: list[ColumnElement[bool]] = []
-
-        for key, value in filters.items():
-            if "." in key:
-                # Handling parent property filtering
-                relationship, sub_property = key.split(".", 1)
-                if not hasattr(model, relationship):
-                    raise AttributeError(
-                        f"Model {model.__name__} has no relationship {relationship}"
-                    )
-
-                related_model = getattr(model, relationship).property.mapper.class_
-                if not hasattr(related_model, sub_property):
-                    raise AttributeError(
-                        f"Related model {related_model.__name__} has no attribute {sub_property}"
-                    )
-
-                if not any(
-                    table[0].fullname == related_model.__tablename__  # type: ignore
-                    for table in query._setup_joins
-                ):
-                    query = query.join(related_model)
-                model_value = getattr(related_model, sub_property)
-            else:
-                if not hasattr(model, key):
-                    raise AttributeError(
-                        f"Model {model.__name__} has no attribute {key}"
-                    )
-                model_value = getattr(model, key)
-
-            # if filter value is string containing , split it into list, trim all values
-            # and replace spaces with % to allow for more liberal search
-            if isinstance(value, str) and "," in value:
-                values = [v.strip().replace(" ", "%") for v in value.split(",")]
-                conditions.append(
-                    or_(*[cast(model_value, String).ilike(f"%{v}%") for v in values])
-                )
-            elif isinstance(value, list):
-                # When receiving a list of values, we want to filter for case-insensitive
-                # matches, because we assume the user used a multi-select filter in the
-                # frontend.
-                # the only thing we do is additionally search for the value with
-                # underscores instead of spaces.
-                conditions.append(
-                    or_(
-                        *[
-                            or_(model_value.is_(None))
-                            if v == "NULL"
-                            else or_(
-                                cast(model_value, String).ilike(f"{str(v)}"),
-                                cast(model_value, String).ilike(
-                                    f"{str(v).replace(' ', '_')}"
-                                ),
-                            )
-                            for v in value
-                        ]
-                    )
-                )
-            elif value == "NULL":
-                conditions.append(model_value.is_(None))
-            elif not value:
-                continue
-            else:
-                formatted_value = str(value).replace(" ", "%")
-                conditions.append(
-                    cast(model_value, String).ilike(f"%{formatted_value}%")
-                )
+        plan = cls.__get_filter_plan_of__(filters)
+        query = apply_joins(query, plan.joins)
+        conditions = cls.__get_filter_conditions__(plan, filters)
 
         # Apply all the conditions as either AND or OR
         if conditions and and_operator:
@@ -139,62 +227,194 @@ class BaseCRUD[
 
         return query
 
+    @classmethod
+    def __get_default_sorting__(cls) -> tuple[tuple[str, str], ...]:
+        model = cls.get_model()
+        if hasattr(model, "created_at"):
+            return (("created_at", "desc"),)
+        if hasattr(model, "title"):
+            return (("title", "asc"),)
+        if hasattr(model, "name"):
+            return (("name", "asc"),)
+        return ()
+
+    @classmethod
+    @lru_cache(maxsize=PLAN_CACHE_SIZE)
+    def __get_sort_plan__(cls, shape: tuple[tuple[str, str], ...]) -> SortPlan:
+        joins: list[type[BaseModel]] = []
+        order_by: list[ColumnElement[Any]] = []
+        for key, value in shape or cls.__get_default_sorting__():
+            column, related_model = cls.__resolve_attribute__(key)
+            if related_model is not None and related_model not in joins:
+                joins.append(related_model)
+
+            if value.lower() == "asc":
+                order_by.append(column.asc())
+            elif value.lower() == "desc":
+                order_by.append(column.desc())
+            # order by shortest value (character length)
+            elif value.lower() == "shortest":
+                order_by.append(func.length(cast(column, String)).asc())
+            else:
+                raise ValueError(
+                    f"Invalid sorting value '{value}'. Use 'asc' or 'desc'."
+                )
+
+        return SortPlan(tuple(joins), tuple(order_by))
+
     @classmethod
     def __apply_sorting__(
-        cls, query: Query[ModelType], sorting: dict[str, str] | None
-    ) -> Query[ModelType]:
+        cls, query: QueryType, sorting: dict[str, str] | None
+    ) -> QueryType:
+        plan = cls.__get_sort_plan__(tuple(sorting.items()) if sorting else ())
+        query = apply_joins(query, plan.joins)
+        return query.order_by(*plan.order_by)
+
+    @classmethod
+    @lru_cache(maxsize=PLAN_CACHE_SIZE)
+    def __get_load_options__(cls, fields: frozenset[str]) -> tuple[ORMOption, ...]:
+        """
+        Turns a sparse fieldset into loader options: only the columns of the
+        fields (and the ID) are loaded, relationships only when they are part
+        of the fields.
+
+        Raises a ValueError for fields the model does not have.
+        """
         model = cls.get_model()
-        if sorting:
-            for key, value in sorting.items():
-                model_class: type[BaseModel] = model
-                model_property = key
-
-                if "." in key:
-                    # Handling parent property filtering
-                    relationship, sub_property = key.split(".", 1)
-                    if not hasattr(model, relationship):
-                        raise AttributeError(
-                            f"Model {model.__name__} has no relationship {relationship}"
-                        )
-
-                    model_class = getattr(model, relationship).property.mapper.class_
-                    if not hasattr(model_class, sub_property):
-                        raise AttributeError(
-                            f"Related model {model_class.__name__} has no attribute {sub_property}"
-                        )
-                    model_property = sub_property
-
-                    if not any(
-                        table[0].fullname == model_class.__tablename__  # type: ignore
-                        for table in query._setup_joins
-                    ):
-                        query = query.join(model_class)
-                elif not hasattr(model, key):
-                    raise AttributeError(f"Model {model} has no attribute {key}")
-
-                if value.lower() == "asc":
-                    query = query.order_by(getattr(model_class, model_property).asc())
-                elif value.lower() == "desc":
-                    query = query.order_by(getattr(model_class, model_property).desc())
-                # order by shortest value (character length)
-                elif value.lower() == "shortest":
-                    query = query.order_by(
-                        func.length(
-                            cast(getattr(model_class, model_property or key), String)
-                        ).asc()
-                    )
-                else:
-                    raise ValueError(
-                        f"Invalid sorting value '{value}'. Use 'asc' or 'desc'."
-                    )
-        elif hasattr(model, "created_at"):
-            query = query.order_by(model.created_at.desc())  # type: ignore
-        elif hasattr(model, "title"):
-            query = query.order_by(model.title.asc())  # type: ignore
-        elif hasattr(model, "id"):
-            query = query.order_by(model.name.asc())  # type: ignore
+        mapper = inspect(model)
+        columns: list[InstrumentedAttribute[Any]] = [model.id]  # type: ignore
+        relationships: list[InstrumentedAttribute[Any]] = []
+        for field in sorted(fields):
+            prop = mapper.attrs.get(field)
+            if isinstance(prop, ColumnProperty):
+                columns.append(getattr(model, field))
+            elif isinstance(prop, RelationshipProperty):
+                relationships.append(getattr(model, field))
+                # the foreign keys the relationship is loaded with
+                columns.extend(
+                    getattr(model, mapper.get_property_by_column(column).key)
+                    for column in prop.local_columns
+                )
+            else:
+                raise ValueError(f"Unknown field '{field}'.")
 
-        return query
+        return (
+            load_only(*columns),
+            *(selectinload(relationship) for relationship in relationships),
+            lazyload("*"),
+        )
+
+    @classmethod
+    def __apply_fields__(
+        cls,
+        query: QueryType,
+        fields: Collection[str] | None,
+        keys: tuple[CursorKey, ...] | None = None,
+    ) -> QueryType:
+        if fields is None:
+            return query
+        # the cursors are read from the sort columns of the page
+        cursor_fields = {key.key for key in keys or () if "." not in key.key}
+        return query.options(
+            *cls.__get_load_options__(frozenset(fields) | cursor_fields)
+        )
+
+    @classmethod
+    def __get_cursor_keys__(
+        cls, sorting: dict[str, str] | None
+    ) -> tuple[CursorKey, ...] | None:
+        return cls.__get_cursor_plan__(tuple(sorting.items()) if sorting else ())
+
+    @classmethod
+    @lru_cache(maxsize=PLAN_CACHE_SIZE)
+    def __get_cursor_plan__(
+        cls, shape: tuple[tuple[str, str], ...]
+    ) -> tuple[CursorKey, ...] | None:
+        """
+        Returns the keys used for keyset pagination, mirroring the order applied
+        by __apply_sorting__ with `id` appended as a tie breaker. Returns None
+        if the sorting can't be used with a cursor.
+        """
+        keys: list[CursorKey] = []
+        for key, value in shape or cls.__get_default_sorting__():
+            if value.lower() not in {"asc", "desc"}:
+                return None
+            column, _ = cls.__resolve_attribute__(key)
+            keys.append(CursorKey(key, column, value.lower() == "desc"))
+
+        if all(key.key != "id" for key in keys):
+            descending = keys[-1].descending if keys else False
+            keys.append(CursorKey("id", cls.get_model().id, descending))  # type: ignore
+        return tuple(keys)
+
+    @staticmethod
+    def __get_cursor__(entity: ModelType, keys: list[str]) -> str:
+        values: list[Any] = []
+        for key in keys:
+            value: Any = entity
+            for attribute in key.split("."):
+                value = getattr(value, attribute) if value is not None else None
+            values.append(value)
+        return encode_cursor(keys, values)
+
+    @classmethod
+    def __apply_cursor__(
+        cls,
+        query: Query[ModelType],
+        keys: tuple[CursorKey, ...],
+        cursor: str,
+        *,
+        backwards: bool = False,
+    ) -> Query[ModelType]:
+        """
+        Restricts the query to the rows after (or before, if backwards is set)
+        the row the cursor points at.
+
+        NULLs are ordered like Postgres does by default: last for ascending
+        and first for descending columns.
+        """
+        values = decode_cursor(
+            cursor,
+            [key for key, _, _ in keys],
+            [column.type.python_type for _, column, _ in keys],
+        )
+
+        conditions: list[ColumnElement[bool]] = []
+        equal_so_far: list[ColumnElement[bool]] = []
+        for (_, column, descending), value in zip(keys, values, strict=True):
+            # rows "after" the cursor are the smaller ones for descending columns
+            towards_smaller = descending != backwards
+            if value is None:
+                beyond = column.is_not(None) if towards_smaller else None
+                equal = column.is_(None)
+            else:
+                beyond = (
+                    column < value
+                    if towards_smaller
+                    else or_(column > value, column.is_(None))
+                )
+                equal = column == value
+
+            if beyond is not None:
+                conditions.append(and_(*equal_so_far, beyond))
+            equal_so_far.append(equal)
+
+        return query.filter(or_(*conditions))
+
+    @classmethod
+    def __apply_cursor_sorting__(
+        cls,
+        query: Query[ModelType],
+        keys: tuple[CursorKey, ...],
+        *,
+        backwards: bool = False,
+    ) -> Query[ModelType]:
+        return query.order_by(None).order_by(
+            *[
+                column.desc() if descending != backwards else column.asc()
+                for _, column, descending in keys
+            ]
+        )
 
     @classmethod
     def __apply_global_filter__(
@@ -205,105 +425,88 @@ class BaseCRUD[
 
         filters: dict[str, str | list[str]] = {}
         for field in cls.searchable_fields:
-            filters[field] = global_filter
+            filters[f"{field}__{FilterOperator.FUZZY.value}"] = global_filter
         return cls.__apply_filters__(
             query,
             filters,
             and_operator=False,  # OR the conditions together (if any field matches the search query)
         )
 
+    @classmethod
+    def __apply_search__(
+        cls, query: QueryType, search: str | None, *, rank: bool = False
+    ) -> QueryType:
+        """
+        Restricts the query to entities whose search vector matches every word of
+        the search as a prefix. The match is served by the GIN index on the
+        generated search vector. With `rank` the results are ordered by relevance.
+        """
+        if not search:
+            return query
+
+        model = cls.get_model()
+        if not issubclass(model, SearchableMixin):
+            raise ValueError(f"{model.__name__} does not support search.")
+
+        tsquery = build_prefix_tsquery(search)
+        if tsquery is None:
+            return query
+
+        ts_query = func.to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), tsquery)
+        query = query.filter(model.search_vector.op("@@")(ts_query))
+        if rank:
+            query = query.order_by(None).order_by(
+                func.ts_rank(model.search_vector, ts_query).desc(),
+                model.id,  # type: ignore
+            )
+        return query
+
     @classmethod
     def __record_history__(
         cls,
         db_session: Session,
         action: HistoryAction,
         current_user: UserModel,
-        after_action: ModelType | None = None,
-        before_action: ModelType | dict[str, Any] = {},
-        *,
-        commit: bool = True,
+        after_action: ModelType,
+        before_action: Mapping[str, Any] | None = None,
     ) -> None:
-        table_name = None
-        if after_action:
-            table_name = after_action.__tablename__
-        elif before_action and isinstance(before_action, BaseModel):
-            table_name = before_action.__tablename__
-
-        if table_name is None:
-            raise Exception("Can't record history. Table name is not available.")
-
-        entity_id: UUID | None = None
-        if after_action and isinstance(after_action, IdMixin):
-            entity_id = after_action.id
-        elif before_action and isinstance(before_action, IdMixin):
-            entity_id = before_action.id
-
-        if entity_id is None:
-            raise Exception("Can't record history. Entity ID is not available.")
-
-        changes: dict[str, ValueChangeSchema] = {}
-        if after_action is None:
-            if not isinstance(before_action, BaseModel):
-                raise Exception(
-                    "Can't record history. Before action is not a BaseModel instance."
-                )
-            for key in before_action.__dict__:
-                if not key.startswith("_") and key not in {
-                    "created_at",
-                    "created_by",
-                    "updated_at",
-                    "updated_by",
-                }:
-                    # Ensure the value is not a relationship
-                    mapper = inspect(before_action.__class__)
-                    value = before_action.__dict__.get(key)
-                    if key not in mapper.relationships and not isinstance(
-                        value, BaseModel
-                    ):
-                        changes[key] = ValueChangeSchema(old=value, new=None)
-        else:
-            before_action_dict = (
-                before_action.__dict__
-                if isinstance(before_action, BaseModel)
-                else before_action
-            )
-            after_action_dict = after_action.__dict__
-
-            for key in after_action_dict:
-                old_value = before_action_dict.get(key)
-                new_value = after_action_dict.get(key)
-                if (
-                    not key.startswith("_")
-                    and key
-                    not in {
-                        "created_at",
-                        "created_by",
-                        "updated_at",
-                        "updated_by",
-                    }
-                    and old_value != new_value
-                ):
-                    changes[key] = ValueChangeSchema(old=old_value, new=new_value)
-
-        HistoryCrud.create(
-            db_session=db_session,
-            input=HistoryCreateSchema(
-                table_name=table_name,
-                entity_id=entity_id,
-                user_id=current_user.id,
-                action=action.value,
-                changes=changes,
-            ),
-            commit=commit,
+        """
+        Records the changes of a write, compared on the row images it returned.
+        Only models with the HistoryMixin keep a history.
+        """
+        if not isinstance(after_action, HistoryMixin):
+            return
+        changes = get_row_changes(
+            type(after_action), before_action or {}, after_action.__dict__
+        )
+        record_changes(db_session, after_action, action, changes, current_user.id)
+
+    @classmethod
+    def __get_read_key__(
+        cls,
+        method: str,
+        key: str,
+        value: str | list[str],
+        fields: Collection[str] | None = None,
+    ) -> tuple[Any, ...]:
+        """Identifies a read, the concurrent reads with the same key share one query."""
+        return (
+            cls.get_model(),
+            method,
+            key,
+            tuple(value) if isinstance(value, list) else value,
+            None if fields is None else frozenset(fields),
         )
 
     @classmethod
+    @crud_method
     def get_all(cls, db_session: Session) -> list[ModelType]:
         query = db_session.query(cls.get_model())
         query = cls.__apply_filters__(query, None)
         return query.all()
 
     @classmethod
+    @crud_method
     def get_all_by(
         cls, db_session: Session, key: str, value: str | list[str]
     ) -> list[ModelType]:
@@ -315,22 +518,52 @@ class BaseCRUD[
         query = cls.__apply_filters__(query, {key: value})
         query = cls.__apply_sorting__(query, None)
 
-        return query.all()
+        return read_flights.do(
+            db_session, cls.__get_read_key__("get_all_by", key, value), query.all
+        )
 
     @classmethod
+    @crud_method
     def get_one_or_null_by(
-        cls, db_session: Session, key: str, value: str
+        cls,
+        db_session: Session,
+        key: str,
+        value: str,
+        *,
+        fields: Collection[str] | None = None,
     ) -> ModelType | None:
         if not hasattr(cls.get_model(), key):
             raise AttributeError(f"{cls.get_model().__name__} has no attribute '{key}'")
         query = db_session.query(cls.get_model()).filter(
             getattr(cls.get_model(), key) == value
         )
-        return query.one_or_none()
+        # leaves out the soft-deleted entities
+        query = cls.__apply_filters__(query, None)
+        query = cls.__apply_fields__(query, fields)
+        return read_flights.do(
+            db_session,
+            cls.__get_read_key__("get_one_or_null_by", key, value, fields),
+            query.one_or_none,
+        )
 
     @classmethod
-    def get_one_by(cls, db_session: Session, key: str, value: str) -> ModelType:
-        entity = cls.get_one_or_null_by(db_session, key, value)
+    @crud_method
+    def get_one_by(
+        cls,
+        db_session: Session,
+        key: str,
+        value: str,
+        *,
+        fields: Collection[str] | None = None,
+    ) -> ModelType:
+        if cls.entity_cache is not None and key == "id" and fields is None:
+            entity = cls.entity_cache.get_or_load(
+                db_session,
+                value,
+                lambda: cls.get_one_or_null_by(db_session, key, value),
+            )
+        else:
+            entity = cls.get_one_or_null_by(db_session, key, value, fields=fields)
         if entity is None:
             raise NotFoundError(
                 f"{cls.get_model().__name__} with {key}='{value}' was not found."
@@ -338,6 +571,37 @@ class BaseCRUD[
         return entity
 
     @classmethod
+    @crud_method
+    def stream(
+        cls,
+        db_session: Session,
+        filters: dict[str, str | list[str]] | None = None,
+        sorting: dict[str, str] | None = None,
+        global_filter: str | None = None,
+        *,
+        search: str | None = None,
+        fields: Collection[str] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[ModelType]:
+        """
+        Yields all the entities matching the filters, in the order of the
+        sorting, from a server-side cursor. Only `batch_size` rows are held in
+        memory at a time, so the whole table can be read with constant memory.
+
+        The query is executed (and invalid filters raise) when this is called,
+        not when the first entity is consumed.
+        """
+        query = db_session.query(cls.get_model())
+        query = cls.__apply_filters__(query, filters)
+        query = cls.__apply_sorting__(query, sorting)
+        query = cls.__apply_global_filter__(query, global_filter)
+        query = cls.__apply_search__(query, search, rank=False)
+        query = cls.__apply_fields__(query, fields)
+        # yield_per streams the results from a server-side cursor
+        return iter(query.yield_per(batch_size))
+
+    @classmethod
+    @crud_method
     def get_paginated_list(
         cls,
         db_session: Session,
@@ -346,27 +610,571 @@ class BaseCRUD[
         filters: dict[str, str | list[str]] | None = None,
         sorting: dict[str, str] | None = None,
         global_filter: str | None = None,
+        *,
+        after: str | None = None,
+        before: str | None = None,
+        total_strategy: TotalStrategy = TotalStrategy.EXACT,
+        search: str | None = None,
+        fields: Collection[str] | None = None,
     ) -> PaginatedResponseSchema[ModelType]:
+        """
+        Returns a page of entities.
+
+        Pages can be addressed either with offset/limit or with the opaque
+        `after`/`before` cursors returned in the response. Cursor pages are
+        read with keyset conditions on the sort columns (plus `id`), so their
+        cost does not grow with the depth of the page.
+
+        `total_strategy` controls how the total is calculated: `exact` counts
+        the rows in the same round trip as the page, `estimated` uses the
+        planner statistics and `none` skips the count altogether.
+
+        `search` runs a full-text prefix search. Without explicit sorting the
+        results are ranked by relevance, which can't be paged with cursors.
+
+        `fields` limits the loaded columns and relationships to the given
+        fields, all columns and the eagerly loaded relationships are loaded
+        without it.
+        """
+        if after and before:
+            raise ValueError("Only one of 'after' and 'before' can be used.")
+        if (after or before) and offset:
+            raise ValueError("Cursor pagination can't be combined with offset.")
+
         query = db_session.query(cls.get_model())
         query = cls.__apply_filters__(query, filters)
         query = cls.__apply_sorting__(query, sorting)
         query = cls.__apply_global_filter__(query, global_filter)
+        ranked = bool(search) and not sorting
+        query = cls.__apply_search__(query, search, rank=ranked)
+        # the filtered query before any cursor condition, used for counting
+        base_query = query
+
+        keys = None if ranked else cls.__get_cursor_keys__(sorting)
+        if keys is None and (after or before):
+            raise ValueError(
+                "Cursor pagination supports only 'asc' and 'desc' sorting"
+                " and can't be used with search results ranked by relevance."
+            )
 
-        total = query.count()
+        query = cls.__apply_fields__(query, fields, keys)
+
+        cursor = after or before
+        backwards = before is not None
+        if keys is not None:
+            query = cls.__apply_cursor_sorting__(query, keys, backwards=backwards)
+            if cursor:
+                query = cls.__apply_cursor__(query, keys, cursor, backwards=backwards)
+
+        if total_strategy == TotalStrategy.EXACT:
+            # the count rides along with the page rows, so it costs no extra round
+            # trip. Cursor conditions would restrict a window count, so cursor
+            # pages count the base query in a scalar subquery instead.
+            total_column = (
+                select(func.count())
+                .select_from(base_query.order_by(None).subquery())
+                .scalar_subquery()
+                if cursor
+                else func.count().over()
+            )
+            query = query.add_columns(total_column.label("total"))  # type: ignore
 
         if offset:
             query = query.offset(offset)
         if limit:
-            query = query.limit(limit)
+            # fetch one more row to know if there is a next page
+            query = query.limit(limit + 1)
 
-        data = query.all()
+        # with the exact total the rows are (entity, total) rows
+        rows: list[Any] = query.all()
+        if total_strategy == TotalStrategy.EXACT:
+            data = [row[0] for row in rows]
+        else:
+            data = rows
+
+        has_more = bool(limit) and len(data) > limit  # type: ignore
+        if has_more:
+            data = data[:limit]
+        if backwards:
+            data.reverse()
+
+        total = cls.__get_total__(
+            db_session,
+            base_query,
+            rows,
+            total_strategy,
+            filtered=bool(filters or global_filter or search),
+            skipped=bool(cursor or offset),
+            seen=(offset or 0) + len(data) + int(has_more),
+            seen_all=not cursor and not has_more and (bool(data) or not offset),
+        )
 
-        return PaginatedResponseSchema[ModelType](
-            offset=offset, limit=limit, total=total, data=data
+        next_cursor = None
+        previous_cursor = None
+        if keys is not None and data:
+            key_names = [key for key, _, _ in keys]
+            # walking backwards we came from the next page, so it always exists
+            if has_more or backwards:
+                next_cursor = cls.__get_cursor__(data[-1], key_names)
+            if (has_more and backwards) or after or offset:
+                previous_cursor = cls.__get_cursor__(data[0], key_names)
+
+        # the page holds ORM objects, which the routes serialize with their
+        # schema, so there is nothing to validate
+        return PaginatedResponseSchema.model_construct(
+            offset=offset,
+            limit=limit,
+            total=total,
+            total_strategy=total_strategy,
+            data=data,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
         )
 
     @classmethod
-    def create(
+    def __get_total__(
+        cls,
+        db_session: Session,
+        query: Query[ModelType],
+        rows: list[Any],
+        total_strategy: TotalStrategy,
+        *,
+        filtered: bool,
+        skipped: bool,
+        seen: int,
+        seen_all: bool,
+    ) -> int | None:
+        """
+        Resolves the total of a page according to the total strategy.
+
+        `skipped` tells if the page was addressed with an offset or a cursor,
+        `seen` is the lower bound of the total known from the page itself and
+        `seen_all` tells if that bound is the exact total.
+        """
+        if total_strategy == TotalStrategy.EXACT:
+            if rows:
+                return rows[0][1]
+            # an empty page past the end carries no count
+            return query.order_by(None).count() if skipped else 0
+
+        if total_strategy == TotalStrategy.ESTIMATED:
+            if seen_all:
+                # the last page tells us more than the statistics do
+                return seen
+            estimate = cls.__estimate_total__(db_session, query, filtered=filtered)
+            return max(estimate, seen)
+
+        return None
+
+    @classmethod
+    def __estimate_total__(
+        cls, db_session: Session, query: Query[ModelType], *, filtered: bool
+    ) -> int:
+        """
+        Returns the planner's row estimate for the query. Unfiltered lists are
+        answered from pg_class.reltuples, which (auto)analyze keeps up to date.
+        """
+        if not filtered:
+            reltuples = db_session.execute(
+                text(
+                    "SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"
+                ),
+                {"table": cls.get_model().__tablename__},
+            ).scalar()
+            # reltuples is -1 for tables that were never analyzed
+            if reltuples is not None and reltuples >= 0:
+                return int(reltuples)
+
+        # IN lists are expanded into one parameter per value at execution,
+        # which EXPLAIN has to be given already expanded
+        statement = query.order_by(None).statement.compile(
+            dialect=db_session.get_bind().dialect,
+            compile_kwargs={"render_postcompile": True},
+        )
+        plan = (
+            db_session.connection()
+            .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", statement.params)
+            .scalar()
+        )
+        return int(plan[0]["Plan"]["Plan Rows"])  # type: ignore
+
+    @classmethod
+    def __get_history_columns__(cls) -> dict[str, ColumnElement[Any]]:
+        """
+        The columns loaded with the entity by key, which make up the image
+        of the entity its history is recorded from.
+        """
+        return {
+            prop.key: prop.columns[0]
+            for prop in inspect(cls.get_model()).column_attrs
+            if not prop.deferred
+        }
+
+    @classmethod
+    def __get_unique_keys__(cls) -> frozenset[str]:
+        return frozenset(
+            prop.key
+            for prop in inspect(cls.get_model()).column_attrs
+            if isinstance(column := prop.columns[0], Column) and column.unique
+        )
+
+    @classmethod
+    def __write_error__(
+        cls, db_session: Session, error: IntegrityError
+    ) -> HTTPException:
+        """
+        Rolls back the transaction of a write that broke a constraint, and
+        returns the error to answer with: a NotUniqueError for a unique value
+        taken by another entity, a 400 for the other constraints.
+        """
+        db_session.rollback()
+        if not isinstance(error.orig, DatabaseError):
+            raise error
+        message = error.orig.diag.message_primary or str(error.orig)
+        if isinstance(error.orig, UniqueViolation):
+            return NotUniqueError(message)
+        return HTTPException(status_code=400, detail=message)
+
+    @classmethod
+    def __invalidate_cached__(
+        cls, db_session: Session, entity_ids: Iterable[UUID]
+    ) -> None:
+        """Invalidates the cached entities once the transaction commits."""
+        if cls.entity_cache is not None:
+            cls.entity_cache.invalidate_on_commit(db_session, entity_ids)
+
+    @classmethod
+    def __load_related__(cls, entity: ModelType) -> None:
+        # many-to-one relations to objects already in the session (like the
+        # current user) are taken from the identity map, without a query
+        for key in cls.related_to_refresh:
+            getattr(entity, key)
+
+    @classmethod
+    def __select_before__(
+        cls,
+        *conditions: ColumnElement[bool],
+        filters: dict[str, str | list[str]] | None = None,
+    ) -> Subquery:
+        """
+        The image of the entities an update is about to change (without the
+        soft-deleted ones), locked until the end of the transaction.
+        """
+        model = cls.get_model()
+        query = select(
+            *(
+                column.label(key)
+                for key, column in cls.__get_history_columns__().items()
+            )
+        ).where(*conditions)
+        query = cls.__apply_filters__(query, filters)
+        return query.with_for_update(of=model).subquery("before")
+
+    @classmethod
+    def __update_returning__(
+        cls, db_session: Session, entity_id: UUID, values: dict[str, Any]
+    ) -> tuple[ModelType, dict[str, Any]]:
+        """
+        Updates the entity with a single `UPDATE ... RETURNING` that returns
+        both the updated row and the row as it was before the update, read
+        from a locked subquery in the same statement.
+
+        Raises a NotFoundError if there is no entity with the ID.
+        """
+        model = cls.get_model()
+        before = cls.__select_before__(model.id == entity_id)  # type: ignore
+        statement = (
+            update(model)
+            .where(model.id == before.c.id)  # type: ignore
+            .values(values)
+            .returning(model, *before.c)
+            .options(lazyload("*"))
+            .execution_options(
+                populate_existing=True, **{KEYED_INVALIDATION_OPTION: True}
+            )
+        )
+        row = db_session.execute(statement).one_or_none()
+        if row is None:
+            raise NotFoundError(
+                f"{model.__name__} with id='{entity_id}' was not found."
+            )
+        cls.__invalidate_cached__(db_session, [entity_id])
+
+        entity, *before_values = row
+        return entity, dict(zip(before.c.keys(), before_values, strict=True))
+
+    @classmethod
+    def __bulk_update_returning__(
+        cls,
+        db_session: Session,
+        values: dict[str, Any],
+        entity_ids: Collection[UUID] | None,
+        filters: dict[str, str | list[str]] | None,
+    ) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+        """
+        Updates the entities with the IDs and/or matching the filters with a
+        single set based `UPDATE ... RETURNING`, and returns the images of the
+        rows before and after the update. The rows are returned as columns,
+        no entity is built for them.
+        """
+        # filters that resolve to no condition would select every entity
+        if entity_ids is None and not (
+            filters
+            and cls.__get_filter_conditions__(
+                cls.__get_filter_plan_of__(filters), filters
+            )
+        ):
+            raise ValueError("Select the entities to update by ids or filters.")
+
+        model = cls.get_model()
+        columns = cls.__get_history_columns__()
+        conditions = []
+        if entity_ids is not None:
+            # a single array parameter, however many IDs there are
+            ids = bindparam("entity_ids", list(entity_ids), ARRAY(Uuid))
+            conditions.append(model.id == any_(ids))  # type: ignore
+        before = cls.__select_before__(*conditions, filters=filters)
+        statement = (
+            update(model)
+            .where(model.id == before.c.id)  # type: ignore
+            .values(values)
+            .returning(*columns.values(), *before.c)
+            .execution_options(
+                synchronize_session="fetch", **{KEYED_INVALIDATION_OPTION: True}
+            )
+        )
+
+        images = []
+        for row in db_session.execute(statement):
+            after_values, before_values = row[: len(columns)], row[len(columns) :]
+            images.append(
+                (
+                    dict(zip(before.c.keys(), before_values, strict=True)),
+                    dict(zip(columns.keys(), after_values, strict=True)),
+                )
+            )
+        cls.__invalidate_cached__(db_session, (after["id"] for _, after in images))
+        return images
+
+    @classmethod
+    def __get_create_values__(
+        cls, input: CreateSchemaType, current_user: UserModel
+    ) -> dict[str, Any]:
+        model = cls.get_model()
+        values = input.model_dump(by_alias=True)
+        if issubclass(model, CreatedByMixin):
+            values["created_by"] = current_user.id
+        if issubclass(model, BlameableMixin):
+            values["updated_by"] = current_user.id
+        return values
+
+    @classmethod
+    def __insert_chunk__(
+        cls, db_session: Session, chunk: list[tuple[int, dict[str, Any]]]
+    ) -> tuple[list[ModelType], list[BulkItemErrorSchema]]:
+        """
+        Inserts the rows of a chunk with multi-row INSERTs. Rows conflicting
+        with a unique constraint are skipped and reported. When a row violates
+        any other constraint, the rows are inserted one by one in savepoints to
+        report the failing ones.
+        """
+        model = cls.get_model()
+        statement = (
+            insert(model)
+            .on_conflict_do_nothing()
+            .returning(model)
+            .options(lazyload("*"))
+            # None values are left out of the rows otherwise, which splits
+            # the rows with and without them into separate INSERTs
+            .execution_options(render_nulls=True)
+        )
+        # the IDs are generated here to tell the skipped rows apart
+        for _, values in chunk:
+            values.setdefault("id", uuid4())
+
+        inserted: dict[UUID, ModelType] = {}
+        failed: dict[int, str] = {}
+        try:
+            with db_session.begin_nested():
+                returned = db_session.scalars(
+                    statement, [values for _, values in chunk]
+                ).all()
+            inserted = {entity.id: entity for entity in returned}  # type: ignore
+        except IntegrityError:
+            for index, values in chunk:
+                try:
+                    with db_session.begin_nested():
+                        entity = db_session.scalars(statement, [values]).one_or_none()
+                except IntegrityError as e:
+                    failed[index] = e.orig.diag.message_primary or str(e.orig)  # type: ignore
+                    continue
+                if entity is not None:
+                    inserted[entity.id] = entity  # type: ignore
+
+        created: list[ModelType] = []
+        errors: list[BulkItemErrorSchema] = []
+        for index, values in chunk:
+            entity = inserted.get(values["id"])
+            if entity is not None:
+                created.append(entity)
+            else:
+                errors.append(
+                    BulkItemErrorSchema(
+                        index=index,
+                        detail=failed.get(
+                            index,
+                            f"{model.__name__} conflicts with an existing one"
+                            " on a unique field.",
+                        ),
+                    )
+                )
+        return created, errors
+
+    @classmethod
+    @crud_method
+    def bulk_create(
+        cls,
+        db_session: Session,
+        inputs: Sequence[CreateSchemaType],
+        current_user: UserModel,
+        *,
+        chunk_size: int = 1000,
+        commit: bool = True,
+    ) -> BulkCreateResponseSchema[ModelType]:
+        """
+        Creates the entities with multi-row INSERTs of `chunk_size` rows and
+        records their history with a single write. Items that can't be created
+        (like duplicates of a unique name) are reported with their index,
+        without aborting the others.
+        """
+        created: list[ModelType] = []
+        errors: list[BulkItemErrorSchema] = []
+        for start in range(0, len(inputs), chunk_size):
+            chunk = [
+                (index, cls.__get_create_values__(input, current_user))
+                for index, input in enumerate(inputs[start : start + chunk_size], start)
+            ]
+            chunk_created, chunk_errors = cls.__insert_chunk__(db_session, chunk)
+            created.extend(chunk_created)
+            errors.extend(chunk_errors)
+
+        for entity in created:
+            cls.__load_related__(entity)
+        if issubclass(cls.get_model(), HistoryMixin):
+            record_created(db_session, created, current_user.id)  # type: ignore
+
+        if commit:
+            db_session.commit()
+
+        return BulkCreateResponseSchema.model_construct(created=created, errors=errors)
+
+    @classmethod
+    def __upsert_chunk__(
+        cls, db_session: Session, chunk: list[dict[str, Any]]
+    ) -> list[tuple[ModelType, dict[str, Any] | None]]:
+        """
+        Upserts the rows of a chunk with a multi-row `INSERT ... ON CONFLICT
+        DO UPDATE ... RETURNING` and returns each entity with the image of the
+        row before the update, or None for the inserted ones. Rows inserted by
+        the statement are told apart by their xmax, which is 0 for them.
+
+        The existing rows are locked and read by a query beforehand, as the
+        image their history is recorded from.
+        """
+        model = cls.get_model()
+        if not cls.upsert_keys:
+            raise TypeError(f"{model.__name__} has no upsert keys.")
+
+        columns = cls.__get_history_columns__()
+        chunk_keys = [tuple(values[key] for key in cls.upsert_keys) for values in chunk]
+        if len(set(chunk_keys)) < len(chunk_keys):
+            raise ValueError(
+                f"{model.__name__} with the same {', '.join(cls.upsert_keys)}"
+                " is upserted more than once."
+            )
+
+        existing = db_session.execute(
+            select(*(column.label(key) for key, column in columns.items()))
+            .where(tuple_(*(columns[key] for key in cls.upsert_keys)).in_(chunk_keys))
+            .with_for_update()
+        ).mappings()
+        before = {
+            tuple(row[key] for key in cls.upsert_keys): dict(row) for row in existing
+        }
+
+        statement = insert(model)
+        # the row keeps its ID and creator when it is updated
+        kept = {"id", "created_by", *cls.upsert_keys}
+        values: dict[str, Any] = {
+            key: statement.excluded[key] for key in chunk[0] if key not in kept
+        }
+        if issubclass(model, BlameableMixin):
+            # onupdate defaults are not applied to ON CONFLICT DO UPDATE
+            values["updated_at"] = func.now()
+        if issubclass(model, SoftDeletableMixin):
+            # upserting a soft-deleted entity restores it
+            values["deleted_at"] = null()
+            values["deleted_by"] = null()
+        statement = (
+            statement.on_conflict_do_update(index_elements=cls.upsert_keys, set_=values)
+            .returning(model, literal_column("xmax = 0", Boolean).label("inserted"))
+            .options(lazyload("*"))
+            .execution_options(populate_existing=True, render_nulls=True)
+        )
+        # the rows are matched back by their keys, updated rows are returned
+        # with their own ID
+        upserted = {}
+        for entity, inserted in db_session.execute(statement, chunk):
+            key = tuple(getattr(entity, key) for key in cls.upsert_keys)
+            upserted[key] = (entity, None if inserted else before.get(key, {}))
+        return [upserted[key] for key in chunk_keys]
+
+    @classmethod
+    @crud_method
+    def bulk_upsert(
+        cls,
+        db_session: Session,
+        inputs: Sequence[CreateSchemaType],
+        current_user: UserModel,
+        *,
+        chunk_size: int = 1000,
+        commit: bool = True,
+    ) -> list[ModelType]:
+        """
+        Creates the entities, or updates the existing ones with the same
+        `upsert_keys`, with multi-row upserts of `chunk_size` rows. Their
+        history is recorded as CREATE or UPDATE with a single write.
+        Returns the entities in the order of the inputs.
+        """
+        upserted: list[tuple[ModelType, dict[str, Any] | None]] = []
+        try:
+            for start in range(0, len(inputs), chunk_size):
+                chunk = [
+                    cls.__get_create_values__(input, current_user)
+                    for input in inputs[start : start + chunk_size]
+                ]
+                upserted.extend(cls.__upsert_chunk__(db_session, chunk))
+        except IntegrityError as e:
+            db_session.rollback()
+            if isinstance(e.orig, UniqueViolation) and e.orig.diag.message_primary:
+                raise NotUniqueError(e.orig.diag.message_primary)
+            raise e
+
+        for entity, _ in upserted:
+            cls.__load_related__(entity)
+        upserted_ids = [entity.id for entity, _ in upserted]  # type: ignore
+        cls.__invalidate_cached__(db_session, upserted_ids)
+        if issubclass(cls.get_model(), HistoryMixin):
+            record_upserted(db_session, upserted, current_user.id)  # type: ignore
+
+        if commit:
+            db_session.commit()
+
+        return [entity for entity, _ in upserted]
+
+    @classmethod
+    @crud_method
+    def upsert(
         cls,
         db_session: Session,
         input: CreateSchemaType,
@@ -374,19 +1182,28 @@ class BaseCRUD[
         *,
         commit: bool = True,
     ) -> ModelType:
-        new_entity = cls.get_model()(**input.model_dump(by_alias=True))
+        """Creates the entity, or updates the one with the same `upsert_keys`."""
+        (entity,) = cls.bulk_upsert(db_session, [input], current_user, commit=commit)
+        return entity
 
-        if isinstance(new_entity, CreatedByMixin):
-            new_entity.created_by = current_user.id
-        if isinstance(new_entity, BlameableMixin):
-            new_entity.updated_by = current_user.id
+    @classmethod
+    @crud_method
+    def create(
+        cls,
+        db_session: Session,
+        input: CreateSchemaType,
+        current_user: UserModel,
+        *,
+        commit: bool = True,
+    ) -> ModelType:
+        values = cls.__get_create_values__(input, current_user)
 
-        db_session.add(new_entity)
+        # a single INSERT ... RETURNING, which also reads back the defaults
+        statement = insert(cls.get_model()).returning(cls.get_model())
         try:
-            if commit:
-                db_session.commit()
-            else:
-                db_session.flush()
+            new_entity = db_session.scalars(
+                statement.options(lazyload("*")), [values]
+            ).one()
         except IntegrityError as e:
             db_session.rollback()
             if isinstance(e.orig, UniqueViolation) and e.orig.diag.message_primary:
@@ -397,19 +1214,22 @@ class BaseCRUD[
             db_session.rollback()
             raise HTTPException(status_code=400, detail=str(e))
 
-        db_session.refresh(new_entity, cls.related_to_refresh)
+        cls.__load_related__(new_entity)
 
         cls.__record_history__(
             db_session=db_session,
             action=HistoryAction.CREATE,
             after_action=new_entity,
             current_user=current_user,
-            commit=commit,
         )
 
+        if commit:
+            db_session.commit()
+
         return new_entity
 
     @classmethod
+    @crud_method
     def update(
         cls,
         db_session: Session,
@@ -422,39 +1242,40 @@ class BaseCRUD[
         if input is None:
             raise ValueError("Input is required for update operation.")
 
-        entity = cls.get_one_by(db_session=db_session, key="id", value=str(entity_id))
-        # copy entity to record history
-        entity_copy = entity.__dict__.copy()
-
-        if isinstance(entity, BlameableMixin):
-            entity.updated_by = current_user.id
-
+        model = cls.get_model()
+        columns = cls.__get_history_columns__()
         # merge entity with input
-        for key, value in input.model_dump(by_alias=True).items():
-            if hasattr(entity, key):
-                setattr(entity, key, value)
-
-        db_session.add(entity)
-
-        if commit:
-            db_session.commit()
-        else:
-            db_session.flush()
+        values = {
+            key: value
+            for key, value in input.model_dump(by_alias=True).items()
+            if key in columns
+        }
+        if issubclass(model, BlameableMixin):
+            values["updated_by"] = current_user.id
 
-        db_session.refresh(entity)
+        try:
+            entity, entity_before = cls.__update_returning__(
+                db_session, entity_id, values
+            )
+        except IntegrityError as e:
+            raise cls.__write_error__(db_session, e)
 
         cls.__record_history__(
             db_session=db_session,
             action=HistoryAction.UPDATE,
-            before_action=entity_copy,
+            before_action=entity_before,
             after_action=entity,
             current_user=current_user,
-            commit=commit,
         )
+        cls.__load_related__(entity)
+
+        if commit:
+            db_session.commit()
 
         return entity
 
     @classmethod
+    @crud_method
     def soft_delete(
         cls,
         db_session: Session,
@@ -471,29 +1292,115 @@ class BaseCRUD[
             if not hasattr(model, attribute):
                 raise AttributeError(f"{model.__name__} has no attribute '{attribute}'")
 
-        entity = cls.get_one_by(db_session=db_session, key="id", value=str(entity_id))
-
-        if not isinstance(entity, SoftDeletableMixin):
+        if not issubclass(model, SoftDeletableMixin):
             raise TypeError("Entity is not an instance of SoftDeletableMixin.")
 
-        # copy entity before modification for history record
-        entity_copy = entity.__dict__.copy()
-
-        entity.deleted_at = datetime.now(UTC)
-        entity.deleted_by = current_user.id
-
-        db_session.add(entity)
-
-        if commit:
-            db_session.commit()
-        else:
-            db_session.flush()
+        entity, entity_before = cls.__update_returning__(
+            db_session,
+            entity_id,
+            {"deleted_at": datetime.now(UTC), "deleted_by": current_user.id},
+        )
 
         cls.__record_history__(
             db_session=db_session,
             action=HistoryAction.DELETE,
-            before_action=entity_copy,
+            before_action=entity_before,
             after_action=entity,
             current_user=current_user,
-            commit=commit,
         )
+
+        if commit:
+            db_session.commit()
+
+    @classmethod
+    @crud_method
+    def bulk_update(
+        cls,
+        db_session: Session,
+        input: UpdateSchemaType,
+        current_user: UserModel,
+        *,
+        entity_ids: Collection[UUID] | None = None,
+        filters: dict[str, str | list[str]] | None = None,
+        commit: bool = True,
+    ) -> int:
+        """
+        Sets the fields given in the input on all the entities with the IDs
+        and/or matching the filters, with a single `UPDATE`, and records their
+        history with a single write. Returns the number of updated entities.
+        """
+        if input is None:
+            raise ValueError("Input is required for update operation.")
+
+        model = cls.get_model()
+        columns = cls.__get_history_columns__()
+        # only the fields that were given are set
+        values = {
+            key: value
+            for key, value in input.model_dump(
+                by_alias=True, exclude_unset=True
+            ).items()
+            if key in columns
+        }
+        if not values:
+            raise ValueError("There is nothing to update.")
+        # a unique value can only be given to a single entity
+        unique_keys = sorted(cls.__get_unique_keys__().intersection(values))
+        if unique_keys and (entity_ids is None or len(set(entity_ids)) > 1):
+            raise ValueError(
+                f"{', '.join(unique_keys)} can only be set on a single entity,"
+                " selected by its id."
+            )
+        if issubclass(model, BlameableMixin):
+            values["updated_by"] = current_user.id
+
+        try:
+            images = cls.__bulk_update_returning__(
+                db_session, values, entity_ids, filters
+            )
+        except IntegrityError as e:
+            raise cls.__write_error__(db_session, e)
+        if issubclass(model, HistoryMixin):
+            record_row_changes(
+                db_session, model, HistoryAction.UPDATE, images, current_user.id
+            )
+
+        if commit:
+            db_session.commit()
+
+        return len(images)
+
+    @classmethod
+    @crud_method
+    def bulk_soft_delete(
+        cls,
+        db_session: Session,
+        current_user: UserModel,
+        *,
+        entity_ids: Collection[UUID] | None = None,
+        filters: dict[str, str | list[str]] | None = None,
+        commit: bool = True,
+    ) -> int:
+        """
+        Soft deletes all the entities with the IDs and/or matching the filters
+        like bulk_update updates them. Returns the number of deleted entities.
+        """
+        model = cls.get_model()
+        if not issubclass(model, SoftDeletableMixin):
+            raise TypeError("Entity is not an instance of SoftDeletableMixin.")
+
+        images = cls.__bulk_update_returning__(
+            db_session,
+            {"deleted_at": datetime.now(UTC), "deleted_by": current_user.id},
+            entity_ids,
+            filters,
+        )
+        if issubclass(model, HistoryMixin):
+            record_row_changes(
+                db_session, model, HistoryAction.DELETE, images, current_user.id
+            )
+
+        if commit:
+            db_session.commit()
+
+        return len(images)
@@ -1,3 +1,4 @@
+from app.crud.async_base_crud import AsyncBaseCRUD
 from app.crud.base_crud import BaseCRUD
 from app.models.comment_model import CommentModel
 from app.schemas.comment_schemas import (
@@ -12,7 +13,17 @@ class CommentCRUD(
 ):
     # Related fields to refresh after create/update operations
     related_to_refresh = ["creator"]
+    searchable_fields = ["content"]
+    fuzzy_filter_fields = ["content"]
 
     @classmethod
     def get_model(cls) -> type[CommentModel]:
         return CommentModel
+
+
+class AsyncCommentCRUD(
+    AsyncBaseCRUD[CommentModel, CommentCreateSchema, CommentUpdateSchema]
+):
+    @classmethod
+    def get_sync_crud(cls) -> type[CommentCRUD]:
+        return CommentCRUD
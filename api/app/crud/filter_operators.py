@@ -0,0 +1,250 @@
+import re
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import String, and_, cast, or_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.utils.cursor_utils import get_type_adapter
+
+
+class FilterOperator(Enum):
+    EQ = "eq"
+    IN = "in"
+    GT = "gt"
+    GTE = "gte"
+    LT = "lt"
+    LTE = "lte"
+    # "low,high" with either end optional
+    RANGE = "range"
+    PREFIX = "prefix"
+    # case-insensitive substring match
+    CONTAINS = "contains"
+    # "true" or "false"
+    IS_NULL = "is_null"
+    # trigram similarity (pg_trgm), tolerates typos
+    SIMILAR = "similar"
+    # the legacy liberal ILIKE search on the string representation of the column
+    FUZZY = "fuzzy"
+
+
+# Operators that can be served by a btree index on the column
+COMPARISON_OPERATORS = {
+    FilterOperator.GT: lambda column, value: column > value,
+    FilterOperator.GTE: lambda column, value: column >= value,
+    FilterOperator.LT: lambda column, value: column < value,
+    FilterOperator.LTE: lambda column, value: column <= value,
+}
+
+NULL_VALUE = "NULL"
+
+
+class ValueShape(Enum):
+    """
+    The shape of a filter value, which together with the filter key decides
+    the operator of the filter.
+    """
+
+    EMPTY = "empty"
+    NULL = "null"
+    SINGLE = "single"
+    # comma separated values
+    CSV = "csv"
+    LIST = "list"
+
+
+def get_value_shape(value: str | list[str]) -> ValueShape:
+    if not value:
+        return ValueShape.EMPTY
+    if isinstance(value, list):
+        return ValueShape.LIST
+    if value == NULL_VALUE:
+        return ValueShape.NULL
+    if "," in value:
+        return ValueShape.CSV
+    return ValueShape.SINGLE
+
+
+def split_filter_key(key: str) -> tuple[str, FilterOperator | None]:
+    """
+    Splits a filter key like `name__prefix` into the field and the operator.
+    Keys without a known operator suffix are returned as they are.
+    """
+    field, separator, suffix = key.rpartition("__")
+    if separator:
+        try:
+            return field, FilterOperator(suffix)
+        except ValueError:
+            pass
+    return key, None
+
+
+def is_text_column(column: InstrumentedAttribute[Any]) -> bool:
+    return isinstance(column.type, String)
+
+
+def default_operator(
+    column: InstrumentedAttribute[Any], shape: ValueShape, *, fuzzy: bool
+) -> FilterOperator:
+    """
+    Chooses the operator for a filter without an explicit operator suffix.
+    Only text columns that ask for it use the (index unfriendly) fuzzy search,
+    everything else is compared with the typed value.
+    """
+    if fuzzy and is_text_column(column):
+        return FilterOperator.FUZZY
+    if shape in {ValueShape.LIST, ValueShape.CSV}:
+        return FilterOperator.IN
+    if shape == ValueShape.NULL:
+        return FilterOperator.IS_NULL
+    return FilterOperator.EQ
+
+
+def coerce_value(column: InstrumentedAttribute[Any], value: str) -> Any:
+    """
+    Converts a filter value to the python type of the column so the comparison
+    is done on the column type (and can use its index) instead of on a cast.
+
+    Raises a ValueError if the value is not valid for the column type.
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    return get_type_adapter(python_type).validate_python(value)
+
+
+def build_condition(
+    column: InstrumentedAttribute[Any],
+    operator: FilterOperator,
+    value: str | list[str],
+) -> ColumnElement[bool] | None:
+    if operator == FilterOperator.FUZZY:
+        return build_fuzzy_condition(column, value)
+    if operator == FilterOperator.IN:
+        return build_in_condition(column, value)
+
+    if isinstance(value, list):
+        raise ValueError(f"Filter operator '{operator.value}' expects a single value.")
+
+    if operator in SINGLE_VALUE_OPERATORS:
+        return SINGLE_VALUE_OPERATORS[operator](column, value)
+    if operator in COMPARISON_OPERATORS:
+        return COMPARISON_OPERATORS[operator](column, coerce_value(column, value))
+    return column == coerce_value(column, value)
+
+
+def build_in_condition(
+    column: InstrumentedAttribute[Any], value: str | list[str]
+) -> ColumnElement[bool]:
+    values = [v.strip() for v in value.split(",")] if isinstance(value, str) else value
+    condition = column.in_([coerce_value(column, v) for v in values if v != NULL_VALUE])
+    if NULL_VALUE in values:
+        return or_(condition, column.is_(None))
+    return condition
+
+
+def build_is_null_condition(
+    column: InstrumentedAttribute[Any], value: str
+) -> ColumnElement[bool]:
+    if value.lower() in {"true", NULL_VALUE.lower()}:
+        return column.is_(None)
+    if value.lower() == "false":
+        return column.is_not(None)
+    raise ValueError("Filter operator 'is_null' expects 'true' or 'false'.")
+
+
+def build_range_condition(
+    column: InstrumentedAttribute[Any], value: str
+) -> ColumnElement[bool] | None:
+    low, _, high = (bound.strip() for bound in value.partition(","))
+    bounds = []
+    if low:
+        bounds.append(column >= coerce_value(column, low))
+    if high:
+        bounds.append(column <= coerce_value(column, high))
+    return and_(*bounds) if bounds else None
+
+
+def build_prefix_condition(
+    column: InstrumentedAttribute[Any], value: str
+) -> ColumnElement[bool]:
+    ensure_text_column(column, FilterOperator.PREFIX)
+    return column.startswith(value, autoescape=True)
+
+
+def build_contains_condition(
+    column: InstrumentedAttribute[Any], value: str
+) -> ColumnElement[bool]:
+    ensure_text_column(column, FilterOperator.CONTAINS)
+    return column.icontains(value, autoescape=True)
+
+
+def build_similar_condition(
+    column: InstrumentedAttribute[Any], value: str
+) -> ColumnElement[bool]:
+    ensure_text_column(column, FilterOperator.SIMILAR)
+    return column.op("%", is_comparison=True)(value)
+
+
+def ensure_text_column(
+    column: InstrumentedAttribute[Any], operator: FilterOperator
+) -> None:
+    if not is_text_column(column):
+        raise ValueError(
+            f"Filter operator '{operator.value}' can only be used on text fields."
+        )
+
+
+SINGLE_VALUE_OPERATORS = {
+    FilterOperator.IS_NULL: build_is_null_condition,
+    FilterOperator.RANGE: build_range_condition,
+    FilterOperator.PREFIX: build_prefix_condition,
+    FilterOperator.CONTAINS: build_contains_condition,
+    FilterOperator.SIMILAR: build_similar_condition,
+}
+
+
+def build_fuzzy_condition(
+    column: InstrumentedAttribute[Any], value: str | list[str]
+) -> ColumnElement[bool] | None:
+    # if filter value is string containing , split it into list, trim all values
+    # and replace spaces with % to allow for more liberal search
+    if isinstance(value, str) and "," in value:
+        values = [v.strip().replace(" ", "%") for v in value.split(",")]
+        return or_(*[cast(column, String).ilike(f"%{v}%") for v in values])
+    if isinstance(value, list):
+        # When receiving a list of values, we want to filter for case-insensitive
+        # matches, because we assume the user used a multi-select filter in the
+        # frontend.
+        # the only thing we do is additionally search for the value with
+        # underscores instead of spaces.
+        return or_(
+            *[
+                or_(column.is_(None))
+                if v == NULL_VALUE
+                else or_(
+                    cast(column, String).ilike(f"{str(v)}"),
+                    cast(column, String).ilike(f"{str(v).replace(' ', '_')}"),
+                )
+                for v in value
+            ]
+        )
+    if value == NULL_VALUE:
+        return column.is_(None)
+
+    formatted_value = str(value).replace(" ", "%")
+    return cast(column, String).ilike(f"%{formatted_value}%")
+
+
+def build_prefix_tsquery(search: str) -> str | None:
+    """
+    Turns free text into a tsquery that matches documents containing all the
+    words, each as a prefix. Only word characters are kept, so the search
+    can't inject tsquery syntax.
+    """
+    words = re.findall(r"\w+", search)
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
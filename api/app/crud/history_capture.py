@@ -0,0 +1,198 @@
+from collections.abc import Mapping, Sequence
+from functools import cache
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, UOWTransaction, class_mapper
+from sqlalchemy.orm.attributes import get_history, instance_state
+from sqlalchemy.orm.base import PASSIVE_NO_INITIALIZE
+
+from app.crud.history_writer import get_history_writer
+from app.models.mixins.blameable_mixin import BlameableMixin
+from app.models.mixins.history_mixin import HistoryMixin
+from app.schemas.history_schemas import (
+    HistoryAction,
+    HistoryCreateSchema,
+    ValueChangeSchema,
+)
+
+# Session.info key of the ID of the user the changes of the session are made by
+HISTORY_USER_KEY = "history_user_id"
+
+
+def set_history_user(db_session: Session, user_id: UUID) -> None:
+    db_session.info[HISTORY_USER_KEY] = user_id
+
+
+@cache
+def get_history_keys(model: type[HistoryMixin]) -> tuple[str, ...]:
+    """The keys of the column attributes whose changes are recorded."""
+    return tuple(
+        prop.key
+        for prop in class_mapper(model).column_attrs
+        if not prop.deferred and prop.key not in model.__history_exclude__
+    )
+
+
+def get_row_changes(
+    model: type[HistoryMixin], before: Mapping[str, Any], after: Mapping[str, Any]
+) -> dict[str, ValueChangeSchema]:
+    """Compares two images of a row, like the rows returned by a write."""
+    changes = {}
+    for key in get_history_keys(model):
+        old_value, new_value = before.get(key), after.get(key)
+        if old_value != new_value:
+            changes[key] = ValueChangeSchema(old=old_value, new=new_value)
+    return changes
+
+
+def get_flushed_changes(
+    entity: HistoryMixin, action: HistoryAction
+) -> dict[str, ValueChangeSchema]:
+    """
+    Reads the changes of a flushed entity from its attribute history, without
+    loading any attribute that is not loaded yet.
+    """
+    values = instance_state(entity).dict
+    if action == HistoryAction.CREATE:
+        return get_row_changes(type(entity), {}, values)
+    if action == HistoryAction.DELETE:
+        return get_row_changes(type(entity), values, {})
+
+    changes = {}
+    for key in get_history_keys(type(entity)):
+        history = get_history(entity, key, passive=PASSIVE_NO_INITIALIZE)
+        if history.added or history.deleted:
+            changes[key] = ValueChangeSchema(
+                old=history.deleted[0] if history.deleted else None,
+                new=history.added[0] if history.added else None,
+            )
+    return changes
+
+
+def build_record(
+    entity: HistoryMixin,
+    action: HistoryAction,
+    changes: dict[str, ValueChangeSchema],
+    user_id: UUID,
+) -> HistoryCreateSchema:
+    return HistoryCreateSchema(
+        table_name=entity.__tablename__,  # type: ignore
+        entity_id=entity.id,  # type: ignore
+        user_id=user_id,
+        action=action.value,
+        changes=changes,
+    )
+
+
+def record_changes(
+    db_session: Session,
+    entity: HistoryMixin,
+    action: HistoryAction,
+    changes: dict[str, ValueChangeSchema],
+    user_id: UUID,
+) -> None:
+    # the history is committed together with the mutation, how it is written
+    # depends on the history mode
+    get_history_writer().write(
+        db_session, build_record(entity, action, changes, user_id)
+    )
+
+
+def record_created(
+    db_session: Session, entities: Sequence[HistoryMixin], user_id: UUID
+) -> None:
+    """Records the creation of the entities, written with a single INSERT."""
+    if not entities:
+        return
+    model = type(entities[0])
+    get_history_writer().write_many(
+        db_session,
+        [
+            build_record(
+                entity,
+                HistoryAction.CREATE,
+                get_row_changes(model, {}, entity.__dict__),
+                user_id,
+            )
+            for entity in entities
+        ],
+    )
+
+
+def record_upserted(
+    db_session: Session,
+    upserted: Sequence[tuple[HistoryMixin, Mapping[str, Any] | None]],
+    user_id: UUID,
+) -> None:
+    """
+    Records the upserted entities, given with the image of the row before the
+    update or None for the created ones, written with a single INSERT. Updates
+    that changed nothing are not recorded.
+    """
+    records = []
+    for entity, before in upserted:
+        action = HistoryAction.CREATE if before is None else HistoryAction.UPDATE
+        changes = get_row_changes(type(entity), before or {}, entity.__dict__)
+        if changes:
+            records.append(build_record(entity, action, changes, user_id))
+    if records:
+        get_history_writer().write_many(db_session, records)
+
+
+def record_row_changes(
+    db_session: Session,
+    model: type[HistoryMixin],
+    action: HistoryAction,
+    images: Sequence[tuple[Mapping[str, Any], Mapping[str, Any]]],
+    user_id: UUID,
+) -> None:
+    """
+    Records the changes of rows given as their images before and after a set
+    based write, written with a single INSERT. Rows that did not change are
+    not recorded.
+    """
+    records = []
+    for before, after in images:
+        changes = get_row_changes(model, before, after)
+        if changes:
+            records.append(
+                HistoryCreateSchema(
+                    table_name=model.__tablename__,  # type: ignore
+                    entity_id=after["id"],
+                    user_id=user_id,
+                    action=action.value,
+                    changes=changes,
+                )
+            )
+    if records:
+        get_history_writer().write_many(db_session, records)
+
+
+def get_flush_user_id(db_session: Session, entity: HistoryMixin) -> UUID | None:
+    user_id = db_session.info.get(HISTORY_USER_KEY)
+    if user_id is None and isinstance(entity, BlameableMixin):
+        return entity.updated_by
+    return user_id
+
+
+@event.listens_for(Session, "after_flush")
+def capture_flushed_changes(db_session: Session, flush_context: UOWTransaction) -> None:
+    # the session still lists the flushed entities and their attribute history
+    # until the flush is done
+    for entities, action in (
+        (db_session.new, HistoryAction.CREATE),
+        (db_session.dirty, HistoryAction.UPDATE),
+        (db_session.deleted, HistoryAction.DELETE),
+    ):
+        for entity in entities:
+            if not isinstance(entity, HistoryMixin):
+                continue
+            user_id = get_flush_user_id(db_session, entity)
+            # changes without a known user (like seeds) are not recorded
+            if user_id is None:
+                continue
+            changes = get_flushed_changes(entity, action)
+            if changes:
+                record_changes(db_session, entity, action, changes, user_id)
@@ -1,20 +1,38 @@
+from collections.abc import Sequence
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.metrics import crud_method
 from app.models.history_model import HistoryModel
 from app.schemas.history_schemas import HistoryCreateSchema
 
 
 class HistoryCrud:
     @classmethod
+    @crud_method
     def create(
         cls, db_session: Session, input: HistoryCreateSchema, *, commit: bool = True
     ) -> HistoryModel:
         # model_dump mode needs to be json to enable i.e. UUID serialization
-        new_entity = HistoryModel(**input.model_dump(mode="json"))
-        db_session.add(new_entity)
+        new_entity = db_session.scalars(
+            insert(HistoryModel).returning(HistoryModel),
+            [input.model_dump(mode="json")],
+        ).one()
         if commit:
             db_session.commit()
-        else:
-            db_session.flush()
-        db_session.refresh(new_entity)
         return new_entity
+
+    @classmethod
+    @crud_method
+    def create_many(
+        cls, db_session: Session, inputs: Sequence[HistoryCreateSchema]
+    ) -> None:
+        """
+        Inserts the records with multi-row INSERTs, without reading them back.
+        """
+        if not inputs:
+            return
+        db_session.execute(
+            insert(HistoryModel), [input.model_dump(mode="json") for input in inputs]
+        )
@@ -0,0 +1,16 @@
+from app.crud.base_crud import BaseCRUD
+from app.models.history_model import HistoryModel
+from app.schemas.history_schemas import HistoryCreateSchema, HistoryReadSchema
+
+
+class HistoryReadCRUD(
+    BaseCRUD[HistoryModel, HistoryReadSchema, HistoryCreateSchema, None]
+):
+    """
+    Reads the history with the filters, sorting and streaming of BaseCRUD.
+    The history is written by HistoryCrud, not through this class.
+    """
+
+    @classmethod
+    def get_model(cls) -> type[HistoryModel]:
+        return HistoryModel
@@ -0,0 +1,216 @@
+import logging
+import queue
+import threading
+from collections.abc import Callable
+from functools import cache
+from typing import override
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.crud.history_crud import HistoryCrud
+from app.database import DatabaseSession
+from app.metrics import HISTORY_WRITE_DURATION
+from app.schemas.history_schemas import HistoryCreateSchema
+from app.settings import HistoryMode, env
+
+logger = logging.getLogger(__name__)
+
+# Session.info key of the history records buffered in the session's transaction
+HISTORY_BUFFER_KEY = "history_buffer"
+
+
+class HistoryWriter:
+    """
+    Writes the history records of the mutations. INLINE writes every record as
+    it is recorded, the buffered writers collect the records of a transaction
+    and write them in bulk when it commits.
+    """
+
+    def write(self, db_session: Session, record: HistoryCreateSchema) -> None:  # noqa: PLR6301
+        with HISTORY_WRITE_DURATION.time(HistoryMode.INLINE.value):
+            HistoryCrud.create(db_session=db_session, input=record, commit=False)
+
+    def write_many(  # noqa: PLR6301
+        self, db_session: Session, records: list[HistoryCreateSchema]
+    ) -> None:
+        with HISTORY_WRITE_DURATION.time(HistoryMode.INLINE.value):
+            HistoryCrud.create_many(db_session, records)
+
+    def close(self) -> None:
+        pass
+
+
+class HistoryBuffer:
+    def __init__(self, writer: BufferedHistoryWriter):
+        self.writer = writer
+        self.records: list[HistoryCreateSchema] = []
+
+
+class BufferedHistoryWriter(HistoryWriter):
+    @override
+    def write(self, db_session: Session, record: HistoryCreateSchema) -> None:
+        buffer = db_session.info.get(HISTORY_BUFFER_KEY)
+        if buffer is None:
+            buffer = db_session.info[HISTORY_BUFFER_KEY] = HistoryBuffer(self)
+        buffer.records.append(record)
+
+    @override
+    def write_many(
+        self, db_session: Session, records: list[HistoryCreateSchema]
+    ) -> None:
+        for record in records:
+            self.write(db_session, record)
+
+    def before_commit(self, db_session: Session, buffer: HistoryBuffer) -> None:
+        pass
+
+    def after_commit(self, records: list[HistoryCreateSchema]) -> None:
+        pass
+
+
+class TransactionHistoryWriter(BufferedHistoryWriter):
+    """
+    Inserts the buffered records in the transaction that recorded them, right
+    before it commits. The history is as durable as the mutations.
+    """
+
+    @override
+    def before_commit(self, db_session: Session, buffer: HistoryBuffer) -> None:
+        records, buffer.records = buffer.records, []
+        with HISTORY_WRITE_DURATION.time(HistoryMode.TRANSACTION.value):
+            HistoryCrud.create_many(db_session, records)
+
+
+class QueuedHistoryWriter(BufferedHistoryWriter):
+    """
+    Hands the records of committed transactions to a background thread, which
+    writes them in batches with its own sessions. The commits don't wait for
+    the history, but the records still queued are lost if the process dies;
+    the size of the queue bounds that loss. While the queue is full, commits
+    write their history themselves.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[HistoryCreateSchema | None] = queue.Queue(max_size)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @override
+    def after_commit(self, records: list[HistoryCreateSchema]) -> None:
+        self.__start__()
+        for index, record in enumerate(records):
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.__write_batch__(records[index:])
+                return
+
+    @override
+    def close(self) -> None:
+        """Writes the queued records and stops the background thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def __start__(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self.__run__, name="history-writer", daemon=True
+                )
+                self._thread.start()
+
+    def __run__(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+
+            batch = [record]
+            stop = False
+            # collect what else arrives within the flush interval
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+
+            self.__write_batch__(batch)
+            if stop:
+                return
+
+    def __write_batch__(self, records: list[HistoryCreateSchema]) -> None:
+        try:
+            with (
+                HISTORY_WRITE_DURATION.time(HistoryMode.ASYNC.value),
+                self.session_factory() as db_session,
+            ):
+                HistoryCrud.create_many(db_session, records)
+                db_session.commit()
+        except Exception:
+            logger.exception("Could not write %d history records.", len(records))
+
+
+@event.listens_for(Session, "before_commit")
+def flush_history_buffer(db_session: Session) -> None:
+    # releasing a savepoint fires the commit events too, the history waits for
+    # the transaction to commit
+    if db_session.in_nested_transaction():
+        return
+    # the records of the changes still pending are captured by this flush,
+    # commit's own flush would only run after this listener
+    db_session.flush()
+    buffer = db_session.info.get(HISTORY_BUFFER_KEY)
+    if buffer is not None and buffer.records:
+        buffer.writer.before_commit(db_session, buffer)
+
+
+@event.listens_for(Session, "after_commit")
+def hand_over_history_buffer(db_session: Session) -> None:
+    if db_session.in_nested_transaction():
+        return
+    buffer = db_session.info.pop(HISTORY_BUFFER_KEY, None)
+    if buffer is not None and buffer.records:
+        buffer.writer.after_commit(buffer.records)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_history_buffer(
+    db_session: Session, previous_transaction: SessionTransaction
+) -> None:
+    # the mutations were rolled back, so is their history. A savepoint rolling
+    # back (like a failed chunk of a bulk create) leaves the transaction, and
+    # the history of its other mutations, to commit
+    if not previous_transaction.nested:
+        db_session.info.pop(HISTORY_BUFFER_KEY, None)
+
+
+@cache
+def get_history_writer() -> HistoryWriter:
+    if env.history_mode == HistoryMode.TRANSACTION:
+        return TransactionHistoryWriter()
+    if env.history_mode == HistoryMode.ASYNC:
+        return QueuedHistoryWriter(
+            DatabaseSession,
+            max_size=env.history_queue_size,
+            batch_size=env.history_batch_size,
+            flush_interval=env.history_flush_interval_ms / 1000,
+        )
+    return HistoryWriter()
@@ -1,9 +1,87 @@
+from uuid import UUID
+
+from psycopg.errors import QueryCanceled
+from sqlalchemy import Float, Row, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.cache.entity_cache import EntityCache
+from app.crud.async_base_crud import AsyncBaseCRUD
 from app.crud.base_crud import BaseCRUD
+from app.errors import ServiceUnavailableError
+from app.metrics import crud_method
 from app.models.part_model import PartModel
 from app.schemas.part_schemas import PartCreateSchema, PartSchema, PartUpdateSchema
+from app.settings import env
 
 
 class PartCRUD(BaseCRUD[PartModel, PartSchema, PartCreateSchema, PartUpdateSchema]):
+    searchable_fields = ["name", "description"]
+    fuzzy_filter_fields = ["name", "description"]
+    upsert_keys = ["name"]
+    # the part detail is the hottest read
+    entity_cache = EntityCache(PartModel, env.entity_cache_size, env.entity_cache_ttl_s)
+
     @classmethod
     def get_model(cls) -> type[PartModel]:
         return PartModel
+
+    @classmethod
+    @crud_method
+    def autocomplete(
+        cls, db_session: Session, q: str, limit: int
+    ) -> list[Row[tuple[UUID, str]]]:
+        """
+        Returns the id and name of the parts whose name best matches the typed
+        (partial, possibly misspelled) input, most similar first.
+
+        The lookup uses the trigram indexes on the name and is cancelled by the
+        database when it exceeds the autocomplete latency budget.
+        """
+        q = q.strip()
+        if not q:
+            return []
+
+        # set_config(..., true) behaves like SET LOCAL, the timeout only
+        # applies to the current transaction
+        db_session.execute(
+            select(
+                func.set_config(
+                    "statement_timeout", f"{env.autocomplete_timeout_ms}ms", True
+                )
+            )
+        )
+
+        query = (
+            select(PartModel.id, PartModel.name)
+            # `name %> q` is true when q is similar to a part of the name,
+            # written with the column first so the index can serve it
+            .where(PartModel.name.op("%>", is_comparison=True)(q))
+            # ordering by the word similarity distance lets the GiST index
+            # return the nearest names first instead of sorting all matches
+            .order_by(PartModel.name.op("<->>", return_type=Float)(q), PartModel.name)
+            .limit(limit)
+        )
+        query = cls.__apply_filters__(query, None)
+
+        try:
+            return list(db_session.execute(query).all())
+        except OperationalError as e:
+            if isinstance(e.orig, QueryCanceled):
+                raise ServiceUnavailableError(
+                    "Autocomplete took too long, please try again.", retry_after=1
+                ) from e
+            raise
+
+
+class AsyncPartCRUD(AsyncBaseCRUD[PartModel, PartCreateSchema, PartUpdateSchema]):
+    @classmethod
+    def get_sync_crud(cls) -> type[PartCRUD]:
+        return PartCRUD
+
+    @classmethod
+    async def autocomplete(
+        cls, db_session: AsyncSession, q: str, limit: int
+    ) -> list[Row[tuple[UUID, str]]]:
+        return await db_session.run_sync(PartCRUD.autocomplete, q=q, limit=limit)
@@ -0,0 +1,64 @@
+from typing import Any, NamedTuple, TypeVar
+
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute, Query
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.crud.filter_operators import FilterOperator
+from app.models.base_model import BaseModel
+
+# queries of any entity, and selects of any number of columns
+QueryType = TypeVar("QueryType", Query[Any], Select[*tuple[Any, ...]])
+
+# Execution option used to remember which related models a query already joins.
+# Execution options are not part of the statement cache key.
+JOINED_MODELS_OPTION = "crud_joined_models"
+
+
+class FilterPlanItem(NamedTuple):
+    column: InstrumentedAttribute[Any]
+    operator: FilterOperator
+
+
+class FilterPlan(NamedTuple):
+    """
+    The resolved form of a filter shape: the related models to join and one
+    item per filter (None for filters that are skipped because they are empty).
+    The items are in the order of the filters, so applying the plan only binds
+    the filter values.
+    """
+
+    joins: tuple[type[BaseModel], ...]
+    items: tuple[FilterPlanItem | None, ...]
+
+
+class SortPlan(NamedTuple):
+    joins: tuple[type[BaseModel], ...]
+    order_by: tuple[ColumnElement[Any], ...]
+
+
+class CursorKey(NamedTuple):
+    key: str
+    column: InstrumentedAttribute[Any]
+    descending: bool
+
+
+def apply_joins[QueryT: (Query[Any], Select[Any])](
+    query: QueryT, joins: tuple[type[BaseModel], ...]
+) -> QueryT:
+    """
+    Joins the related models the query does not join yet.
+    """
+    if not joins:
+        return query
+
+    joined: frozenset[type[BaseModel]] = query.get_execution_options().get(
+        JOINED_MODELS_OPTION, frozenset()
+    )
+    missing = [model for model in joins if model not in joined]
+    if not missing:
+        return query
+
+    for model in missing:
+        query = query.join(model)
+    return query.execution_options(**{JOINED_MODELS_OPTION: joined.union(missing)})
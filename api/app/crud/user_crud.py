@@ -1,3 +1,4 @@
+from app.crud.async_base_crud import AsyncBaseCRUD
 from app.crud.base_crud import BaseCRUD
 from app.models.user_model import UserModel
 from app.schemas.user_schemas import UserCreateSchema, UserSchema, UserUpdateSchema
@@ -7,3 +8,9 @@ class UserCRUD(BaseCRUD[UserModel, UserSchema, UserCreateSchema, UserUpdateSchem
     @classmethod
     def get_model(cls) -> type[UserModel]:
         return UserModel
+
+
+class AsyncUserCRUD(AsyncBaseCRUD[UserModel, UserCreateSchema, UserUpdateSchema]):
+    @classmethod
+    def get_sync_crud(cls) -> type[UserCRUD]:
+        return UserCRUD
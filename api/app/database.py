@@ -1,27 +1,234 @@
-from collections.abc import Generator
+import time
+from collections.abc import AsyncGenerator, Callable, Generator, Mapping
+from functools import lru_cache
+from typing import NamedTuple
 
-from sqlalchemy import Integer, create_engine
+from fastapi import Request
+from sqlalchemy import Connection, Engine, Integer, create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, sessionmaker
 
+from app.pool_monitor import (
+    MonitoredAsyncQueuePool,
+    MonitoredQueuePool,
+    PoolAdmission,
+    PoolMonitor,
+)
+from app.replicas import ON_REPLICA_KEY, READ_PRIMARY_KEY, DatabaseNode, ReplicaRouter
 from app.settings import env
 
 credentials = f"{env.db_user}:{env.db_password}"
 host = f"{env.db_hostname}:{env.db_port}"
 SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg://{credentials}@{host}/{env.db_database}"
+REPLICA_DATABASE_URLS = [
+    f"postgresql+psycopg://{credentials}@{replica}/{env.db_database}"
+    for replica in env.db_replicas
+]
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"connect_timeout": 10})
-DatabaseSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+POOL_OPTIONS = {
+    "pool_size": env.db_pool_size,
+    "max_overflow": env.db_pool_max_overflow,
+    "pool_timeout": env.db_pool_timeout,
+    "pool_recycle": env.db_pool_recycle,
+    "pool_pre_ping": env.db_pool_pre_ping,
+    "pool_use_lifo": env.db_pool_use_lifo,
+}
+
+
+class SessionPolicy(NamedTuple):
+    """How the sessions of a route run their transactions."""
+
+    # the transactions are READ ONLY: Postgres rejects their writes and
+    # skips the bookkeeping of transactions that may write
+    read_only: bool
+    # the entities expire when the session commits, touching them afterwards
+    # (e.g. while serializing the response) reloads them
+    expire_on_commit: bool = False
+    autoflush: bool = False
+
+
+# The policy of the routes that only read (GET and HEAD)
+READ_POLICY = SessionPolicy(read_only=True)
+# The policy of the routes that write: the entities they return are serialized
+# from what the writes returned, without reloading them after the commit
+WRITE_POLICY = SessionPolicy(read_only=False)
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+# Cookie telling until when (a UNIX time) the reads of a client go to the
+# primary, set by the responses to its writes
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+def get_request_policy(request: Request) -> SessionPolicy:
+    return READ_POLICY if request.method in READ_METHODS else WRITE_POLICY
+
+
+def reads_primary(cookies: Mapping[str, str]) -> bool:
+    """Tells if the client wrote recently, and must read its writes."""
+    try:
+        return float(cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_source_info(*, primary: bool, on_replica: bool) -> dict[str, bool]:
+    """
+    The Session.info of a session, telling the caches if its reads must see
+    the client's latest writes, or come from a replica.
+    """
+    info = {}
+    if primary:
+        info[READ_PRIMARY_KEY] = True
+    if on_replica:
+        info[ON_REPLICA_KEY] = True
+    return info
+
+
+@lru_cache
+def policy_sessionmaker(
+    policy: SessionPolicy, bind: Engine | Connection
+) -> sessionmaker[Session]:
+    # psycopg opens the transactions with BEGIN READ ONLY, so it costs no round
+    # trip, and the connection is reset when it returns to the pool
+    if policy.read_only:
+        bind = bind.execution_options(postgresql_readonly=True)
+    return sessionmaker(
+        bind=bind,
+        autoflush=policy.autoflush,
+        expire_on_commit=policy.expire_on_commit,
+    )
+
+
+@lru_cache
+def async_policy_sessionmaker(
+    policy: SessionPolicy, bind: AsyncEngine
+) -> async_sessionmaker[AsyncSession]:
+    if policy.read_only:
+        bind = bind.execution_options(postgresql_readonly=True)
+    return async_sessionmaker(
+        bind=bind,
+        autoflush=policy.autoflush,
+        expire_on_commit=policy.expire_on_commit,
+    )
+
+
+def create_node(url: str, name: str) -> DatabaseNode[Engine]:
+    engine = create_engine(
+        url,
+        connect_args={"connect_timeout": 10},
+        poolclass=MonitoredQueuePool,
+        **POOL_OPTIONS,
+    )
+    monitor = PoolMonitor.attach(engine, name, max_overflow=env.db_pool_max_overflow)
+    admission = PoolAdmission(monitor, env.db_pool_wait_budget_ms)
+    return DatabaseNode(engine, admission)
+
+
+def create_async_node(url: str, name: str) -> DatabaseNode[AsyncEngine]:
+    # psycopg 3 serves both the sync and the async engine with the same URL
+    engine = create_async_engine(
+        url,
+        connect_args={"connect_timeout": 10},
+        poolclass=MonitoredAsyncQueuePool,
+        **POOL_OPTIONS,
+    )
+    monitor = PoolMonitor.attach(
+        engine.sync_engine, f"async-{name}", max_overflow=env.db_pool_max_overflow
+    )
+    return DatabaseNode(engine, PoolAdmission(monitor, env.db_pool_wait_budget_ms))
+
+
+replica_router = ReplicaRouter(
+    create_node(SQLALCHEMY_DATABASE_URL, "primary"),
+    [
+        create_node(url, f"replica-{index}")
+        for index, url in enumerate(REPLICA_DATABASE_URLS)
+    ],
+    env.db_replica_balancing,
+)
+engine = replica_router.primary.engine
+pool_admission = replica_router.primary.admission
+pool_monitor = pool_admission.monitor
+DatabaseSession = policy_sessionmaker(WRITE_POLICY, engine)
 DbSession = Session
 
+async_replica_router = ReplicaRouter(
+    create_async_node(SQLALCHEMY_DATABASE_URL, "primary"),
+    [
+        create_async_node(url, f"replica-{index}")
+        for index, url in enumerate(REPLICA_DATABASE_URLS)
+    ],
+    env.db_replica_balancing,
+)
+async_engine = async_replica_router.primary.engine
+async_pool_admission = async_replica_router.primary.admission
+async_pool_monitor = async_pool_admission.monitor
+# Attributes must not expire on commit with any policy: an expired attribute
+# can't be loaded lazily outside of the session's greenlet (e.g. while
+# serializing the response)
+AsyncDatabaseSession = async_policy_sessionmaker(WRITE_POLICY, async_engine)
+
 
 class Base(DeclarativeBase):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
 
-def get_db_session() -> Generator[Session]:
-    session = DatabaseSession()
+def session_dependency(
+    policy: SessionPolicy | None = None,
+) -> Callable[[Request], Generator[Session]]:
+    """
+    Returns a dependency yielding sessions of the policy, or by default of the
+    policy of the request's method. The read-only sessions go to a replica,
+    unless the client must read its recent writes from the primary.
+    """
 
-    try:
-        yield session
-    finally:
-        session.close()
+    def get_session(request: Request) -> Generator[Session]:
+        session_policy = policy or get_request_policy(request)
+        primary = reads_primary(request.cookies)
+        node = replica_router.route(read_only=session_policy.read_only, primary=primary)
+        info = read_source_info(
+            primary=primary, on_replica=node is not replica_router.primary
+        )
+        # fail fast instead of queueing for a connection beyond the wait budget
+        with node.admission.admit():
+            session = policy_sessionmaker(session_policy, node.engine)(info=info)
+
+            try:
+                yield session
+            finally:
+                session.close()
+
+    return get_session
+
+
+def async_session_dependency(
+    policy: SessionPolicy | None = None,
+) -> Callable[[Request], AsyncGenerator[AsyncSession]]:
+    """The async variant of session_dependency."""
+
+    async def get_session(request: Request) -> AsyncGenerator[AsyncSession]:
+        session_policy = policy or get_request_policy(request)
+        primary = reads_primary(request.cookies)
+        node = async_replica_router.route(
+            read_only=session_policy.read_only, primary=primary
+        )
+        info = read_source_info(
+            primary=primary, on_replica=node is not async_replica_router.primary
+        )
+        sessions = async_policy_sessionmaker(session_policy, node.engine)
+        async with node.admission.admit_async(), sessions(info=info) as session:
+            yield session
+
+    return get_session
+
+
+# the sessions of the routes, shared by their dependencies (like the current
+# user) within a request
+get_db_session = session_dependency()
+get_async_db_session = async_session_dependency()
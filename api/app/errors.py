@@ -13,6 +13,12 @@ class NotUniqueError(HTTPException):
         super().__init__(409, details)
 
 
+class ServiceUnavailableError(HTTPException):
+    def __init__(self, details: str, retry_after: int | None = None):
+        headers = None if retry_after is None else {"Retry-After": str(retry_after)}
+        super().__init__(503, details, headers)
+
+
 async def default_http_error_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
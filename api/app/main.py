@@ -1,20 +1,45 @@
 from contextlib import asynccontextmanager
 from typing import Annotated
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
-from app import errors, settings
-from app.database import DbSession, get_db_session
-from app.routers import comment_router, part_router
+from app import errors, metrics, settings
+from app.cache.invalidation import get_invalidation_listener
+from app.crud.history_writer import get_history_writer
+from app.database import (
+    DbSession,
+    get_db_session,
+    pool_admission,
+    pool_monitor,
+    replica_router,
+)
+from app.request_metrics import InstrumentedRoute, RequestMetricsMiddleware
+from app.routers import (
+    async_comment_router,
+    async_part_router,
+    comment_router,
+    export_router,
+    part_router,
+)
+from app.utils.read_your_writes import ReadYourWritesMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup logic (ileride)
+    if settings.env.cache_notify:
+        get_invalidation_listener().start()
+    # started in the worker, after the fork
+    if metrics.multiprocess_store is not None:
+        metrics.multiprocess_store.start()
     yield
-    # shutdown logic (ileride)
+    get_invalidation_listener().close()
+    # write the history records still queued by an ASYNC history writer
+    get_history_writer().close()
+    if metrics.multiprocess_store is not None:
+        metrics.multiprocess_store.close()
 
 
 app = FastAPI(
@@ -23,6 +48,7 @@ app = FastAPI(
     lifespan=lifespan,
     root_path="/api",
 )
+app.router.route_class = InstrumentedRoute
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,10 +58,25 @@ app.add_middleware(
     allow_origins=["*"],
 )
 
+# without replicas every read goes to the primary already
+if replica_router.replicas:
+    app.add_middleware(
+        ReadYourWritesMiddleware, stickiness=settings.env.db_replica_stickiness_s
+    )
+
+# outermost, so the Server-Timing header covers the other middleware
+if settings.env.request_metrics:
+    app.add_middleware(RequestMetricsMiddleware)
+
 errors.register_error_handlers(app)
 
-app.include_router(part_router.app_router)
-app.include_router(comment_router.app_router)
+app.include_router(export_router.app_router)
+if settings.env.async_database:
+    app.include_router(async_part_router.app_router)
+    app.include_router(async_comment_router.app_router)
+else:
+    app.include_router(part_router.app_router)
+    app.include_router(comment_router.app_router)
 
 
 @app.get("/health-check", tags=["Health"])
@@ -55,5 +96,17 @@ def health_check(
     return {
         "status": "ok",
         "app": {"version": settings.env.app_version},
-        "db": {"version": res[0]},
+        "db": {
+            "version": res[0],
+            "pool": {**pool_monitor.snapshot(), **pool_admission.snapshot()},
+            "replicas": [
+                {**replica.admission.monitor.snapshot(), **replica.admission.snapshot()}
+                for replica in replica_router.replicas
+            ],
+        },
     }
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def get_metrics() -> Response:
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,493 @@
+import bisect
+import json
+import logging
+import math
+import os
+import pathlib
+import threading
+import time
+import weakref
+from collections.abc import Callable, Generator, Iterable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import ClassVar, Literal, NamedTuple
+
+from app.cache.ttl_cache import TTLCache
+from app.settings import env
+
+logger = logging.getLogger(__name__)
+
+type MetricKind = Literal["counter", "gauge", "histogram"]
+
+# Upper bounds (in seconds) of the buckets of the latency histograms
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Counter of the lookups of the caches, by cache and result (hit or miss)
+CACHE_LOOKUPS = "cache_lookups_total"
+
+
+class Family(NamedTuple):
+    """
+    The samples of a metric by the values of its labels. The sample of a
+    counter or a gauge is [value], the sample of a histogram holds the count
+    of each bucket, of the observations beyond the last bucket and their sum.
+    """
+
+    name: str
+    kind: MetricKind
+    help: str
+    label_names: tuple[str, ...]
+    samples: dict[tuple[str, ...], list[float]]
+    buckets: tuple[float, ...] = ()
+
+
+class Metric:
+    """
+    A metric recorded per thread: each thread updates a shard of its own
+    without taking a lock, and the shards are added up when it is collected.
+    A collection may miss the update in progress, never lose it. The shards
+    of the threads that exited are folded into a base total when a new thread
+    records its first value, so the shards don't pile up with the threads.
+    """
+
+    kind: ClassVar[MetricKind]
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = (),
+        registry: MetricsRegistry | None = None,
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._size = len(buckets) + 2 if self.kind == "histogram" else 1
+        self._local = threading.local()
+        # the shards of the live threads, the thread is referenced weakly
+        self._shards: list[
+            tuple[weakref.ref[threading.Thread], dict[tuple[str, ...], list[float]]]
+        ] = []
+        # the values of the threads that exited
+        self._base: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+        (registry or default_registry).register(self)
+
+    def __values__(self, labels: tuple[str, ...]) -> list[float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            thread = weakref.ref(threading.current_thread())
+            with self._lock:
+                self.__fold_dead_shards__()
+                self._shards.append((thread, shard))
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = [0.0] * self._size
+        return values
+
+    def __fold_dead_shards__(self) -> None:
+        """Adds the shards of the threads that exited to the base total."""
+        live = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                live.append((thread_ref, shard))
+            else:
+                # the thread is gone, its shard won't change anymore
+                for labels, values in shard.items():
+                    add_values(self._base, labels, values)
+        self._shards = live
+
+    def collect(self) -> Family:
+        samples: dict[tuple[str, ...], list[float]] = {}
+        with self._lock:
+            for labels, values in self._base.items():
+                add_values(samples, labels, values)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            # copied first, the thread of the shard may add labels meanwhile
+            for labels, values in list(shard.items()):
+                add_values(samples, labels, values)
+        return Family(
+            self.name, self.kind, self.help, self.label_names, samples, self.buckets
+        )
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.__values__(labels)[0] += amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.__values__(labels)[0] += amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.__values__(labels)[0] -= amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        registry: MetricsRegistry | None = None,
+    ):
+        super().__init__(name, help, label_names, buckets=buckets, registry=registry)
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = self.__values__(labels)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Generator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+
+class MetricsRegistry:
+    """
+    The metrics of the process, and the collectors computing metrics when
+    they are scraped (e.g. from the pool monitors and the caches).
+    """
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def register_collector(self, collect: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(collect)
+
+    def collect(self) -> list[Family]:
+        families = [metric.collect() for metric in self._metrics]
+        for collect in self._collectors:
+            families.extend(collect())
+        return families
+
+
+default_registry = MetricsRegistry()
+
+
+def add_values(
+    samples: dict[tuple[str, ...], list[float]],
+    labels: tuple[str, ...],
+    values: list[float],
+) -> None:
+    total = samples.get(labels)
+    if total is None:
+        samples[labels] = list(values)
+    else:
+        for index, value in enumerate(values):
+            total[index] += value
+
+
+def merge_families(families: Iterable[Family]) -> list[Family]:
+    """Adds up the samples of the families with the same name."""
+    merged: dict[str, Family] = {}
+    for family in families:
+        total = merged.get(family.name)
+        if total is None:
+            total = merged[family.name] = family._replace(samples={})
+        for labels, values in family.samples.items():
+            add_values(total.samples, labels, values)
+    return list(merged.values())
+
+
+def hit_ratios(families: Iterable[Family]) -> Family:
+    """The hit ratio of each cache, from the lookups of all the processes."""
+    lookups: dict[str, dict[str, float]] = {}
+    for family in families:
+        if family.name == CACHE_LOOKUPS:
+            for (cache, result), (count,) in family.samples.items():
+                lookups.setdefault(cache, {})[result] = count
+    return Family(
+        "cache_hit_ratio",
+        "gauge",
+        "Share of the cache lookups that were hits.",
+        ("cache",),
+        {
+            (cache,): [counts.get("hit", 0) / total]
+            for cache, counts in lookups.items()
+            if (total := sum(counts.values()))
+        },
+    )
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def escape(text: str) -> str:
+    return text.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def format_sample(name: str, labels: Iterable[tuple[str, str]], value: float) -> str:
+    pairs = ",".join(f'{label}="{escape(text)}"' for label, text in labels)
+    if pairs:
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {format_value(value)}"
+
+
+def exposition(families: Iterable[Family]) -> str:
+    """Renders the families in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for family in families:
+        help_text = family.help.replace("\\", r"\\").replace("\n", r"\n")
+        lines.append(f"# HELP {family.name} {help_text}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for labels, values in sorted(family.samples.items()):
+            pairs = list(zip(family.label_names, labels, strict=True))
+            if family.kind != "histogram":
+                lines.append(format_sample(family.name, pairs, values[0]))
+                continue
+            cumulative = 0.0
+            for bound, count in zip((*family.buckets, math.inf), values, strict=False):
+                cumulative += count
+                lines.append(
+                    format_sample(
+                        f"{family.name}_bucket",
+                        [*pairs, ("le", format_value(bound))],
+                        cumulative,
+                    )
+                )
+            lines.append(format_sample(f"{family.name}_sum", pairs, values[-1]))
+            lines.append(format_sample(f"{family.name}_count", pairs, cumulative))
+    return "\n".join(lines) + "\n"
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MultiprocessStore:
+    """
+    Shares the metrics of the workers of a multi-worker deployment: each
+    worker writes its metrics to a file of its own in the directory, now and
+    then and whenever it is scraped, and a scrape adds up the files of all the
+    workers. The counters and histograms of the workers that exited are kept,
+    their gauges are dropped. The directory should be emptied when the
+    deployment starts.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        interval: float,
+        registry: MetricsRegistry = default_registry,
+    ):
+        self.directory = pathlib.Path(directory)
+        self.interval = interval
+        self.registry = registry
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def write(self, families: Iterable[Family]) -> None:
+        # the workers fork after the import, so the PID is read every time
+        pid = os.getpid()
+        path = self.directory / f"{pid}.json"
+        temporary = self.directory / f"{pid}.json.tmp"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        content = [
+            [
+                family.name,
+                family.kind,
+                family.help,
+                family.label_names,
+                list(family.samples.items()),
+                family.buckets,
+            ]
+            for family in families
+        ]
+        temporary.write_text(json.dumps(content))
+        # readers never see a file half written
+        temporary.replace(path)
+
+    def read(self) -> list[Family]:
+        families: list[Family] = []
+        for path in self.directory.glob("*.json"):
+            if not path.stem.isdigit():
+                continue
+            # skips the files removed meanwhile, or not written by a worker
+            try:
+                content = json.loads(path.read_text())
+            except OSError:
+                continue
+            except ValueError:
+                continue
+            pid = int(path.stem)
+            alive = pid == os.getpid() or is_alive(pid)
+            for name, kind, help, label_names, samples, buckets in content:
+                if kind == "gauge" and not alive:
+                    continue
+                families.append(
+                    Family(
+                        name,
+                        kind,
+                        help,
+                        tuple(label_names),
+                        {tuple(labels): values for labels, values in samples},
+                        tuple(buckets),
+                    )
+                )
+        return merge_families(families)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self.__run__, name="metrics", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stops the periodic writes and writes the final metrics."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        self.write(self.registry.collect())
+
+    def __run__(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write(self.registry.collect())
+            except Exception:
+                logger.exception("Could not write the metrics of the process.")
+
+
+multiprocess_store = (
+    MultiprocessStore(env.metrics_multiprocess_dir, env.metrics_write_interval_s)
+    if env.metrics_multiprocess_dir
+    else None
+)
+
+
+def render(registry: MetricsRegistry = default_registry) -> str:
+    """The metrics to scrape, of all the workers in multiprocess mode."""
+    families = registry.collect()
+    if multiprocess_store is not None:
+        multiprocess_store.write(families)
+        families = multiprocess_store.read()
+    else:
+        families = merge_families(families)
+    families.append(hit_ratios(families))
+    return exposition(families)
+
+
+# the CRUD method running the statements, as the name of its class and its
+# own name. The outermost method wins: its statements include those of the
+# methods it calls
+current_crud_method: ContextVar[tuple[str, str] | None] = ContextVar(
+    "current_crud_method", default=None
+)
+
+
+def crud_method[**P, R](method: Callable[P, R]) -> Callable[P, R]:
+    """Labels the statements of the CRUD class method with its name."""
+
+    @wraps(method)
+    def labelled(*args: P.args, **kwargs: P.kwargs) -> R:
+        if current_crud_method.get() is not None:
+            return method(*args, **kwargs)
+        token = current_crud_method.set((args[0].__name__, method.__name__))  # type: ignore
+        try:
+            return method(*args, **kwargs)
+        finally:
+            current_crud_method.reset(token)
+
+    return labelled
+
+
+# the caches whose lookups are exported, by their name
+watched_caches: dict[str, TTLCache] = {}
+
+
+def watch_cache(name: str, cache: TTLCache) -> None:
+    watched_caches[name] = cache
+
+
+def collect_cache_lookups() -> Iterable[Family]:
+    samples: dict[tuple[str, ...], list[float]] = {}
+    for name, cache in watched_caches.items():
+        samples[(name, "hit")] = [cache.hits]
+        samples[(name, "miss")] = [cache.misses]
+    yield Family(
+        CACHE_LOOKUPS,
+        "counter",
+        "Lookups of the caches, by their result.",
+        ("cache", "result"),
+        samples,
+    )
+
+
+default_registry.register_collector(collect_cache_lookups)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latency of the requests until their response is sent, by route template.",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being served.")
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Latency of the statements run by the CRUD methods.",
+    ("crud", "method"),
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a connection of the pool.",
+    ("pool",),
+)
+HISTORY_WRITE_DURATION = Histogram(
+    "history_write_duration_seconds",
+    "Latency of the inserts of the history records, by history mode.",
+    ("mode",),
+)
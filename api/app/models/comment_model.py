@@ -1,18 +1,32 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base_model import BaseModel
 from app.models.mixins.blameable_mixin import BlameableMixin
+from app.models.mixins.history_mixin import HistoryMixin
 from app.models.mixins.id_mixin import IdMixin
+from app.models.mixins.searchable_mixin import SearchableMixin
+from app.models.mixins.soft_deletable_mixin import SoftDeletableMixin
 from app.models.part_model import PartModel
 
 
-class CommentModel(BaseModel, IdMixin, BlameableMixin):
+class CommentModel(
+    BaseModel,
+    IdMixin,
+    BlameableMixin,
+    SearchableMixin,
+    SoftDeletableMixin,
+    HistoryMixin,
+):
     __tablename__ = "comments"
+    __search_columns__ = ("content",)
+    __table_args__ = (
+        Index("ix_comments_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
-    part_id: Mapped[UUID] = mapped_column(ForeignKey("parts.id"))
+    part_id: Mapped[UUID] = mapped_column(ForeignKey("parts.id"), index=True)
     content: Mapped[str] = mapped_column(String(2028))
 
     # Many-to-one relationship: each comment belongs to a single part
@@ -1,43 +1,56 @@
-import json
-from typing import Any
+from typing import Any, override
 from uuid import UUID
 
+from psycopg.types.json import Jsonb
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_json
 from sqlalchemy import ForeignKey
 from sqlalchemy.dialects.postgresql import JSON, JSONB
 from sqlalchemy.engine.interfaces import Dialect
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.type_api import _BindProcessorType
 from sqlalchemy.types import TypeDecorator
 
 from app.models.base_model import BaseModel
 from app.models.mixins.created_at_mixin import CreatedAtMixin
 from app.models.mixins.id_mixin import IdMixin
 from app.schemas.history_schemas import HistoryAction, ValueChangeSchema
+from app.settings import env
+
+# validates the changes in the validating mode of ChangesJSON
+CHANGES_ADAPTER = TypeAdapter(dict[str, ValueChangeSchema])
 
 
 class ChangesJSON(TypeDecorator[dict[str, Any]]):
+    """
+    Serializes the changes to JSON once, with pydantic's serializer, and
+    hands the bytes to the driver. The changes come from an already validated
+    HistoryCreateSchema, so they are trusted unless HISTORY_VALIDATE_CHANGES
+    asks to validate them again.
+    """
+
     impl = JSONB
+    cache_ok = True
+
+    @staticmethod
+    def dumps(value: dict[str, Any]) -> bytes:
+        if env.history_validate_changes:
+            try:
+                return CHANGES_ADAPTER.dump_json(CHANGES_ADAPTER.validate_python(value))
+            except ValidationError as e:
+                raise ValueError(f"Invalid JSON format: {e}")
+        return to_json(value)
+
+    @override
+    def bind_processor(self, dialect: Dialect) -> _BindProcessorType[dict[str, Any]]:
+        # replaces the processor of JSONB, which would serialize the value
+        # with the json module again
+        def process(value: dict[str, Any] | None) -> Jsonb | None:
+            if value is None:
+                return None
+            return Jsonb(value, dumps=self.dumps)
 
-    def process_bind_param(  # noqa: PLR6301
-        self, value: dict[str, Any] | None, dialect: Dialect
-    ) -> str | None:
-        if value is None:
-            return None
-
-        # ensure each value in the dict is valid ValueChangeSchema
-        try:
-            for val in value.values():
-                ValueChangeSchema(**val)
-        except ValueError as e:
-            raise ValueError(f"Invalid JSON format: {e}")
-
-        return json.dumps(value)
-
-    def process_result_value(  # noqa: PLR6301
-        self, value: Any, dialect: Dialect
-    ) -> dict[str, Any] | None:
-        if isinstance(value, str):
-            return json.loads(value)
-        return value
+        return process
 
 
 class HistoryModel(BaseModel, IdMixin, CreatedAtMixin):
@@ -0,0 +1,14 @@
+from typing import ClassVar
+
+
+class HistoryMixin:
+    """
+    Records the changes of the entity in the history table. Changes flushed by
+    the unit of work are captured from the attribute history of the entity,
+    the RETURNING writes of the CRUD classes record the rows they return.
+    """
+
+    # columns whose changes are not recorded
+    __history_exclude__: ClassVar[frozenset[str]] = frozenset(
+        {"created_at", "created_by", "updated_at", "updated_by"}
+    )
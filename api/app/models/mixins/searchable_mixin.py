@@ -0,0 +1,31 @@
+from typing import Any
+
+from sqlalchemy import Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
+
+# Text search configuration of the search vectors. 'simple' does not stem
+# words, which keeps part numbers and names searchable by prefix.
+SEARCH_CONFIG = "simple"
+
+
+class SearchableMixin:
+    """
+    Adds a generated `search_vector` tsvector column built from the columns
+    listed in `__search_columns__`. Models should add a GIN index on it.
+    """
+
+    __search_columns__: tuple[str, ...] = ()
+
+    @declared_attr
+    def search_vector(cls) -> Mapped[Any]:  # noqa: N805
+        document = " || ' ' || ".join(
+            f"coalesce({column}, '')" for column in cls.__search_columns__
+        )
+        # deferred, so the vector is never loaded (or diffed into history)
+        # together with the entity
+        return mapped_column(
+            TSVECTOR,
+            Computed(f"to_tsvector('{SEARCH_CONFIG}', {document})", persisted=True),
+            deferred=True,
+        )
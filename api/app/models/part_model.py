@@ -1,15 +1,44 @@
 from __future__ import annotations
 
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base_model import BaseModel
 from app.models.mixins.blameable_mixin import BlameableMixin
+from app.models.mixins.history_mixin import HistoryMixin
 from app.models.mixins.id_mixin import IdMixin
+from app.models.mixins.searchable_mixin import SearchableMixin
+from app.models.mixins.soft_deletable_mixin import SoftDeletableMixin
 
 
-class PartModel(BaseModel, IdMixin, BlameableMixin):
+class PartModel(
+    BaseModel,
+    IdMixin,
+    BlameableMixin,
+    SearchableMixin,
+    SoftDeletableMixin,
+    HistoryMixin,
+):
     __tablename__ = "parts"
+    __search_columns__ = ("name", "description")
+    __table_args__ = (
+        Index("ix_parts_search_vector", "search_vector", postgresql_using="gin"),
+        # trigram indexes on the name (need the pg_trgm extension): GIN serves the
+        # substring and similarity filters, GiST the top-N by similarity ordering
+        # of the autocomplete
+        Index(
+            "ix_parts_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_parts_name_trgm_gist",
+            "name",
+            postgresql_using="gist",
+            postgresql_ops={"name": "gist_trgm_ops"},
+        ),
+    )
 
     name: Mapped[str] = mapped_column(String(256), unique=True)
     description: Mapped[str | None] = mapped_column(String(1024), nullable=True)
@@ -5,10 +5,11 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base_model import BaseModel
 from app.models.mixins.created_at_mixin import CreatedAtMixin
+from app.models.mixins.history_mixin import HistoryMixin
 from app.models.mixins.id_mixin import IdMixin
 
 
-class UserModel(BaseModel, IdMixin, CreatedAtMixin):
+class UserModel(BaseModel, IdMixin, CreatedAtMixin, HistoryMixin):
     __tablename__ = "users"
 
     name: Mapped[str] = mapped_column(unique=True)
@@ -0,0 +1,312 @@
+import asyncio
+import math
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator, Iterable
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    PoolProxiedConnection,
+    QueuePool,
+)
+
+from app.errors import ServiceUnavailableError
+from app.metrics import DB_POOL_WAIT, Family, default_registry
+from app.request_metrics import record_pool_wait
+
+# Weight of the latest checkout in the moving average of the hold time
+HOLD_TIME_WEIGHT = 0.1
+
+# the monitors of the engines' pools, exported to /metrics
+attached_monitors: list[PoolMonitor] = []
+
+
+class PoolMonitor:
+    """
+    Tracks the saturation of a connection pool: connections in use, checkouts
+    waiting for one, how long they waited and how long connections are held.
+    """
+
+    def __init__(self, capacity: int | None, name: str = "pool"):
+        # None for pools without a limit on the overflow
+        self.capacity = capacity
+        # labels the metrics of the pool
+        self.name = name
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.hold_time_avg = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def attach(
+        cls, engine: Engine, name: str = "pool", *, max_overflow: int
+    ) -> PoolMonitor:
+        """
+        Creates a monitor for the engine's pool, created with the given
+        max_overflow (the pool doesn't tell it). The pool must be a monitored
+        pool class to report the wait times, the rest is recorded through the
+        pool events (which stay registered when the pool is recreated).
+        """
+        pool = engine.pool
+        if not isinstance(pool, MonitoredPoolMixin) or not isinstance(pool, QueuePool):
+            raise TypeError(f"{type(pool).__name__} is not a monitored pool.")
+
+        monitor = cls(
+            capacity=pool.size() + max_overflow if max_overflow >= 0 else None,
+            name=name,
+        )
+        pool.monitor = monitor
+        event.listen(engine, "checkout", monitor.on_checkout)
+        event.listen(engine, "checkin", monitor.on_checkin)
+        attached_monitors.append(monitor)
+        return monitor
+
+    @contextmanager
+    def measure_wait(self) -> Generator[None]:
+        with self._lock:
+            self.waiting += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wait_time = time.perf_counter() - start
+            with self._lock:
+                self.waiting -= 1
+                self.wait_time_total += wait_time
+                self.wait_time_max = max(self.wait_time_max, wait_time)
+            record_pool_wait(wait_time)
+            DB_POOL_WAIT.observe(wait_time, self.name)
+
+    def on_checkout(
+        self, dbapi_connection: Any, record: ConnectionPoolEntry, proxy: Any
+    ) -> None:
+        record.info["checked_out_at"] = time.perf_counter()
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+
+    def on_checkin(self, dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        checked_out_at = record.info.pop("checked_out_at", None)
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+            if checked_out_at is not None:
+                hold_time = time.perf_counter() - checked_out_at
+                self.hold_time_avg += HOLD_TIME_WEIGHT * (
+                    hold_time - self.hold_time_avg
+                )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "wait_time_avg_ms": self.wait_time_total / self.checkouts * 1000
+            if self.checkouts
+            else 0.0,
+            "wait_time_max_ms": self.wait_time_max * 1000,
+            "hold_time_avg_ms": self.hold_time_avg * 1000,
+        }
+
+
+def collect_pool_usage() -> Iterable[Family]:
+    monitors = list(attached_monitors)
+    yield Family(
+        "db_pool_connections_in_use",
+        "gauge",
+        "Connections checked out of the pool.",
+        ("pool",),
+        {(monitor.name,): [monitor.in_use] for monitor in monitors},
+    )
+    yield Family(
+        "db_pool_checkouts_waiting",
+        "gauge",
+        "Checkouts waiting for a connection of the pool.",
+        ("pool",),
+        {(monitor.name,): [monitor.waiting] for monitor in monitors},
+    )
+    yield Family(
+        "db_pool_capacity",
+        "gauge",
+        "Connections the pool may hold, the pools without a limit are left out.",
+        ("pool",),
+        {
+            (monitor.name,): [monitor.capacity]
+            for monitor in monitors
+            if monitor.capacity is not None
+        },
+    )
+    yield Family(
+        "db_pool_checkouts_total",
+        "counter",
+        "Connections checked out of the pool.",
+        ("pool",),
+        {(monitor.name,): [monitor.checkouts] for monitor in monitors},
+    )
+
+
+default_registry.register_collector(collect_pool_usage)
+
+
+class MonitoredPoolMixin:
+    """
+    Pool events only fire once a connection was checked out, so the time spent
+    waiting for it is measured around the pool's connect(). It includes the
+    time spent opening a new connection and pinging it.
+    """
+
+    monitor: PoolMonitor | None = None
+
+    def connect(self) -> PoolProxiedConnection:
+        if self.monitor is None:
+            return super().connect()  # type: ignore
+        with self.monitor.measure_wait():
+            return super().connect()  # type: ignore
+
+    def recreate(self) -> Any:
+        pool = super().recreate()  # type: ignore
+        pool.monitor = self.monitor
+        return pool
+
+
+class MonitoredQueuePool(MonitoredPoolMixin, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(MonitoredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolAdmission:
+    """
+    Admission control in front of a monitored pool.
+
+    Sessions are admitted up to the capacity of the pool, so an admitted request
+    never queues for a connection. Sessions are created before the first query
+    checks out a connection, which is why the pool itself can't be asked if a
+    connection is free. A request beyond the capacity waits for a slot within
+    the wait budget and gets a 503 with Retry-After when the budget runs out,
+    or right away when the expected wait already exceeds it.
+
+    Only the sessions of the requests are admitted: the background thread of
+    the QueuedHistoryWriter opens its connections outside of the admission
+    control, and may take a connection an admitted request counted on.
+    """
+
+    def __init__(self, monitor: PoolMonitor, wait_budget_ms: int):
+        self.monitor = monitor
+        # a budget of 0 admits every request
+        self.wait_budget = wait_budget_ms / 1000
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        capacity = monitor.capacity or 0
+        self._slots = threading.BoundedSemaphore(capacity) if capacity else None
+        self._async_slots: asyncio.Semaphore | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.wait_budget) and self.monitor.capacity is not None
+
+    def expected_wait(self) -> float:
+        """
+        Estimates in seconds how long a new request would wait for a slot:
+        nothing while a slot is free, otherwise the time the pool needs to serve
+        the queued requests and the new one at the average hold time.
+        """
+        capacity = self.monitor.capacity
+        if capacity is None or self.admitted < capacity:
+            return 0.0
+        return (self.queued + 1) * self.monitor.hold_time_avg / capacity
+
+    @contextmanager
+    def admit(self) -> Generator[None]:
+        if not self.enabled or self._slots is None:
+            yield
+            return
+
+        self.__queue__()
+        acquired = False
+        try:
+            acquired = self._slots.acquire(timeout=self.wait_budget)
+        finally:
+            self.__dequeue__(admitted=acquired)
+        if not acquired:
+            self.__reject__()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.admitted -= 1
+            self._slots.release()
+
+    @asynccontextmanager
+    async def admit_async(self) -> AsyncGenerator[None]:
+        if not self.enabled or self.monitor.capacity is None:
+            yield
+            return
+
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.monitor.capacity)
+        slots = self._async_slots
+
+        self.__queue__()
+        acquired = False
+        try:
+            async with asyncio.timeout(self.wait_budget):
+                acquired = await slots.acquire()
+        except TimeoutError:
+            pass
+        finally:
+            self.__dequeue__(admitted=acquired)
+        if not acquired:
+            self.__reject__()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.admitted -= 1
+            slots.release()
+
+    def __queue__(self) -> None:
+        with self._lock:
+            # fail fast instead of waiting out a budget that can't be met
+            if self.expected_wait() > self.wait_budget:
+                self.rejected += 1
+                self.__raise_busy__()
+            self.queued += 1
+
+    def __dequeue__(self, *, admitted: bool) -> None:
+        with self._lock:
+            self.queued -= 1
+            if admitted:
+                self.admitted += 1
+
+    def __reject__(self) -> None:
+        with self._lock:
+            self.rejected += 1
+            self.__raise_busy__()
+
+    def __raise_busy__(self) -> None:
+        raise ServiceUnavailableError(
+            "The database is busy, please try again.",
+            retry_after=max(math.ceil(self.expected_wait()), 1),
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "expected_wait_ms": self.expected_wait() * 1000,
+        }
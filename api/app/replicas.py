@@ -0,0 +1,63 @@
+import itertools
+from collections.abc import Sequence
+from typing import NamedTuple
+
+from app.pool_monitor import PoolAdmission
+from app.settings import ReplicaBalancing
+
+# Session.info key of the sessions whose reads must see the latest writes of
+# the client: they go to the primary, past the caches of the process
+READ_PRIMARY_KEY = "read_primary"
+# Session.info key of the sessions reading from a replica, which may not have
+# replayed the latest writes yet
+ON_REPLICA_KEY = "on_replica"
+
+
+class DatabaseNode[EngineType](NamedTuple):
+    """A database server, with the engine and the admission of its pool."""
+
+    engine: EngineType
+    admission: PoolAdmission
+
+
+class ReplicaRouter[EngineType]:
+    """
+    Routes the sessions to the primary or to the read replicas: sessions that
+    may write, and the reads that must see the caller's latest writes, go to
+    the primary, the other reads are balanced over the replicas.
+    """
+
+    def __init__(
+        self,
+        primary: DatabaseNode[EngineType],
+        replicas: Sequence[DatabaseNode[EngineType]],
+        balancing: ReplicaBalancing,
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.balancing = balancing
+        self._turns = itertools.count()
+
+    def route(
+        self, *, read_only: bool, primary: bool = False
+    ) -> DatabaseNode[EngineType]:
+        if not read_only or primary or not self.replicas:
+            return self.primary
+
+        if self.balancing == ReplicaBalancing.LEAST_CONNECTIONS:
+            index = min(
+                range(len(self.replicas)),
+                key=lambda i: self.__connections__(self.replicas[i]),
+            )
+        else:
+            index = next(self._turns) % len(self.replicas)
+        return self.replicas[index]
+
+    @staticmethod
+    def __connections__(node: DatabaseNode[EngineType]) -> int:
+        # the admitted sessions hold or are about to check out a connection,
+        # without admission control the pool tells the connections in use
+        monitor = node.admission.monitor
+        if node.admission.enabled:
+            return node.admission.admitted + node.admission.queued
+        return monitor.in_use + monitor.waiting
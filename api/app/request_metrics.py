@@ -0,0 +1,314 @@
+import inspect
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any
+
+from fastapi.routing import APIRoute
+from sqlalchemy import Engine, event
+from sqlalchemy.engine.interfaces import ExecutionContext
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import (
+    DB_STATEMENT_DURATION,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    current_crud_method,
+)
+from app.settings import env
+
+logger = logging.getLogger(__name__)
+
+# Attribute of the endpoints holding the most statements a request may run
+QUERY_BUDGET_ATTRIBUTE = "query_budget"
+# Attribute of the instrumented endpoints holding the endpoint they time
+ENDPOINT_ATTRIBUTE = "instrumented_endpoint"
+# Route label of the requests matching no route, labelling them by their path
+# would make a series of every URL scanned
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetrics:
+    """What a request spent on the database and on serializing its response."""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.route = path
+        # the template of the route the request matched
+        self.route_template: str | None = None
+        self.started_at = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self.serialization = 0.0
+        self.query_budget: int | None = None
+        # when the endpoint returned, FastAPI serializes what it returned from
+        # then until the response starts
+        self.endpoint_returned_at: float | None = None
+        self._statement_counts: Counter[str] = Counter()
+
+    def record_statement(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.db_time += duration
+        self._statement_counts[statement] += 1
+
+    def repeated_statements(self) -> dict[str, int]:
+        """The statements run often enough to be an N+1, with their count."""
+        return {
+            statement: count
+            for statement, count in self._statement_counts.items()
+            if count >= env.repeated_statement_threshold
+        }
+
+    def exceeds_budget(self) -> bool:
+        return self.query_budget is not None and self.statements > self.query_budget
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.started_at
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} statements"',
+                f"pool;dur={self.pool_wait * 1000:.1f}",
+                f"serialize;dur={self.serialization * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ]
+        )
+
+    def log_fields(self) -> dict[str, Any]:
+        return {
+            "method": self.method,
+            "route": self.route,
+            "statements": self.statements,
+            "query_budget": self.query_budget,
+            "db_ms": round(self.db_time * 1000, 3),
+            "pool_wait_ms": round(self.pool_wait * 1000, 3),
+            "serialization_ms": round(self.serialization * 1000, 3),
+            "total_ms": round((time.perf_counter() - self.started_at) * 1000, 3),
+            "repeated_statements": self.repeated_statements(),
+        }
+
+
+# the metrics of the request being served, the threadpool runs the sync
+# endpoints and dependencies in a copy of the request's context
+current_request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+def query_budget[EndpointType: Callable[..., Any]](
+    statements: int,
+) -> Callable[[EndpointType], EndpointType]:
+    """
+    Declares the most statements a request of the endpoint may run, including
+    the statements of its dependencies. Requests beyond it are logged, and
+    fail with query_budget_strict (as in the tests).
+    """
+
+    def declare(endpoint: EndpointType) -> EndpointType:
+        setattr(endpoint, QUERY_BUDGET_ATTRIBUTE, statements)
+        return endpoint
+
+    return declare
+
+
+@contextmanager
+def measure_serialization() -> Generator[None]:
+    """Measures the serialization of a response rendered by the endpoint."""
+    metrics = current_request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialization += time.perf_counter() - start
+
+
+def record_pool_wait(wait_time: float) -> None:
+    metrics = current_request_metrics.get()
+    if metrics is not None:
+        metrics.pool_wait += wait_time
+
+
+def instrument_endpoint(endpoint: Callable[..., Any], path: str) -> Callable[..., Any]:
+    """
+    Wraps the endpoint to record its route template, its query budget and
+    when it returns. FastAPI reads the signature of the wrapped endpoint.
+    """
+    endpoint = getattr(endpoint, ENDPOINT_ATTRIBUTE, endpoint)
+    if inspect.isgeneratorfunction(endpoint) or inspect.isasyncgenfunction(endpoint):
+        return endpoint
+    budget = getattr(endpoint, QUERY_BUDGET_ATTRIBUTE, None)
+
+    def start() -> RequestMetrics | None:
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.route = path
+            metrics.query_budget = budget
+        return metrics
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @wraps(endpoint)
+        async def instrumented_async(*args: Any, **kwargs: Any) -> Any:
+            metrics = start()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if metrics is not None:
+                    metrics.endpoint_returned_at = time.perf_counter()
+
+        instrumented = instrumented_async
+    else:
+
+        @wraps(endpoint)
+        def instrumented_sync(*args: Any, **kwargs: Any) -> Any:
+            metrics = start()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if metrics is not None:
+                    metrics.endpoint_returned_at = time.perf_counter()
+
+        instrumented = instrumented_sync
+    setattr(instrumented, ENDPOINT_ATTRIBUTE, endpoint)
+    return instrumented
+
+
+class InstrumentedRoute(APIRoute):
+    """A route whose requests record the metrics of their endpoint."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, instrument_endpoint(endpoint, path), **kwargs)
+
+    def matches(self, scope: Scope) -> tuple[Match, Scope]:
+        # known before the dependencies run, which may fail the request
+        match, child_scope = super().matches(scope)
+        metrics = current_request_metrics.get()
+        if match == Match.FULL and metrics is not None:
+            metrics.route = metrics.route_template = self.path
+        return match, child_scope
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the statements and the timings of each request: the time spent in
+    the database, waiting for a pooled connection and serializing the
+    response. They are sent in the Server-Timing header and logged, with the
+    statements repeated like an N+1 would. The latency of the request and the
+    requests in flight are exported to /metrics.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(scope["method"], scope["path"])
+        token = current_request_metrics.set(metrics)
+        status = HTTP_500_INTERNAL_SERVER_ERROR
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if metrics.endpoint_returned_at is not None:
+                    metrics.serialization += (
+                        time.perf_counter() - metrics.endpoint_returned_at
+                    )
+                MutableHeaders(scope=message).append(
+                    "server-timing", metrics.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_metrics.reset(token)
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - metrics.started_at,
+                metrics.method,
+                metrics.route_template or UNMATCHED_ROUTE,
+                str(status),
+            )
+        # logged once the response is sent, with the statements of a streamed
+        # response
+        self.__log__(metrics)
+
+    @staticmethod
+    def __log__(metrics: RequestMetrics) -> None:
+        fields = metrics.log_fields()
+        logger.info(
+            "%(method)s %(route)s: %(statements)d statements, %(db_ms).1f ms "
+            "in the database, %(pool_wait_ms).1f ms waiting for a connection, "
+            "%(serialization_ms).1f ms serializing, %(total_ms).1f ms in total",
+            fields,
+            extra={"request_metrics": fields},
+        )
+        for statement, count in fields["repeated_statements"].items():
+            logger.warning(
+                "%s %s ran a statement %d times, like an N+1: %s",
+                metrics.method,
+                metrics.route,
+                count,
+                statement,
+                extra={"request_metrics": fields},
+            )
+        if metrics.exceeds_budget():
+            message = (
+                f"{metrics.method} {metrics.route} ran {metrics.statements} "
+                f"statements, its query budget is {metrics.query_budget}."
+            )
+            if env.query_budget_strict:
+                raise AssertionError(message)
+            logger.warning(message, extra={"request_metrics": fields})
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_statement(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    if context is not None and (
+        current_request_metrics.get() is not None
+        or current_crud_method.get() is not None
+    ):
+        context.statement_started_at = time.perf_counter()  # type: ignore
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def record_statement(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    started_at = getattr(context, "statement_started_at", None)
+    if started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    metrics = current_request_metrics.get()
+    if metrics is not None:
+        metrics.record_statement(statement, duration)
+    crud_method = current_crud_method.get()
+    if crud_method is not None:
+        DB_STATEMENT_DURATION.observe(duration, *crud_method)
@@ -0,0 +1,147 @@
+from fastapi import APIRouter, Body, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.comment_crud import AsyncCommentCRUD
+from app.database import get_async_db_session
+from app.models.comment_model import CommentModel
+from app.request_metrics import InstrumentedRoute, query_budget
+from app.schemas.base_schemas import (
+    BulkCreateResponseSchema,
+    BulkSelectionSchema,
+    BulkUpdateSchema,
+    BulkWriteResponseSchema,
+    PaginatedResponseSchema,
+    TotalStrategy,
+)
+from app.schemas.comment_schemas import (
+    CommentCreateSchema,
+    CommentSchema,
+    CommentUpdateSchema,
+)
+from app.settings import env
+from app.utils.get_comment_exist import get_async_comment_exist
+from app.utils.get_current_user import get_async_current_user
+from app.utils.get_part_exist import get_async_part_exist
+from app.utils.list_params import get_filters, get_sorting
+from app.utils.page_response import BulkCreateResponse, PageResponse, parse_fields
+
+# Async counterpart of comment_router, served when settings.async_database is set
+app_router = APIRouter(route_class=InstrumentedRoute)
+
+
+# Returns a paginated list of comments
+@app_router.get("/comments", response_model=PaginatedResponseSchema[CommentSchema])
+@query_budget(2)
+async def get_comments(
+    db_session: AsyncSession = Depends(get_async_db_session),
+    offset: int | None = Query(default=None, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=env.page_max_limit),
+    after: str | None = None,
+    before: str | None = None,
+    total: TotalStrategy = TotalStrategy.EXACT,
+    search: str | None = None,
+    fields: str | None = None,
+    filters: dict[str, str | list[str]] | None = Depends(get_filters),
+    sorting: dict[str, str] | None = Depends(get_sorting),
+) -> PageResponse:
+    field_set = parse_fields(fields, CommentSchema)
+    page = await AsyncCommentCRUD.get_paginated_list(
+        db_session=db_session,
+        limit=limit,
+        offset=offset,
+        filters=filters,
+        sorting=sorting,
+        after=after,
+        before=before,
+        total_strategy=total,
+        search=search,
+        fields=field_set,
+    )
+    return PageResponse(page, CommentSchema, field_set)
+
+
+# Creates a new comment
+@app_router.post("/comments", response_model=CommentSchema)
+@query_budget(4)
+async def create_comment(
+    input: CommentCreateSchema,
+    db_session: AsyncSession = Depends(get_async_db_session),
+    current_user=Depends(get_async_current_user),
+) -> CommentModel:
+    # check part is exist
+    # if there is no exist part, the function will exception
+    # with status 404 Not Found
+    await get_async_part_exist(part_id=input.part_id, db_session=db_session)
+
+    return await AsyncCommentCRUD.create(
+        db_session=db_session, input=input, current_user=current_user
+    )
+
+
+# Creates many comments at once, the comments that can't be created are
+# reported with their index in the request instead of failing the others
+@app_router.post(
+    "/comments/bulk", response_model=BulkCreateResponseSchema[CommentSchema]
+)
+async def bulk_create_comments(
+    inputs: list[CommentCreateSchema] = Body(max_length=env.bulk_max_items),
+    db_session: AsyncSession = Depends(get_async_db_session),
+    current_user=Depends(get_async_current_user),
+) -> BulkCreateResponse:
+    result = await AsyncCommentCRUD.bulk_create(
+        db_session=db_session,
+        inputs=inputs,
+        current_user=current_user,
+        chunk_size=env.bulk_chunk_size,
+    )
+    return BulkCreateResponse(result, CommentSchema)
+
+
+# Updates all the comments with the given IDs and/or matching the filters
+@app_router.patch("/comments/bulk", response_model=BulkWriteResponseSchema)
+async def bulk_update_comments(
+    input: BulkUpdateSchema[CommentUpdateSchema],
+    db_session: AsyncSession = Depends(get_async_db_session),
+    current_user=Depends(get_async_current_user),
+) -> BulkWriteResponseSchema:
+    count = await AsyncCommentCRUD.bulk_update(
+        db_session=db_session,
+        input=input.changes,
+        current_user=current_user,
+        entity_ids=input.ids,
+        filters=input.filters,
+    )
+    return BulkWriteResponseSchema(count=count)
+
+
+# Soft deletes all the comments with the given IDs and/or matching the filters
+@app_router.post("/comments/bulk/delete", response_model=BulkWriteResponseSchema)
+async def bulk_delete_comments(
+    input: BulkSelectionSchema,
+    db_session: AsyncSession = Depends(get_async_db_session),
+    current_user=Depends(get_async_current_user),
+) -> BulkWriteResponseSchema:
+    count = await AsyncCommentCRUD.bulk_soft_delete(
+        db_session=db_session,
+        current_user=current_user,
+        entity_ids=input.ids,
+        filters=input.filters,
+    )
+    return BulkWriteResponseSchema(count=count)
+
+
+# Updates a specific comment by its ID
+@app_router.put("/comments/{comment_id}", response_model=CommentSchema)
+@query_budget(5)
+async def update_comment(
+    input: CommentUpdateSchema,
+    comment: CommentModel = Depends(get_async_comment_exist),
+    db_session: AsyncSession = Depends(get_async_db_session),
+    current_user=Depends(get_async_current_user),
+) -> CommentModel:
+    return await AsyncCommentCRUD.update(
+        db_session=db_session,
+        entity_id=comment.id,
+        input=input,
+        current_user=current_user,
+    )
@@ -0,0 +1,114 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.crud.comment_crud import CommentCRUD
+from app.crud.history_read_crud import HistoryReadCRUD
+from app.crud.part_crud import PartCRUD
+from app.database import get_db_session
+from app.request_metrics import InstrumentedRoute
+from app.schemas.comment_schemas import CommentSchema
+from app.schemas.history_schemas import HistoryReadSchema
+from app.schemas.part_schemas import PartSchema
+from app.settings import env
+from app.utils.export import ExportFormat, ExportResponse
+from app.utils.list_params import get_filters, get_sorting
+from app.utils.page_response import parse_fields
+
+# The exports stream from a server-side cursor of a sync session, with either
+# database stack. The router is included before the part and comment routers,
+# so "export" is not taken for an ID.
+app_router = APIRouter(route_class=InstrumentedRoute)
+
+
+# Streams all the parts matching the search
+@app_router.get("/parts/export", response_class=ExportResponse)
+def export_parts(
+    db_session: Session = Depends(get_db_session),
+    format: ExportFormat = ExportFormat.NDJSON,
+    gzip: bool = False,
+    search: str | None = None,
+    fields: str | None = None,
+    filters: dict[str, str | list[str]] | None = Depends(get_filters),
+    sorting: dict[str, str] | None = Depends(get_sorting),
+) -> ExportResponse:
+    field_set = parse_fields(fields, PartSchema)
+    parts = PartCRUD.stream(
+        db_session,
+        filters=filters,
+        sorting=sorting,
+        search=search,
+        fields=field_set,
+        batch_size=env.export_batch_size,
+    )
+    return ExportResponse(
+        parts,
+        PartSchema,
+        name="parts",
+        export_format=format,
+        fields=field_set,
+        compress=gzip,
+    )
+
+
+# Streams all the comments matching the search
+@app_router.get("/comments/export", response_class=ExportResponse)
+def export_comments(
+    db_session: Session = Depends(get_db_session),
+    format: ExportFormat = ExportFormat.NDJSON,
+    gzip: bool = False,
+    search: str | None = None,
+    fields: str | None = None,
+    filters: dict[str, str | list[str]] | None = Depends(get_filters),
+    sorting: dict[str, str] | None = Depends(get_sorting),
+) -> ExportResponse:
+    field_set = parse_fields(fields, CommentSchema)
+    comments = CommentCRUD.stream(
+        db_session,
+        filters=filters,
+        sorting=sorting,
+        search=search,
+        fields=field_set,
+        batch_size=env.export_batch_size,
+    )
+    return ExportResponse(
+        comments,
+        CommentSchema,
+        name="comments",
+        export_format=format,
+        fields=field_set,
+        compress=gzip,
+    )
+
+
+# Streams the history, optionally of a single table or entity
+@app_router.get("/history/export", response_class=ExportResponse)
+def export_history(
+    db_session: Session = Depends(get_db_session),
+    format: ExportFormat = ExportFormat.NDJSON,
+    gzip: bool = False,
+    table_name: str | None = None,
+    entity_id: UUID | None = None,
+    fields: str | None = None,
+) -> ExportResponse:
+    field_set = parse_fields(fields, HistoryReadSchema)
+    filters: dict[str, str | list[str]] = {}
+    if table_name is not None:
+        filters["table_name"] = table_name
+    if entity_id is not None:
+        filters["entity_id"] = str(entity_id)
+    history = HistoryReadCRUD.stream(
+        db_session,
+        filters=filters,
+        fields=field_set,
+        batch_size=env.export_batch_size,
+    )
+    return ExportResponse(
+        history,
+        HistoryReadSchema,
+        name="history",
+        export_format=format,
+        fields=field_set,
+        compress=gzip,
+    )
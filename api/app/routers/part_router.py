@@ -1,6 +1,7 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Query
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
 from app.crud.comment_crud import (
@@ -10,33 +11,74 @@ from app.crud.part_crud import PartCRUD
 from app.database import get_db_session
 from app.models.comment_model import CommentModel
 from app.models.part_model import PartModel
-from app.schemas.base_schemas import PaginatedResponseSchema
+from app.request_metrics import InstrumentedRoute, query_budget
+from app.schemas.base_schemas import (
+    BulkCreateResponseSchema,
+    BulkSelectionSchema,
+    BulkUpdateSchema,
+    BulkWriteResponseSchema,
+    PaginatedResponseSchema,
+    TotalStrategy,
+)
 from app.schemas.comment_schemas import (
     CommentBaseSchema,
     CommentCreateSchema,
     CommentSchema,
 )
-from app.schemas.part_schemas import PartCreateSchema, PartSchema, PartUpdateSchema
+from app.schemas.part_schemas import (
+    PartCreateSchema,
+    PartNameSchema,
+    PartSchema,
+    PartUpdateSchema,
+)
+from app.settings import env
 from app.utils.get_current_user import get_current_user
 from app.utils.get_part_exist import get_part_exist
+from app.utils.list_params import get_filters, get_sorting
+from app.utils.page_response import (
+    BulkCreateResponse,
+    EntityResponse,
+    PageResponse,
+    parse_fields,
+)
 
-app_router = APIRouter()
+app_router = APIRouter(route_class=InstrumentedRoute)
 
 
 # Returns a paginated list of parts
 @app_router.get("/parts", response_model=PaginatedResponseSchema[PartSchema])
+@query_budget(3)
 def get_parts(
     db_session: Session = Depends(get_db_session),
-    offset: int | None = None,
-    limit: int | None = None,
-) -> PaginatedResponseSchema[PartModel]:
-    return PartCRUD.get_paginated_list(
-        db_session=db_session, limit=limit, offset=offset
+    offset: int | None = Query(default=None, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=env.page_max_limit),
+    after: str | None = None,
+    before: str | None = None,
+    total: TotalStrategy = TotalStrategy.EXACT,
+    search: str | None = None,
+    fields: str | None = None,
+    filters: dict[str, str | list[str]] | None = Depends(get_filters),
+    sorting: dict[str, str] | None = Depends(get_sorting),
+) -> PageResponse:
+    field_set = parse_fields(fields, PartSchema)
+    page = PartCRUD.get_paginated_list(
+        db_session=db_session,
+        limit=limit,
+        offset=offset,
+        filters=filters,
+        sorting=sorting,
+        after=after,
+        before=before,
+        total_strategy=total,
+        search=search,
+        fields=field_set,
     )
+    return PageResponse(page, PartSchema, field_set)
 
 
 # Creates a new part
 @app_router.post("/parts", response_model=PartSchema)
+@query_budget(3)
 def create_part(
     input: PartCreateSchema,
     db_session: Session = Depends(get_db_session),
@@ -47,17 +89,117 @@ def create_part(
     )
 
 
+# Creates many parts at once, the parts that can't be created are
+# reported with their index in the request instead of failing the others
+@app_router.post("/parts/bulk", response_model=BulkCreateResponseSchema[PartSchema])
+def bulk_create_parts(
+    inputs: list[PartCreateSchema] = Body(max_length=env.bulk_max_items),
+    db_session: Session = Depends(get_db_session),
+    current_user=Depends(get_current_user),
+) -> BulkCreateResponse:
+    result = PartCRUD.bulk_create(
+        db_session=db_session,
+        inputs=inputs,
+        current_user=current_user,
+        chunk_size=env.bulk_chunk_size,
+    )
+    return BulkCreateResponse(result, PartSchema)
+
+
+# Creates a part, or updates the part with the same name
+@app_router.put("/parts", response_model=PartSchema)
+@query_budget(4)
+def upsert_part(
+    input: PartCreateSchema,
+    db_session: Session = Depends(get_db_session),
+    current_user=Depends(get_current_user),
+) -> PartModel:
+    return PartCRUD.upsert(
+        db_session=db_session, input=input, current_user=current_user
+    )
+
+
+# Creates many parts at once, or updates the parts with the same names,
+# returned in the order of the request
+@app_router.put("/parts/bulk", response_model=list[PartSchema])
+def bulk_upsert_parts(
+    inputs: list[PartCreateSchema] = Body(max_length=env.bulk_max_items),
+    db_session: Session = Depends(get_db_session),
+    current_user=Depends(get_current_user),
+) -> list[PartModel]:
+    return PartCRUD.bulk_upsert(
+        db_session=db_session,
+        inputs=inputs,
+        current_user=current_user,
+        chunk_size=env.bulk_chunk_size,
+    )
+
+
+# Updates all the parts with the given IDs and/or matching the filters
+@app_router.patch("/parts/bulk", response_model=BulkWriteResponseSchema)
+def bulk_update_parts(
+    input: BulkUpdateSchema[PartUpdateSchema],
+    db_session: Session = Depends(get_db_session),
+    current_user=Depends(get_current_user),
+) -> BulkWriteResponseSchema:
+    count = PartCRUD.bulk_update(
+        db_session=db_session,
+        input=input.changes,
+        current_user=current_user,
+        entity_ids=input.ids,
+        filters=input.filters,
+    )
+    return BulkWriteResponseSchema(count=count)
+
+
+# Soft deletes all the parts with the given IDs and/or matching the filters
+# (a deleted part keeps its name, which stays unique: creating a part with
+# the name fails, while upserting a part with the name restores it)
+@app_router.post("/parts/bulk/delete", response_model=BulkWriteResponseSchema)
+def bulk_delete_parts(
+    input: BulkSelectionSchema,
+    db_session: Session = Depends(get_db_session),
+    current_user=Depends(get_current_user),
+) -> BulkWriteResponseSchema:
+    count = PartCRUD.bulk_soft_delete(
+        db_session=db_session,
+        current_user=current_user,
+        entity_ids=input.ids,
+        filters=input.filters,
+    )
+    return BulkWriteResponseSchema(count=count)
+
+
+# Returns the id and name of the parts best matching the typed name
+# (declared before /parts/{part_id} so "autocomplete" is not taken for an id)
+@app_router.get("/parts/autocomplete", response_model=list[PartNameSchema])
+@query_budget(2)
+def autocomplete_parts(
+    q: str = Query(min_length=1, max_length=256),
+    limit: int = Query(default=10, ge=1, le=env.autocomplete_max_limit),
+    db_session: Session = Depends(get_db_session),
+) -> list[Row[tuple[UUID, str]]]:
+    return PartCRUD.autocomplete(db_session=db_session, q=q, limit=limit)
+
+
 # Returns a specific part by its ID
 @app_router.get("/parts/{part_id}", response_model=PartSchema)
+@query_budget(1)
 def get_part(
     part_id: UUID,
     db_session: Session = Depends(get_db_session),
-) -> PartModel:
-    return PartCRUD.get_one_by(db_session=db_session, key="id", value=str(part_id))
+    fields: str | None = None,
+) -> EntityResponse:
+    field_set = parse_fields(fields, PartSchema)
+    part = PartCRUD.get_one_by(
+        db_session=db_session, key="id", value=str(part_id), fields=field_set
+    )
+    return EntityResponse(part, PartSchema, field_set)
 
 
 # Updates a specific part by its ID
 @app_router.put("/parts/{part_id}", response_model=PartSchema)
+@query_budget(3)
 def update_part(
     part_id: UUID,
     input: PartUpdateSchema,
@@ -71,6 +213,7 @@ def update_part(
 
 # Returns all comments associated with the given part
 @app_router.get("/parts/{part_id}/comments", response_model=list[CommentSchema])
+@query_budget(3)
 def get_part_comments(
     part: PartModel = Depends(get_part_exist),
     db_session: Session = Depends(get_db_session),
@@ -82,6 +225,7 @@ def get_part_comments(
 
 # Creates a new comment for the specified part
 @app_router.post("/parts/{part_id}/comments", response_model=CommentSchema)
+@query_budget(4)
 def create_part_comment(
     input: CommentBaseSchema,
     part: PartModel = Depends(get_part_exist),
@@ -1,4 +1,6 @@
+from enum import Enum
 from typing import TypeVar
+from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
@@ -9,10 +11,54 @@ class AppBaseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TotalStrategy(Enum):
+    # count the rows in the same round trip as the page
+    EXACT = "exact"
+    # use the planner statistics, cheap but approximate
+    ESTIMATED = "estimated"
+    # skip the count
+    NONE = "none"
+
+
 class PaginatedResponseSchema[T](BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     offset: int | None
     limit: int | None
-    total: int
+    total: int | None
+    total_strategy: TotalStrategy = TotalStrategy.EXACT
     data: list[T]
+    # opaque keyset pagination cursors, passed back as `after` / `before`
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+class BulkItemErrorSchema(BaseModel):
+    # position of the failed item in the request
+    index: int
+    detail: str
+
+
+class BulkCreateResponseSchema[T](BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # the created entities, in the order of the request
+    created: list[T]
+    errors: list[BulkItemErrorSchema]
+
+
+class BulkSelectionSchema(BaseModel):
+    # the entities with these IDs and/or the ones matching the filters, at
+    # least one of them is required
+    ids: list[UUID] | None = None
+    filters: dict[str, str | list[str]] | None = None
+
+
+class BulkUpdateSchema[T](BulkSelectionSchema):
+    # only the fields that are given are set
+    changes: T
+
+
+class BulkWriteResponseSchema(BaseModel):
+    # the number of updated or deleted entities
+    count: int
@@ -43,6 +43,8 @@ class HistoryCreateSchema(AppBaseSchema):
 
 class HistoryReadSchema(AppBaseSchema):
     id: UUID
+    table_name: str
+    entity_id: UUID
     user_id: UUID
     action: str
     changes: dict[str, ValueChangeSchema]
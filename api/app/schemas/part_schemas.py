@@ -43,3 +43,8 @@ class PartSchema(PartBaseSchema):
     updated_at: datetime
     created_by: UUID
     updated_by: UUID
+
+
+class PartNameSchema(AppBaseSchema):
+    id: UUID
+    name: str
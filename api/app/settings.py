@@ -12,6 +12,23 @@ class EnvMode(Enum):
     PROD = "PROD"
 
 
+class HistoryMode(Enum):
+    # every history record is inserted (and read back) on its own
+    INLINE = "INLINE"
+    # buffered and inserted with one multi-row INSERT when the transaction commits
+    TRANSACTION = "TRANSACTION"
+    # handed to a background writer after the commit, records still queued are
+    # lost if the process dies
+    ASYNC = "ASYNC"
+
+
+class ReplicaBalancing(Enum):
+    # the replicas take turns
+    ROUND_ROBIN = "ROUND_ROBIN"
+    # the replica with the fewest sessions (or connections) in use
+    LEAST_CONNECTIONS = "LEAST_CONNECTIONS"
+
+
 class Settings(BaseSettings):
     app_name: str = "Fastapi Postgres Service"
     app_version: str = "0.0.0"
@@ -28,6 +45,94 @@ class Settings(BaseSettings):
     db_hostname: str = "app-net-db"
     db_database: str = "app-net"
     db_port: int = 7831
+    # Connection pool of each engine (the defaults are SQLAlchemy's)
+    db_pool_size: int = 5
+    db_pool_max_overflow: int = 10
+    # seconds to wait for a connection before giving up
+    db_pool_timeout: float = 30
+    # seconds after which a connection is replaced, -1 to keep connections
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # reuse the most recently returned connection, which lets the pool shrink
+    # back to pool_size once a burst is over
+    db_pool_use_lifo: bool = False
+    # Requests are rejected with a 503 when the expected wait for a connection
+    # exceeds this budget. The admission control is opt-in, 0 disables it
+    db_pool_wait_budget_ms: int = 0
+    # Read replicas ("host:port", with the database and credentials of the
+    # primary) serving the read-only sessions of the GET routes, each with a
+    # pool of its own
+    db_replicas: list[str] = []
+    db_replica_balancing: ReplicaBalancing = ReplicaBalancing.ROUND_ROBIN
+    # seconds the reads of a client go to the primary after its last write,
+    # so it reads its writes while the replicas catch up. Should exceed the
+    # replication lag
+    db_replica_stickiness_s: float = 5
+
+    history_mode: HistoryMode = HistoryMode.INLINE
+    # bounds the records an ASYNC history writer can lose, commits write the
+    # history themselves while the queue is full
+    history_queue_size: int = 10_000
+    history_batch_size: int = 500
+    history_flush_interval_ms: int = 200
+    # validate the changes of the history records again when they are written,
+    # they are validated by HistoryCreateSchema already
+    history_validate_changes: bool = False
+
+    # the most items a page of the list routes may hold, larger limits are
+    # rejected
+    page_max_limit: int = 1000
+
+    # rows fetched from the server-side cursor at a time by the exports
+    export_batch_size: int = 1000
+
+    # rows inserted by each statement of the bulk creates, and the most items
+    # a bulk create request accepts
+    bulk_chunk_size: int = 1000
+    bulk_max_items: int = 10_000
+
+    # users identifying the callers, cached per process by their principal,
+    # 0 disables the cache
+    user_cache_size: int = 1024
+    user_cache_ttl_s: float = 60
+    # entities read by ID (the parts), cached per process, 0 disables the
+    # cache. The TTL bounds how long a worker may serve an entity changed by
+    # another worker without cache_notify, or when it missed the notification
+    entity_cache_size: int = 10_000
+    entity_cache_ttl_s: float = 10
+    # publish the invalidations of the caches to the other workers with
+    # Postgres NOTIFY, and listen to theirs
+    cache_notify: bool = False
+    # concurrent identical reads of the CRUD classes share one query per
+    # process
+    read_coalescing: bool = True
+    # seconds a read waits for the identical read it joined before it runs
+    # its own query
+    read_coalescing_timeout_s: float = 5
+
+    # record the statements and timings of every request, sent in the
+    # Server-Timing header and logged
+    request_metrics: bool = True
+    # a statement run this many times by a request is reported as an N+1
+    repeated_statement_threshold: int = 5
+    # requests beyond the query budget of their endpoint fail instead of
+    # logging a warning (the tests enable it)
+    query_budget_strict: bool = False
+
+    # With several workers, each worker writes its metrics to a file of this
+    # directory and the scrapes of /metrics add them up. The directory should
+    # be emptied when the deployment starts
+    metrics_multiprocess_dir: str | None = None
+    # seconds between the writes of the metrics of a worker
+    metrics_write_interval_s: float = 5
+
+    # serve the parts and comments routes with the async database stack
+    async_database: bool = False
+
+    # Latency budget of a single autocomplete query, the query is cancelled
+    # by the database when it runs longer
+    autocomplete_timeout_ms: int = 200
+    autocomplete_max_limit: int = 50
 
     model_config = SettingsConfigDict(
         env_file=pathlib.Path(__file__).parent.parent.joinpath(".env")
@@ -0,0 +1,56 @@
+import base64
+import binascii
+import json
+from functools import cache
+from typing import Any
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_jsonable_python
+
+
+@cache
+def get_type_adapter(python_type: type) -> TypeAdapter[Any]:
+    return TypeAdapter(python_type)
+
+
+def encode_cursor(keys: list[str], values: list[Any]) -> str:
+    """
+    Builds an opaque pagination cursor from the sort keys and the values of
+    the row the cursor points at.
+    """
+    payload = json.dumps(
+        {"k": keys, "v": to_jsonable_python(values)}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: list[str], python_types: list[type]) -> list[Any]:
+    """
+    Decodes a cursor created by encode_cursor and converts its values back to
+    the python types of the sort columns.
+
+    Raises a ValueError when the cursor is malformed or was created for
+    a different sorting.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid pagination cursor.") from e
+
+    if not isinstance(payload, dict) or payload.get("k") != keys:
+        raise ValueError("Pagination cursor does not match the requested sorting.")
+
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != len(python_types):
+        raise ValueError("Invalid pagination cursor.")
+
+    try:
+        return [
+            None
+            if value is None
+            else get_type_adapter(python_type).validate_python(value)
+            for value, python_type in zip(values, python_types, strict=True)
+        ]
+    except ValidationError as e:
+        raise ValueError("Invalid pagination cursor.") from e
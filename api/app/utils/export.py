@@ -0,0 +1,116 @@
+import csv
+import io
+import zlib
+from collections.abc import Iterable, Iterator
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+from app.utils.page_response import get_row_serializer, serialized_names
+
+# Rows written to the response in one chunk
+EXPORT_CHUNK_ROWS = 1000
+
+
+class ExportFormat(Enum):
+    # one JSON object per line
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def to_csv_value(value: Any) -> Any:
+    value = to_jsonable_python(value)
+    # nested schemas and lists end up as JSON in their cell
+    if isinstance(value, dict | list):
+        return to_json(value).decode()
+    return value
+
+
+def export_ndjson(rows: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    chunk: list[bytes] = []
+    for row in rows:
+        chunk.append(to_json(row))
+        if len(chunk) == EXPORT_CHUNK_ROWS:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def export_csv(rows: Iterable[dict[str, Any]], header: list[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for index, row in enumerate(rows, start=1):
+        writer.writerow([to_csv_value(value) for value in row.values()])
+        if index % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # wbits=31 writes the gzip header and trailer
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(
+    entities: Iterable[Any],
+    schema: type[PydanticBaseModel],
+    export_format: ExportFormat,
+    fields: frozenset[str] | None = None,
+) -> Iterator[bytes]:
+    """
+    Serializes the entities as they are consumed, so a streamed query is never
+    held in memory as a whole.
+    """
+    serialize_row = get_row_serializer(schema, fields)
+    rows = (serialize_row(entity) for entity in entities)
+    if export_format == ExportFormat.CSV:
+        return export_csv(rows, serialized_names(schema, fields))
+    return export_ndjson(rows)
+
+
+class ExportResponse(StreamingResponse):
+    """
+    Streams entities as an NDJSON or CSV file download with the fields of the
+    schema (or only the given ones), optionally gzip compressed.
+    """
+
+    def __init__(
+        self,
+        entities: Iterable[Any],
+        schema: type[PydanticBaseModel],
+        *,
+        name: str,
+        export_format: ExportFormat,
+        fields: frozenset[str] | None = None,
+        compress: bool = False,
+    ):
+        chunks = export_chunks(entities, schema, export_format, fields)
+        media_type = MEDIA_TYPES[export_format]
+        filename = f"{name}.{export_format.value}"
+        if compress:
+            chunks = gzip_chunks(chunks)
+            media_type = "application/gzip"
+            filename += ".gz"
+
+        super().__init__(
+            chunks,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
@@ -1,10 +1,11 @@
 from uuid import UUID
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.crud.comment_crud import CommentCRUD
-from app.database import get_db_session
+from app.crud.comment_crud import AsyncCommentCRUD, CommentCRUD
+from app.database import get_async_db_session, get_db_session
 from app.models.comment_model import CommentModel
 
 
@@ -21,3 +22,15 @@ def get_comment_exist(
     return CommentCRUD.get_one_by(
         db_session=db_session, key=CommentModel.id.key, value=str(comment_id)
     )
+
+
+async def get_async_comment_exist(
+    comment_id: UUID, db_session: AsyncSession = Depends(get_async_db_session)
+) -> CommentModel:
+    """
+    Async variant of get_comment_exist, raises a 404 NOT FOUND if there is no
+    Comment with the given ID.
+    """
+    return await AsyncCommentCRUD.get_one_by(
+        db_session=db_session, key=CommentModel.id.key, value=str(comment_id)
+    )
@@ -1,8 +1,11 @@
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.crud.user_crud import UserCRUD
-from app.database import get_db_session
+from app.cache.user_cache import cache_user, get_cached_user, user_cache
+from app.crud.history_capture import set_history_user
+from app.crud.user_crud import AsyncUserCRUD, UserCRUD
+from app.database import get_async_db_session, get_db_session
 from app.models.user_model import UserModel
 
 ###
@@ -10,8 +13,34 @@ from app.models.user_model import UserModel
 # involve authentication logic such as decoding a JWT token.
 ###
 
+# the principal of the caller, like the subject of a token
+STUB_PRINCIPAL = "Alice"
+
 
 def get_current_user(db_session: Session = Depends(get_db_session)) -> UserModel:
-    return UserCRUD.get_one_by(
-        db_session=db_session, key=UserModel.name.key, value="Alice"
-    )
+    # FastAPI resolves the dependency once per request, and the user of the
+    # principal is only queried when it is not cached
+    user = get_cached_user(db_session, STUB_PRINCIPAL)
+    if user is None:
+        generation = user_cache.generation
+        user = UserCRUD.get_one_by(
+            db_session=db_session, key=UserModel.name.key, value=STUB_PRINCIPAL
+        )
+        cache_user(STUB_PRINCIPAL, user, generation)
+    # changes flushed in the request are recorded as made by the user
+    set_history_user(db_session, user.id)
+    return user
+
+
+async def get_async_current_user(
+    db_session: AsyncSession = Depends(get_async_db_session),
+) -> UserModel:
+    user = get_cached_user(db_session.sync_session, STUB_PRINCIPAL)
+    if user is None:
+        generation = user_cache.generation
+        user = await AsyncUserCRUD.get_one_by(
+            db_session=db_session, key=UserModel.name.key, value=STUB_PRINCIPAL
+        )
+        cache_user(STUB_PRINCIPAL, user, generation)
+    set_history_user(db_session.sync_session, user.id)
+    return user
@@ -1,10 +1,11 @@
 from uuid import UUID
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.crud.part_crud import PartCRUD
-from app.database import get_db_session
+from app.crud.part_crud import AsyncPartCRUD, PartCRUD
+from app.database import get_async_db_session, get_db_session
 from app.models.part_model import PartModel
 
 
@@ -21,3 +22,15 @@ def get_part_exist(
     return PartCRUD.get_one_by(
         db_session=db_session, key=PartModel.id.key, value=str(part_id)
     )
+
+
+async def get_async_part_exist(
+    part_id: UUID, db_session: AsyncSession = Depends(get_async_db_session)
+) -> PartModel:
+    """
+    Async variant of get_part_exist, raises a 404 NOT FOUND if there is no
+    Part with the given ID.
+    """
+    return await AsyncPartCRUD.get_one_by(
+        db_session=db_session, key=PartModel.id.key, value=str(part_id)
+    )
@@ -0,0 +1,39 @@
+from fastapi import Request
+
+# Query params like `filter[name__prefix]=Part` filter the lists and exports
+FILTER_PREFIX = "filter["
+FILTER_SUFFIX = "]"
+
+
+def get_filters(request: Request) -> dict[str, str | list[str]] | None:
+    """
+    Reads the filters of a list from the `filter[<key>]=<value>` query params,
+    a key given more than once is filtered by the list of its values. The keys
+    are those of BaseCRUD filters, e.g. `filter[created_at__gte]=2024-01-01`.
+    """
+    filters: dict[str, str | list[str]] = {}
+    for param in request.query_params:
+        if not param.startswith(FILTER_PREFIX) or not param.endswith(FILTER_SUFFIX):
+            continue
+        key = param.removeprefix(FILTER_PREFIX).removesuffix(FILTER_SUFFIX)
+        if not key:
+            raise ValueError(f"Invalid filter parameter '{param}'.")
+        values = request.query_params.getlist(param)
+        filters[key] = values if len(values) > 1 else values[0]
+    return filters or None
+
+
+def get_sorting(sort: str | None = None) -> dict[str, str] | None:
+    """
+    Parses the sorting of a list from a comma separated list of keys with an
+    optional direction, like `name:asc,created_at:desc` (ascending by default).
+    """
+    if not sort:
+        return None
+    sorting: dict[str, str] = {}
+    for item in sort.split(","):
+        key, _, direction = item.strip().partition(":")
+        if not key:
+            raise ValueError(f"Invalid sorting '{sort}'.")
+        sorting[key] = direction or "asc"
+    return sorting
@@ -0,0 +1,227 @@
+from collections.abc import Callable
+from functools import cache
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic import PlainSerializer, WrapSerializer
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined, to_json
+
+from app.request_metrics import measure_serialization
+from app.schemas.base_schemas import BulkCreateResponseSchema, PaginatedResponseSchema
+
+type RowSerializer = Callable[[Any], dict[str, Any]]
+
+
+def get_nested_schema(annotation: Any) -> type[PydanticBaseModel] | None:
+    """Returns the schema of a field typed as a schema (or an optional one)."""
+    if get_origin(annotation) in {Union, UnionType}:
+        schemas = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return get_nested_schema(schemas[0]) if len(schemas) == 1 else None
+    if isinstance(annotation, type) and issubclass(annotation, PydanticBaseModel):
+        return annotation
+    return None
+
+
+def parse_fields(
+    fields: str | None, schema: type[PydanticBaseModel]
+) -> frozenset[str] | None:
+    """
+    Parses a comma separated sparse fieldset like `id,name`.
+
+    Raises a ValueError for fields the schema does not have.
+    """
+    if fields is None:
+        return None
+    names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    for name in names:
+        if name not in schema.model_fields:
+            raise ValueError(f"Unknown field '{name}'.")
+    return names
+
+
+def contains_schema(annotation: Any) -> bool:
+    """Tells if a schema appears anywhere in the annotation, e.g. list[Schema]."""
+    if isinstance(annotation, type) and issubclass(annotation, PydanticBaseModel):
+        return True
+    return any(contains_schema(arg) for arg in get_args(annotation))
+
+
+def serialized_name(name: str, field: FieldInfo) -> str:
+    return field.serialization_alias or field.alias or name
+
+
+def serialized_names(
+    schema: type[PydanticBaseModel], fields: frozenset[str] | None = None
+) -> list[str]:
+    """The keys of the rows serialized with the schema, in their order."""
+    names = [
+        serialized_name(name, field)
+        for name, field in schema.model_fields.items()
+        if not field.exclude and (fields is None or name in fields)
+    ]
+    names.extend(
+        computed.alias or name
+        for name, computed in schema.model_computed_fields.items()
+        if fields is None or name in fields
+    )
+    return names
+
+
+def is_plain_schema(schema: type[PydanticBaseModel]) -> bool:
+    """
+    Tells if the fields of the schema can be read as they are: no serializers,
+    computed or excluded fields, and schemas only as (optional) field types.
+    """
+    decorators = schema.__pydantic_decorators__
+    if (
+        decorators.field_serializers
+        or decorators.model_serializers
+        or schema.model_computed_fields
+    ):
+        return False
+    for field in schema.model_fields.values():
+        if field.exclude or any(
+            isinstance(metadata, PlainSerializer | WrapSerializer)
+            for metadata in field.metadata
+        ):
+            return False
+        nested = get_nested_schema(field.annotation)
+        if nested is None and contains_schema(field.annotation):
+            return False
+    return True
+
+
+@cache
+def get_row_serializer(
+    schema: type[PydanticBaseModel], fields: frozenset[str] | None = None
+) -> RowSerializer:
+    """
+    Builds a function that reads the fields of the schema (or only the given
+    ones) from an ORM object or a row into a dict keyed by their serialization
+    alias, recursing into fields typed as schemas. Unlike validating the schema
+    from attributes, no schema instance is built.
+
+    Schemas the fields can't simply be read for (see is_plain_schema) are
+    validated and dumped instead. A missing required attribute raises an
+    AttributeError, like the validation would fail.
+    """
+    if not is_plain_schema(schema):
+        include = set(fields) if fields is not None else None
+
+        def validate(entity: Any) -> dict[str, Any]:
+            return schema.model_validate(entity, from_attributes=True).model_dump(
+                mode="json", by_alias=True, include=include
+            )
+
+        return validate
+
+    serialized: list[tuple[str, str, FieldInfo, RowSerializer | None]] = []
+    for name, field in schema.model_fields.items():
+        if fields is not None and name not in fields:
+            continue
+        nested = get_nested_schema(field.annotation)
+        serialized.append(
+            (
+                name,
+                serialized_name(name, field),
+                field,
+                nested and get_row_serializer(nested),
+            )
+        )
+
+    def serialize(entity: Any) -> dict[str, Any]:
+        row = {}
+        for name, key, field, serialize_nested in serialized:
+            value = getattr(entity, name, PydanticUndefined)
+            if value is PydanticUndefined:
+                value = field.get_default(call_default_factory=True)
+            if value is PydanticUndefined:
+                raise AttributeError(
+                    f"{type(entity).__name__} has no attribute '{name}' "
+                    f"required by {schema.__name__}."
+                )
+            if serialize_nested is not None and value is not None:
+                value = serialize_nested(value)
+            row[key] = value
+        return row
+
+    return serialize
+
+
+def serialize_page(
+    page: PaginatedResponseSchema[Any],
+    item_schema: type[PydanticBaseModel],
+    fields: frozenset[str] | None = None,
+) -> bytes:
+    serialize_row = get_row_serializer(item_schema, fields)
+    return to_json(
+        {
+            "offset": page.offset,
+            "limit": page.limit,
+            "total": page.total,
+            "total_strategy": page.total_strategy,
+            "data": [serialize_row(entity) for entity in page.data],
+            "next_cursor": page.next_cursor,
+            "previous_cursor": page.previous_cursor,
+        }
+    )
+
+
+class PageResponse(Response):
+    """
+    Renders a page of entities straight to JSON bytes with the fields of the
+    item schema. Routes returning it skip the validation of their response
+    model, which only documents the response then.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        page: PaginatedResponseSchema[Any],
+        item_schema: type[PydanticBaseModel],
+        fields: frozenset[str] | None = None,
+    ):
+        with measure_serialization():
+            content = serialize_page(page, item_schema, fields)
+        super().__init__(content=content)
+
+
+class EntityResponse(Response):
+    """Renders a single entity like PageResponse renders the entities of a page."""
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        entity: Any,
+        schema: type[PydanticBaseModel],
+        fields: frozenset[str] | None = None,
+    ):
+        with measure_serialization():
+            content = to_json(get_row_serializer(schema, fields)(entity))
+        super().__init__(content=content)
+
+
+class BulkCreateResponse(Response):
+    """Renders the outcome of a bulk create like PageResponse renders a page."""
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        result: BulkCreateResponseSchema[Any],
+        schema: type[PydanticBaseModel],
+    ):
+        serialize_row = get_row_serializer(schema)
+        with measure_serialization():
+            content = to_json(
+                {
+                    "created": [serialize_row(entity) for entity in result.created],
+                    "errors": [error.model_dump() for error in result.errors],
+                }
+            )
+        super().__init__(content=content)
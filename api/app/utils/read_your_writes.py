@@ -0,0 +1,43 @@
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.status import HTTP_400_BAD_REQUEST
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database import READ_METHODS, READ_PRIMARY_COOKIE
+
+
+class ReadYourWritesMiddleware:
+    """
+    Sends the reads of a client to the primary for a while after it writes:
+    the successful responses to the requests that may write set a cookie
+    until when its reads skip the replicas, which may not have replayed the
+    write yet.
+    """
+
+    def __init__(self, app: ASGIApp, stickiness: float):
+        self.app = app
+        self.stickiness = stickiness
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            # the failed requests rolled their writes back
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < HTTP_400_BAD_REQUEST
+            ):
+                until = time.time() + self.stickiness
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{READ_PRIMARY_COOKIE}={until:.3f}; "
+                    f"Max-Age={math.ceil(self.stickiness)}; "
+                    "Path=/; HttpOnly; SameSite=lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
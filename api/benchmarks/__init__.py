@@ -0,0 +1,2 @@
+# import all the models so the mappers can resolve their relationships
+from app.models import comment_model, history_model, part_model, user_model  # noqa: F401
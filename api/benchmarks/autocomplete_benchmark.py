@@ -0,0 +1,67 @@
+"""
+Compares the fuzzy (ILIKE) and similarity filters on the part name with and
+without the trigram indexes, and measures the autocomplete lookup.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.autocomplete_benchmark --parts 1000000 --term "part 4242"
+"""
+
+import argparse
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.crud.part_crud import PartCRUD
+from app.models.part_model import PartModel
+from benchmarks.utils import (
+    explain,
+    plan_node_types,
+    rollback_session,
+    seed_parts,
+    timeit,
+)
+
+
+def set_index_scans(db_session: Session, enabled: bool) -> None:
+    value = "on" if enabled else "off"
+    for setting in ("enable_indexscan", "enable_bitmapscan"):
+        db_session.execute(text(f"SET LOCAL {setting} = {value}"))
+
+
+def main(parts: int, term: str, repeat: int) -> None:
+    with rollback_session() as db_session:
+        seed_parts(db_session, parts)
+
+        queries = {
+            "ILIKE": PartCRUD.__apply_filters__(
+                db_session.query(PartModel), {"name": term}
+            ),
+            "similar": PartCRUD.__apply_filters__(
+                db_session.query(PartModel), {"name__similar": term}
+            ),
+        }
+        for enabled in (False, True):
+            set_index_scans(db_session, enabled)
+            for name, query in queries.items():
+                plan = explain(db_session, query.limit(20))
+                print(
+                    f"{name:>8} ({'index' if enabled else 'scan'}): "
+                    f"{plan['Execution Time']:9.3f} ms  "
+                    f"{' > '.join(plan_node_types(plan['Plan']))}"
+                )
+
+        autocomplete = timeit(
+            lambda: PartCRUD.autocomplete(db_session, term, limit=10), repeat
+        )
+        print(f"autocomplete:    {autocomplete:9.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=1_000_000)
+    parser.add_argument("--term", default="part 4242")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.parts, args.term, args.repeat)
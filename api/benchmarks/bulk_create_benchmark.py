@@ -0,0 +1,69 @@
+"""
+Compares the throughput of creating parts one by one (one request each, with
+their history) against the bulk create with a few chunk sizes.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.bulk_create_benchmark --parts 5000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from sqlalchemy.orm import Session
+
+from app.crud.part_crud import PartCRUD
+from app.models.user_model import UserModel
+from app.schemas.part_schemas import PartCreateSchema
+from benchmarks.utils import rollback_session
+
+
+def build_inputs(parts: int, prefix: str) -> list[PartCreateSchema]:
+    return [
+        PartCreateSchema(name=f"{prefix} {index}", description=f"part {index}")
+        for index in range(parts)
+    ]
+
+
+def measure(create: Callable[[Session, UserModel], None]) -> float:
+    """Returns the seconds taken by `create`, whose changes are rolled back."""
+    with rollback_session() as db_session:
+        user = db_session.query(UserModel).filter_by(name="Alice").one()
+        start = time.perf_counter()
+        create(db_session, user)
+        db_session.flush()
+        return time.perf_counter() - start
+
+
+def main(parts: int, chunk_sizes: list[int]) -> None:
+    def create_one_by_one(db_session: Session, user: UserModel) -> None:
+        for input in build_inputs(parts, "single"):
+            PartCRUD.create(db_session, input, user, commit=False)
+
+    duration = measure(create_one_by_one)
+    print(f"  one by one: {parts / duration:9.1f} parts/s")
+
+    for chunk_size in chunk_sizes:
+
+        def create_bulk(db_session: Session, user: UserModel) -> None:
+            result = PartCRUD.bulk_create(
+                db_session,
+                build_inputs(parts, "bulk"),  # noqa: B023
+                user,
+                chunk_size=chunk_size,  # noqa: B023
+                commit=False,
+            )
+            assert not result.errors
+
+        duration = measure(create_bulk)
+        print(f"bulk by {chunk_size:>4}: {parts / duration:9.1f} parts/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    main(args.parts, args.chunk_sizes)
@@ -0,0 +1,69 @@
+"""
+Compares retiring parts one by one (one soft delete each, with its history)
+against a single bulk soft delete, selecting the parts by their IDs and by
+a filter.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.bulk_soft_delete_benchmark --parts 5000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.crud.part_crud import PartCRUD
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+from benchmarks.utils import rollback_session, seed_parts
+
+
+def measure(
+    parts: int, retire: Callable[[Session, UserModel, list[UUID]], None]
+) -> float:
+    """Returns the parts retired per second, the changes are rolled back."""
+    with rollback_session() as db_session:
+        seed_parts(db_session, parts)
+        user = db_session.query(UserModel).filter_by(name="Alice").one()
+        ids = list(
+            db_session.scalars(
+                select(PartModel.id).where(PartModel.name.like("bench part %"))
+            )
+        )
+        start = time.perf_counter()
+        retire(db_session, user, ids)
+        return parts / (time.perf_counter() - start)
+
+
+def main(parts: int) -> None:
+    def one_by_one(db_session: Session, user: UserModel, ids: list[UUID]) -> None:
+        for part_id in ids:
+            PartCRUD.soft_delete(db_session, part_id, user, commit=False)
+
+    def by_ids(db_session: Session, user: UserModel, ids: list[UUID]) -> None:
+        PartCRUD.bulk_soft_delete(db_session, user, entity_ids=ids, commit=False)
+
+    def by_filter(db_session: Session, user: UserModel, ids: list[UUID]) -> None:
+        PartCRUD.bulk_soft_delete(
+            db_session, user, filters={"name": "bench part"}, commit=False
+        )
+
+    retirements = {
+        "one by one": one_by_one,
+        "bulk by ids": by_ids,
+        "bulk by filter": by_filter,
+    }
+    for name, retire in retirements.items():
+        print(f"{name:>14}: {measure(parts, retire):9.1f} parts/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=5000)
+    args = parser.parse_args()
+
+    main(args.parts)
@@ -0,0 +1,58 @@
+"""
+Compares reading parts by ID with the entity cache (sized and timed by the
+ENTITY_CACHE_* settings) against querying them, each read in its own session
+like a request for the part detail.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.entity_cache_benchmark --parts 100 --reads 10000
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import select
+
+from app.crud.part_crud import PartCRUD
+from app.database import DatabaseSession
+from app.models.part_model import PartModel
+from benchmarks.utils import seeded_parts
+
+
+def measure(part_ids: list[str], reads: int) -> float:
+    """Returns the parts read per second, from random IDs of the seeded parts."""
+    start = time.perf_counter()
+    for _ in range(reads):
+        with DatabaseSession() as db_session:
+            PartCRUD.get_one_by(db_session, "id", random.choice(part_ids))
+    return reads / (time.perf_counter() - start)
+
+
+def main(parts: int, reads: int) -> None:
+    entity_cache = PartCRUD.entity_cache
+    with seeded_parts(parts):
+        with DatabaseSession() as db_session:
+            part_ids = [
+                str(part_id)
+                for part_id in db_session.scalars(
+                    select(PartModel.id).where(PartModel.name.like("bench part %"))
+                )
+            ]
+        try:
+            PartCRUD.entity_cache = None
+            print(f"queried: {measure(part_ids, reads):9.1f} reads/s")
+        finally:
+            PartCRUD.entity_cache = entity_cache
+        if entity_cache is not None:
+            entity_cache.store.clear()
+            print(f" cached: {measure(part_ids, reads):9.1f} reads/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=100)
+    parser.add_argument("--reads", type=int, default=10_000)
+    args = parser.parse_args()
+
+    main(args.parts, args.reads)
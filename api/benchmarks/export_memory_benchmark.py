@@ -0,0 +1,69 @@
+"""
+Tracks the resident memory while exporting all the parts as NDJSON from a
+server-side cursor. The memory stays flat however many rows are exported,
+while loading the rows with `.all()` (--compare-all) grows with the table.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.export_memory_benchmark --parts 5000000
+"""
+
+import argparse
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from app.crud.part_crud import PartCRUD
+from app.schemas.part_schemas import PartSchema
+from app.utils.export import ExportFormat, export_chunks
+from benchmarks.utils import rollback_session, seed_parts
+
+# Number of samples of the resident memory taken during an export
+SAMPLES = 10
+
+
+def get_rss_mib() -> float:
+    # the current (not the peak) resident set size, Linux only
+    with open("/proc/self/status", encoding="utf-8") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmRSS is not available.")
+
+
+def export(label: str, entities: Iterable[Any], parts: int) -> None:
+    every = max(parts // SAMPLES, 1)
+    samples = []
+    exported = 0
+    start = time.perf_counter()
+    for chunk in export_chunks(entities, PartSchema, ExportFormat.NDJSON):
+        before = exported
+        exported += chunk.count(b"\n")
+        if exported // every > before // every:
+            samples.append(get_rss_mib())
+    duration = time.perf_counter() - start
+
+    print(f"{label}: {exported} rows in {duration:.1f} s")
+    print("  RSS MiB: " + " ".join(f"{sample:.0f}" for sample in samples))
+
+
+def main(parts: int, batch_size: int, compare_all: bool) -> None:
+    with rollback_session() as db_session:
+        seed_parts(db_session, parts)
+        db_session.expunge_all()
+        print(f"RSS after seeding: {get_rss_mib():.0f} MiB")
+
+        export("stream", PartCRUD.stream(db_session, batch_size=batch_size), parts)
+        if compare_all:
+            db_session.expunge_all()
+            export("all", PartCRUD.get_all(db_session), parts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=5_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--compare-all", action="store_true")
+    args = parser.parse_args()
+
+    main(args.parts, args.batch_size, args.compare_all)
@@ -0,0 +1,46 @@
+"""
+Compares the plan of the legacy cast-to-string ILIKE filter on
+`comments.part_id` with the typed equality filter used by CommentCRUD.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.filter_index_benchmark --parts 10000 --comments-per-part 10
+"""
+
+import argparse
+
+from sqlalchemy import String, cast
+
+from app.crud.comment_crud import CommentCRUD
+from app.models.comment_model import CommentModel
+from app.models.part_model import PartModel
+from benchmarks.utils import explain, plan_node_types, rollback_session, seed_parts
+
+
+def main(parts: int, comments_per_part: int) -> None:
+    with rollback_session() as db_session:
+        seed_parts(db_session, parts, comments_per_part)
+        part_id = str(db_session.query(PartModel.id).limit(1).scalar())
+
+        legacy_query = db_session.query(CommentModel).filter(
+            cast(CommentModel.part_id, String).ilike(f"%{part_id}%")
+        )
+        typed_query = CommentCRUD.__apply_filters__(
+            db_session.query(CommentModel), {"part_id": part_id}
+        )
+
+        for name, query in (("cast ILIKE", legacy_query), ("typed eq", typed_query)):
+            plan = explain(db_session, query)
+            print(
+                f"{name:>12}: {plan['Execution Time']:9.3f} ms  "
+                f"{' > '.join(plan_node_types(plan['Plan']))}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=10_000)
+    parser.add_argument("--comments-per-part", type=int, default=10)
+    args = parser.parse_args()
+
+    main(args.parts, args.comments_per_part)
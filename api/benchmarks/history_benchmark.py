@@ -0,0 +1,86 @@
+"""
+Measures the throughput of a write-heavy workload (part creates and updates,
+each recorded in the history) with every history mode.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.history_benchmark --mutations 2000 --per-transaction 2
+"""
+
+import argparse
+import time
+
+from sqlalchemy import text
+
+from app.crud.history_writer import get_history_writer
+from app.crud.part_crud import PartCRUD
+from app.database import DatabaseSession
+from app.models.user_model import UserModel
+from app.schemas.part_schemas import PartCreateSchema, PartUpdateSchema
+from app.settings import HistoryMode, env
+
+NAME_PREFIX = "history bench"
+
+
+def run(mutations: int, per_transaction: int) -> float:
+    """Returns the mutations per second."""
+    with DatabaseSession() as db_session:
+        user = db_session.query(UserModel).filter_by(name="Alice").one()
+        start = time.perf_counter()
+        for index in range(mutations // 2):
+            part = PartCRUD.create(
+                db_session,
+                input=PartCreateSchema(name=f"{NAME_PREFIX} {index}"),
+                current_user=user,
+                commit=False,
+            )
+            PartCRUD.update(
+                db_session,
+                entity_id=part.id,
+                input=PartUpdateSchema(name=part.name, description="updated"),
+                current_user=user,
+                commit=False,
+            )
+            if (index + 1) % max(per_transaction // 2, 1) == 0:
+                db_session.commit()
+        db_session.commit()
+        # the queued writer is done once its queue is written
+        get_history_writer().close()
+        return mutations / (time.perf_counter() - start)
+
+
+def clean_up() -> None:
+    with DatabaseSession() as db_session:
+        db_session.execute(
+            text(
+                "DELETE FROM history WHERE entity_id IN "
+                "(SELECT id FROM parts WHERE name LIKE :prefix)"
+            ),
+            {"prefix": f"{NAME_PREFIX} %"},
+        )
+        db_session.execute(
+            text("DELETE FROM parts WHERE name LIKE :prefix"),
+            {"prefix": f"{NAME_PREFIX} %"},
+        )
+        db_session.commit()
+
+
+def main(mutations: int, per_transaction: int) -> None:
+    for mode in HistoryMode:
+        env.history_mode = mode
+        get_history_writer.cache_clear()
+        try:
+            throughput = run(mutations, per_transaction)
+        finally:
+            clean_up()
+        print(f"{mode.value:>11}: {throughput:8.1f} mutations/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mutations", type=int, default=2000)
+    # mutations committed together, a create and an update at least
+    parser.add_argument("--per-transaction", type=int, default=2)
+    args = parser.parse_args()
+
+    main(args.mutations, args.per_transaction)
@@ -0,0 +1,109 @@
+"""
+Measures the serialization of history records with large changes (a 1 KB
+description replaced by another one), from the bound parameter to the bytes
+sent to the database, and the write throughput of such records.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.history_serialization_benchmark --records 10000
+"""
+
+import argparse
+import json
+import time
+from uuid import uuid4
+
+from psycopg.types.json import Jsonb, JsonbDumper
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.crud.history_crud import HistoryCrud
+from app.database import DatabaseSession
+from app.models.history_model import ChangesJSON
+from app.models.user_model import UserModel
+from app.schemas.history_schemas import (
+    HistoryAction,
+    HistoryCreateSchema,
+    ValueChangeSchema,
+)
+from app.settings import env
+from benchmarks.utils import timeit
+
+TABLE_NAME = "history serialization bench"
+DESCRIPTION_SIZE = 1024
+
+
+def build_changes() -> dict[str, ValueChangeSchema]:
+    return {
+        "name": ValueChangeSchema(old="Part", new="Renamed part"),
+        "description": ValueChangeSchema(
+            old="a" * DESCRIPTION_SIZE, new="b" * DESCRIPTION_SIZE
+        ),
+    }
+
+
+def legacy_dump(value: dict) -> bytes:
+    # what was done before: every value validated on its own, then the JSON
+    # string encoded once more as a JSON value by the driver
+    for val in value.values():
+        ValueChangeSchema(**val)
+    return json.dumps(json.dumps(value)).encode()
+
+
+def serialize(records: int) -> None:
+    value = HistoryCreateSchema(
+        table_name=TABLE_NAME,
+        entity_id=uuid4(),
+        user_id=uuid4(),
+        action=HistoryAction.UPDATE.value,
+        changes=build_changes(),
+    ).model_dump(mode="json")["changes"]
+    dumper = JsonbDumper(Jsonb)
+    process = ChangesJSON().bind_processor(postgresql.dialect())
+
+    duration = timeit(lambda: legacy_dump(value), records)
+    print(f"    legacy: {duration * 1000:8.2f} µs/record")
+    for validate in (False, True):
+        env.history_validate_changes = validate
+        duration = timeit(lambda: dumper.dump(process(value)), records)
+        mode = "validated" if validate else "trusted"
+        print(f"{mode:>10}: {duration * 1000:8.2f} µs/record")
+    env.history_validate_changes = False
+
+
+def write(records: int, batch_size: int) -> None:
+    with DatabaseSession() as db_session:
+        user = db_session.query(UserModel).filter_by(name="Alice").one()
+        inputs = [
+            HistoryCreateSchema(
+                table_name=TABLE_NAME,
+                entity_id=uuid4(),
+                user_id=user.id,
+                action=HistoryAction.UPDATE.value,
+                changes=build_changes(),
+            )
+            for _ in range(records)
+        ]
+        try:
+            start = time.perf_counter()
+            for index in range(0, records, batch_size):
+                HistoryCrud.create_many(db_session, inputs[index : index + batch_size])
+            db_session.commit()
+            duration = time.perf_counter() - start
+        finally:
+            db_session.execute(
+                text("DELETE FROM history WHERE table_name = :table_name"),
+                {"table_name": TABLE_NAME},
+            )
+            db_session.commit()
+    print(f"     write: {records / duration:8.1f} records/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    serialize(args.records)
+    write(args.records, args.batch_size)
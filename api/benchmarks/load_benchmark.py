@@ -0,0 +1,111 @@
+"""
+Compares the sync and the async database stack under concurrent load: serves
+the app with uvicorn once per stack (switched with ASYNC_DATABASE) and fires
+list requests from many concurrent clients, reporting requests/sec and the
+latency percentiles.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.load_benchmark --clients 500 --duration 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+
+import httpx
+
+from benchmarks.utils import seeded_parts
+
+HOST = "127.0.0.1"
+
+
+@contextmanager
+def serve(port: int, async_database: bool) -> Generator[str]:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            HOST,
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "ASYNC_DATABASE": str(async_database).lower()},
+    )
+    base_url = f"http://{HOST}:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{base_url}/parts", params={"limit": 1})
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def client(
+    http: httpx.AsyncClient, path: str, deadline: float, latencies: list[float]
+) -> int:
+    errors = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await http.get(path)
+            if response.is_error:
+                errors += 1
+        except httpx.HTTPError:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return errors
+
+
+async def load(base_url: str, path: str, clients: int, duration: float) -> None:
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        deadline = time.perf_counter() + duration
+        errors = await asyncio.gather(
+            *[client(http, path, deadline, latencies) for _ in range(clients)]
+        )
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{len(latencies) / duration:8.1f} req/s  "
+        f"p50 {percentiles[49] * 1000:8.1f} ms  "
+        f"p99 {percentiles[98] * 1000:8.1f} ms  "
+        f"errors {sum(errors)}"
+    )
+
+
+def main(parts: int, clients: int, duration: float, port: int) -> None:
+    path = "/parts?limit=20"
+    with seeded_parts(parts):
+        for async_database in (False, True):
+            with serve(port, async_database) as base_url:
+                print(f"{'async' if async_database else 'sync':>5}: ", end="")
+                asyncio.run(load(base_url, path, clients, duration))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    main(args.parts, args.clients, args.duration, args.port)
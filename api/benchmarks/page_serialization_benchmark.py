@@ -0,0 +1,64 @@
+"""
+Compares the CPU time and the allocations of serializing a `/parts` page:
+validating the response model from the ORM objects and dumping it (what
+FastAPI does with a response model) against the lean page serializer.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.page_serialization_benchmark --rows 1000
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from app.crud.part_crud import PartCRUD
+from app.schemas.base_schemas import PaginatedResponseSchema
+from app.schemas.part_schemas import PartSchema
+from app.utils.page_response import serialize_page
+from benchmarks.utils import rollback_session, seed_parts
+
+
+def measure(function: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    """Returns the CPU milliseconds per call and the peak allocated KiB."""
+    function()  # warm up the cached serializers
+    start = time.process_time()
+    for _ in range(repeat):
+        function()
+    cpu_time = (time.process_time() - start) / repeat * 1000
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_time, peak // 1024
+
+
+def main(rows: int, repeat: int) -> None:
+    with rollback_session() as db_session:
+        seed_parts(db_session, rows)
+        page = PartCRUD.get_paginated_list(db_session, offset=None, limit=rows)
+
+        adapter = TypeAdapter(PaginatedResponseSchema[PartSchema])
+        serializers = {
+            "response model": lambda: adapter.dump_json(
+                adapter.validate_python(page, from_attributes=True)
+            ),
+            "lean": lambda: serialize_page(page, PartSchema),
+        }
+        for name, serialize in serializers.items():
+            cpu_time, peak = measure(serialize, repeat)
+            print(f"{name:>14}: {cpu_time:7.2f} ms CPU, {peak:6d} KiB peak")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    main(args.rows, args.repeat)
@@ -0,0 +1,57 @@
+"""
+Measures the Python overhead of building a filtered and sorted list query,
+with the per-class filter/sort plan cache and with the cache cleared before
+every build (which is what every request paid before the cache existed).
+
+No database is needed.
+
+Usage (from the api folder):
+
+    python -m benchmarks.query_plan_benchmark --repeat 20000
+"""
+
+import argparse
+
+from sqlalchemy.orm import Query
+
+from app.crud.comment_crud import CommentCRUD
+from app.models.comment_model import CommentModel
+from benchmarks.utils import timeit
+
+FILTERS: dict[str, str | list[str]] = {
+    "part.name__prefix": "Part",
+    "content": "bolt",
+    "created_by": "00000000-0000-0000-0000-000000000001",
+}
+SORTING = {"part.name": "asc", "created_at": "desc"}
+
+
+def build_query() -> None:
+    query = Query(CommentModel)
+    query = CommentCRUD.__apply_filters__(query, FILTERS)
+    CommentCRUD.__apply_sorting__(query, SORTING)
+
+
+def build_query_without_plan_cache() -> None:
+    CommentCRUD.__get_filter_plan__.cache_clear()
+    CommentCRUD.__get_sort_plan__.cache_clear()
+    build_query()
+
+
+def main(repeat: int) -> None:
+    # warm up the caches
+    build_query()
+
+    uncached = timeit(build_query_without_plan_cache, repeat)
+    cached = timeit(build_query, repeat)
+
+    print(f"without plan cache: {uncached * 1000:8.2f} us / query")
+    print(f"   with plan cache: {cached * 1000:8.2f} us / query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+
+    main(args.repeat)
@@ -0,0 +1,64 @@
+"""
+Compares the global filter (ILIKE across the searchable fields) with the
+full-text search on the generated search vector for a list page of parts.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.search_benchmark --parts 1000000 --term "part 4242"
+"""
+
+import argparse
+
+from app.crud.part_crud import PartCRUD
+from app.models.part_model import PartModel
+from benchmarks.utils import (
+    explain,
+    plan_node_types,
+    rollback_session,
+    seed_parts,
+    timeit,
+)
+
+
+def main(parts: int, term: str, repeat: int) -> None:
+    with rollback_session() as db_session:
+        seed_parts(db_session, parts)
+
+        ilike_query = PartCRUD.__apply_global_filter__(
+            db_session.query(PartModel), term
+        ).limit(20)
+        search_query = PartCRUD.__apply_search__(
+            db_session.query(PartModel), term, rank=True
+        ).limit(20)
+
+        for name, query in (("ILIKE", ilike_query), ("tsvector", search_query)):
+            plan = explain(db_session, query)
+            print(
+                f"{name:>8} plan: {plan['Execution Time']:9.3f} ms  "
+                f"{' > '.join(plan_node_types(plan['Plan']))}"
+            )
+
+        ilike = timeit(
+            lambda: PartCRUD.get_paginated_list(
+                db_session, offset=None, limit=20, global_filter=term
+            ),
+            repeat,
+        )
+        search = timeit(
+            lambda: PartCRUD.get_paginated_list(
+                db_session, offset=None, limit=20, search=term
+            ),
+            repeat,
+        )
+        print(f"   ILIKE page: {ilike:9.3f} ms")
+        print(f"tsvector page: {search:9.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=1_000_000)
+    parser.add_argument("--term", default="part 4242")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.parts, args.term, args.repeat)
@@ -0,0 +1,60 @@
+"""
+Compares concurrent identical reads with and without read coalescing
+(READ_COALESCING): threads that each read the same parts in their own
+session, like the requests of a popular list hitting the threadpool at once.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.single_flight_benchmark --parts 100 --threads 16 --reads 200
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.cache.single_flight import read_flights
+from app.crud.part_crud import PartCRUD
+from app.database import DatabaseSession
+from app.settings import env
+from benchmarks.utils import seeded_parts
+
+
+def read_parts(names: list[str], reads: int) -> None:
+    for _ in range(reads):
+        with DatabaseSession() as db_session:
+            PartCRUD.get_all_by(db_session, "name", names)
+
+
+def measure(names: list[str], threads: int, reads: int) -> tuple[float, int]:
+    """Returns the reads per second, and the queries they ran."""
+    calls = read_flights.calls
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for _ in range(threads):
+            executor.submit(read_parts, names, reads)
+    elapsed = time.perf_counter() - start
+    queries = read_flights.calls - calls if env.read_coalescing else threads * reads
+    return threads * reads / elapsed, queries
+
+
+def main(parts: int, threads: int, reads: int) -> None:
+    names = [f"bench part {i}" for i in range(1, parts + 1)]
+    read_coalescing = env.read_coalescing
+    with seeded_parts(parts):
+        try:
+            for env.read_coalescing in (False, True):
+                rate, queries = measure(names, threads, reads)
+                label = "coalesced" if env.read_coalescing else "separate"
+                print(f"{label:>9}: {rate:9.1f} reads/s, {queries} queries")
+        finally:
+            env.read_coalescing = read_coalescing
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+
+    main(args.parts, args.threads, args.reads)
@@ -0,0 +1,96 @@
+"""
+Compares importing parts that already exist the way the import jobs did (try
+to create the part, catch the NotUniqueError, look the part up and update it)
+against the upsert, one part at a time and in bulk. Every part is committed
+on its own, like a request per part, except for the bulk upsert.
+
+Usage (from the api folder, against the database configured in .env):
+
+    python -m benchmarks.upsert_benchmark --parts 1000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.crud.part_crud import PartCRUD
+from app.database import DatabaseSession
+from app.errors import NotUniqueError
+from app.models.user_model import UserModel
+from app.schemas.part_schemas import PartCreateSchema, PartUpdateSchema
+from benchmarks.utils import seeded_parts
+
+
+def create_or_update(
+    db_session: Session, input: PartCreateSchema, user: UserModel
+) -> None:
+    try:
+        PartCRUD.create(db_session, input, user)
+    except NotUniqueError:
+        part = PartCRUD.get_one_by(db_session, "name", input.name)
+        PartCRUD.update(
+            db_session, part.id, PartUpdateSchema(**input.model_dump()), user
+        )
+
+
+def measure(
+    parts: int, import_parts: Callable[[Session, list[PartCreateSchema]], None]
+) -> float:
+    """Returns the parts imported per second, the seeded parts are updated."""
+    with DatabaseSession() as db_session:
+        inputs = [
+            PartCreateSchema(
+                name=f"bench part {index}", description=f"imported at {time.time()}"
+            )
+            for index in range(1, parts + 1)
+        ]
+        start = time.perf_counter()
+        import_parts(db_session, inputs)
+        return parts / (time.perf_counter() - start)
+
+
+def main(parts: int) -> None:
+    with DatabaseSession() as db_session:
+        user = db_session.query(UserModel).filter_by(name="Alice").one()
+        db_session.expunge(user)
+
+    def import_one_by_one(db_session: Session, inputs: list[PartCreateSchema]) -> None:
+        for input in inputs:
+            create_or_update(db_session, input, user)
+
+    def upsert_one_by_one(db_session: Session, inputs: list[PartCreateSchema]) -> None:
+        for input in inputs:
+            PartCRUD.upsert(db_session, input, user)
+
+    def upsert_in_bulk(db_session: Session, inputs: list[PartCreateSchema]) -> None:
+        PartCRUD.bulk_upsert(db_session, inputs, user)
+
+    importers = {
+        "create or update": import_one_by_one,
+        "upsert": upsert_one_by_one,
+        "bulk upsert": upsert_in_bulk,
+    }
+    with seeded_parts(parts):
+        try:
+            for name, import_parts in importers.items():
+                print(f"{name:>16}: {measure(parts, import_parts):8.1f} parts/s")
+        finally:
+            with DatabaseSession() as db_session:
+                db_session.execute(
+                    text(
+                        "DELETE FROM history WHERE entity_id IN"
+                        " (SELECT id FROM parts WHERE name LIKE 'bench part %')"
+                    )
+                )
+                db_session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=1000)
+    args = parser.parse_args()
+
+    main(args.parts)
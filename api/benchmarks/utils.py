@@ -0,0 +1,101 @@
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+from app.database import DatabaseSession
+
+
+@contextmanager
+def rollback_session() -> Generator[Session]:
+    """
+    Yields a session on the configured database whose changes are rolled back
+    at the end, so benchmarks can seed data without leaving anything behind.
+    """
+    session = DatabaseSession()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@contextmanager
+def seeded_parts(parts: int) -> Generator[None]:
+    """
+    Commits seeded parts for benchmarks that query the database from other
+    processes, and deletes them again at the end.
+    """
+    with DatabaseSession() as session:
+        seed_parts(session, parts)
+        session.commit()
+    try:
+        yield
+    finally:
+        with DatabaseSession() as session:
+            session.execute(text("DELETE FROM parts WHERE name LIKE 'bench part %'"))
+            session.commit()
+
+
+def seed_parts(db_session: Session, parts: int, comments_per_part: int = 0) -> None:
+    """
+    Seeds parts (and comments) with set based inserts, owned by the first user.
+    """
+    db_session.execute(
+        text(
+            """
+            INSERT INTO parts (id, name, description, created_at, created_by, updated_at, updated_by)
+            SELECT gen_random_uuid(), 'bench part ' || i, 'description of bench part ' || i,
+                now() - i * interval '1 second', u.id, now(), u.id
+            FROM generate_series(1, :parts) AS i, (SELECT id FROM users LIMIT 1) AS u
+            """
+        ),
+        {"parts": parts},
+    )
+    if comments_per_part:
+        db_session.execute(
+            text(
+                """
+                INSERT INTO comments (id, part_id, content, created_at, created_by, updated_at, updated_by)
+                SELECT gen_random_uuid(), p.id, 'bench comment ' || i, now(), p.created_by, now(), p.created_by
+                FROM parts AS p, generate_series(1, :comments) AS i
+                """
+            ),
+            {"comments": comments_per_part},
+        )
+    db_session.execute(text("ANALYZE parts"))
+    db_session.execute(text("ANALYZE comments"))
+
+
+def explain(db_session: Session, query: Query[Any]) -> dict[str, Any]:
+    """
+    Runs EXPLAIN ANALYZE for the query and returns the top plan node together
+    with the execution time.
+    """
+    statement = query.statement.compile(dialect=db_session.get_bind().dialect)
+    plan = (
+        db_session.connection()
+        .exec_driver_sql(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", statement.params
+        )
+        .scalar()
+    )
+    return plan[0]  # type: ignore
+
+
+def plan_node_types(plan: dict[str, Any]) -> list[str]:
+    nodes = [plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_node_types(child))
+    return nodes
+
+
+def timeit(function: Callable[[], Any], repeat: int) -> float:
+    """Returns the average duration of the function in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
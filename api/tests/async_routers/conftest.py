@@ -0,0 +1,115 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import errors
+from app.database import get_async_db_session
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+from app.routers import async_comment_router, async_part_router
+from app.utils.get_current_user import get_async_current_user
+
+
+@pytest.fixture(scope="session")
+def async_app() -> FastAPI:
+    """
+    Returns an app serving the async routers, like the main app does when
+    settings.async_database is set.
+    """
+    app = FastAPI()
+    errors.register_error_handlers(app)
+    app.include_router(async_part_router.app_router)
+    app.include_router(async_comment_router.app_router)
+    return app
+
+
+@pytest.fixture(scope="session")
+def async_db_engine(db_engine: Engine) -> AsyncEngine:
+    """
+    Creates the async engine for the test database (whose tables are created by
+    the db_engine fixture). Without a pool the engine keeps no connections bound
+    to the event loop of a previous test.
+    """
+    return create_async_engine(db_engine.url, poolclass=NullPool)
+
+
+@pytest.fixture
+async def async_db_session(async_db_engine: AsyncEngine):
+    """
+    Creates a new isolated async DB session for every test. Commits of the code
+    under test only release savepoints, the outer transaction is rolled back.
+    """
+    async with async_db_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            autoflush=False,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
+@pytest.fixture
+async def async_current_user(async_db_session: AsyncSession) -> UserModel:
+    alice = UserModel(id=uuid4(), name="Alice", role="admin", is_active=True)
+    async_db_session.add(alice)
+    await async_db_session.flush()
+    return alice
+
+
+@pytest.fixture
+async def async_mock_parts(
+    async_db_session: AsyncSession, async_current_user: UserModel
+) -> dict[str, PartModel]:
+    parts = {
+        key: PartModel(
+            name=name,
+            description=f"{name} description",
+            updated_by=async_current_user.id,
+            created_by=async_current_user.id,
+        )
+        for key, name in (("part_a", "Part A"), ("part_b", "Part B"))
+    }
+    async_db_session.add_all(parts.values())
+    await async_db_session.flush()
+    return parts
+
+
+@pytest.fixture
+async def async_client(
+    async_app: FastAPI,
+    async_db_session: AsyncSession,
+    async_current_user: UserModel,
+):
+    """
+    Serves the async app in the event loop of the test, with the DB session and
+    the current user overridden by the isolated test fixtures.
+    """
+
+    async def override_get_async_db_session():
+        yield async_db_session
+
+    async def override_get_async_current_user():
+        return async_current_user
+
+    async_app.dependency_overrides[get_async_db_session] = override_get_async_db_session
+    async_app.dependency_overrides[get_async_current_user] = (
+        override_get_async_current_user
+    )
+
+    transport = ASGITransport(app=async_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+    async_app.dependency_overrides.clear()
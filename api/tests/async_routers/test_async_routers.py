@@ -0,0 +1,74 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_parts_returns_paginated_list(
+    async_client: AsyncClient, async_mock_parts: dict[str, PartModel]
+):
+    response = await async_client.get("/parts", params={"limit": 1})
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response_json["total"] == len(async_mock_parts)
+    assert len(response_json["data"]) == 1
+    assert response_json["next_cursor"] is not None
+
+
+async def test_create_and_update_part_records_the_blame(
+    async_client: AsyncClient, async_current_user: UserModel
+):
+    response = await async_client.post(
+        "/parts", json={"name": "Async Part", "description": "created async"}
+    )
+    part = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert part["created_by"] == str(async_current_user.id)
+
+    response = await async_client.put(
+        f"/parts/{part['id']}",
+        json={"name": "Async Part", "description": "updated async"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["description"] == "updated async"
+
+
+async def test_get_part_with_unknown_id_returns_404(async_client: AsyncClient):
+    response = await async_client.get("/parts/00000000-0000-0000-0000-000000000000")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_create_and_list_part_comments(
+    async_client: AsyncClient,
+    async_mock_parts: dict[str, PartModel],
+    async_current_user: UserModel,
+):
+    part_id = async_mock_parts["part_a"].id
+
+    response = await async_client.post(
+        f"/parts/{part_id}/comments", json={"content": "Async comment"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["creator"]["name"] == async_current_user.name
+
+    response = await async_client.get(f"/parts/{part_id}/comments")
+
+    assert [comment["content"] for comment in response.json()] == ["Async comment"]
+
+
+async def test_autocomplete_parts(
+    async_client: AsyncClient, async_mock_parts: dict[str, PartModel]
+):
+    response = await async_client.get("/parts/autocomplete", params={"q": "Part B"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["id"] == str(async_mock_parts["part_b"].id)
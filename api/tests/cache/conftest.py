@@ -0,0 +1,16 @@
+import pytest
+
+from app.cache.user_cache import user_cache
+from app.crud.part_crud import PartCRUD
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    """The rows of a test are rolled back, so is what was cached of them."""
+    assert PartCRUD.entity_cache is not None
+    caches = [user_cache, PartCRUD.entity_cache.store]
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,211 @@
+import time
+from uuid import UUID
+
+import pytest
+from fastapi import Request
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import database
+from app.cache.entity_cache import EntityCache
+from app.crud.part_crud import PartCRUD
+from app.errors import NotFoundError
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+from app.replicas import ON_REPLICA_KEY
+from app.schemas.part_schemas import PartCreateSchema, PartUpdateSchema
+
+
+def forget_parts(db_session: Session) -> None:
+    """The parts the session holds are not read from the cache."""
+    for entity in list(db_session.identity_map.values()):
+        if isinstance(entity, PartModel):
+            db_session.expunge(entity)
+
+
+@pytest.fixture
+def part_cache() -> EntityCache[PartModel]:
+    assert PartCRUD.entity_cache is not None
+    return PartCRUD.entity_cache
+
+
+@pytest.fixture
+def cached_part_id(
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+    part_cache: EntityCache[PartModel],
+) -> UUID:
+    part_id = PartCRUD.create(
+        db_session=savepoint_session,
+        input=PartCreateSchema(name="Cached Part", description="Cached"),
+        current_user=savepoint_user,
+    ).id
+    forget_parts(savepoint_session)
+    PartCRUD.get_one_by(savepoint_session, "id", str(part_id))
+    assert len(part_cache.store) == 1
+    forget_parts(savepoint_session)
+    return part_id
+
+
+def test_cached_part_is_read_without_a_query(
+    savepoint_session: Session, cached_part_id: UUID, statements: list[str]
+):
+    statements.clear()
+
+    part = PartCRUD.get_one_by(savepoint_session, "id", str(cached_part_id))
+
+    assert statements == []
+    assert part in savepoint_session
+    assert (part.id, part.name, part.description) == (
+        cached_part_id,
+        "Cached Part",
+        "Cached",
+    )
+
+
+def test_committed_update_invalidates_the_cached_part(
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+    cached_part_id: UUID,
+    part_cache: EntityCache[PartModel],
+):
+    PartCRUD.update(
+        db_session=savepoint_session,
+        entity_id=cached_part_id,
+        input=PartUpdateSchema(name="Cached Part", description="Updated"),
+        current_user=savepoint_user,
+    )
+    assert len(part_cache.store) == 0
+    forget_parts(savepoint_session)
+
+    part = PartCRUD.get_one_by(savepoint_session, "id", str(cached_part_id))
+
+    assert part.description == "Updated"
+
+
+def test_committed_soft_delete_invalidates_the_cached_part(
+    savepoint_session: Session, savepoint_user: UserModel, cached_part_id: UUID
+):
+    PartCRUD.bulk_soft_delete(
+        db_session=savepoint_session,
+        current_user=savepoint_user,
+        entity_ids=[cached_part_id],
+    )
+    forget_parts(savepoint_session)
+
+    with pytest.raises(NotFoundError):
+        PartCRUD.get_one_by(savepoint_session, "id", str(cached_part_id))
+
+
+def test_uncommitted_changes_bypass_the_cache(
+    savepoint_session: Session,
+    cached_part_id: UUID,
+    part_cache: EntityCache[PartModel],
+):
+    savepoint_session.execute(
+        update(PartModel)
+        .where(PartModel.id == cached_part_id)
+        .values(description="Uncommitted")
+    )
+
+    part = PartCRUD.get_one_by(savepoint_session, "id", str(cached_part_id))
+    assert part.description == "Uncommitted"
+
+    # a rolled back change leaves the cache as it was
+    savepoint_session.rollback()
+    assert len(part_cache.store) == 1
+
+
+def test_flushed_change_invalidates_the_cached_part_on_commit(
+    savepoint_session: Session,
+    cached_part_id: UUID,
+    part_cache: EntityCache[PartModel],
+):
+    part = savepoint_session.get_one(PartModel, cached_part_id)
+    part.description = "Flushed"
+    savepoint_session.flush()
+    assert len(part_cache.store) == 1
+
+    savepoint_session.commit()
+
+    assert len(part_cache.store) == 0
+
+
+def test_savepoint_rollback_keeps_the_invalidations_of_the_transaction(
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+    cached_part_id: UUID,
+    part_cache: EntityCache[PartModel],
+):
+    PartCRUD.update(
+        db_session=savepoint_session,
+        entity_id=cached_part_id,
+        input=PartUpdateSchema(name="Cached Part", description="Updated"),
+        current_user=savepoint_user,
+        commit=False,
+    )
+    # the first chunk violates NOT NULL and rolls its savepoint back, the
+    # second one releases its savepoint
+    PartCRUD.bulk_create(
+        savepoint_session,
+        [
+            PartCreateSchema.model_construct(name=None, description=None),
+            PartCreateSchema(name="Bulk Part"),
+        ],
+        savepoint_user,
+        chunk_size=1,
+        commit=False,
+    )
+    assert len(part_cache.store) == 1
+
+    savepoint_session.commit()
+
+    assert len(part_cache.store) == 0
+
+
+def test_reads_of_a_client_that_wrote_skip_the_cache(
+    monkeypatch: pytest.MonkeyPatch,
+    savepoint_session: Session,
+    cached_part_id: UUID,
+    part_cache: EntityCache[PartModel],
+):
+    # written by another worker, whose invalidation this one missed
+    savepoint_session.execute(
+        text("UPDATE parts SET description = 'Written' WHERE id = :id"),
+        {"id": cached_part_id},
+    )
+    # the sessions of the requests join the test transaction
+    monkeypatch.setattr(
+        database,
+        "policy_sessionmaker",
+        lambda policy, bind: sessionmaker(
+            bind=savepoint_session.connection(),
+            join_transaction_mode="create_savepoint",
+        ),
+    )
+    cookie = f"{database.READ_PRIMARY_COOKIE}={time.time() + 5}"
+
+    def read(headers: list[tuple[bytes, bytes]]) -> str | None:
+        request = Request({"type": "http", "method": "GET", "headers": headers})
+        sessions = database.get_db_session(request)
+        part = PartCRUD.get_one_by(next(sessions), "id", str(cached_part_id))
+        sessions.close()
+        return part.description
+
+    assert read([]) == "Cached"
+    assert read([(b"cookie", cookie.encode())]) == "Written"
+    assert part_cache.store.get(str(cached_part_id)) is not None
+
+
+def test_replica_reads_are_not_cached(
+    savepoint_session: Session,
+    cached_part_id: UUID,
+    part_cache: EntityCache[PartModel],
+):
+    part_cache.store.clear()
+    savepoint_session.info[ON_REPLICA_KEY] = True
+
+    part = PartCRUD.get_one_by(savepoint_session, "id", str(cached_part_id))
+
+    assert part.description == "Cached"
+    assert len(part_cache.store) == 0
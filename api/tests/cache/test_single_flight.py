@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.cache import single_flight
+from app.cache.single_flight import SingleFlight
+from app.models.part_model import PartModel
+from app.replicas import READ_PRIMARY_KEY
+from app.settings import env
+
+# seconds to wait for the other threads
+THREAD_TIMEOUT = 5
+
+
+def detached_part() -> PartModel:
+    part = PartModel(id=uuid4(), name="Coalesced Part", description="Coalesced")
+    make_transient_to_detached(part)
+    return part
+
+
+def wait_for(condition) -> None:
+    deadline = time.monotonic() + THREAD_TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_concurrent_reads_share_one_read():
+    flights = SingleFlight()
+    release = threading.Event()
+    reads: list[PartModel] = []
+    results: dict[str, PartModel] = {}
+    leader_session, follower_session = Session(), Session()
+
+    def read() -> PartModel:
+        release.wait(THREAD_TIMEOUT)
+        part = leader_session.merge(detached_part(), load=False)
+        reads.append(part)
+        return part
+
+    def call(name: str, db_session: Session) -> None:
+        results[name] = flights.do(db_session, "part", read)
+
+    leader = threading.Thread(target=call, args=("leader", leader_session))
+    leader.start()
+    wait_for(lambda: flights.calls == 1)
+    follower = threading.Thread(target=call, args=("follower", follower_session))
+    follower.start()
+    wait_for(lambda: flights.coalesced == 1)
+    release.set()
+    leader.join(THREAD_TIMEOUT)
+    follower.join(THREAD_TIMEOUT)
+
+    assert len(reads) == 1
+    assert results["leader"] is reads[0]
+    # the follower gets its own copy, in its own session
+    assert results["follower"] is not reads[0]
+    assert results["follower"] in follower_session
+    assert results["follower"].id == reads[0].id
+    assert results["follower"].description == "Coalesced"
+    assert (flights.calls, flights.coalesced) == (1, 1)
+
+
+def test_read_without_followers_is_not_copied(monkeypatch: pytest.MonkeyPatch):
+    flights = SingleFlight()
+    monkeypatch.setattr(single_flight, "copy_result", pytest.fail)
+    part = detached_part()
+
+    assert flights.do(Session(), "part", lambda: part) is part
+    assert (flights.calls, flights.coalesced) == (1, 0)
+
+
+def test_follower_reads_on_its_own_when_the_read_stalls(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    flights = SingleFlight()
+    monkeypatch.setattr(env, "read_coalescing_timeout_s", 0.01)
+    release = threading.Event()
+    results: dict[str, str] = {}
+
+    def stalled_read() -> str:
+        release.wait(THREAD_TIMEOUT)
+        return "stalled"
+
+    def call() -> None:
+        results["leader"] = flights.do(Session(), "part", stalled_read)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    wait_for(lambda: flights.calls == 1)
+
+    assert flights.do(Session(), "part", lambda: "own") == "own"
+    assert flights.coalesced == 1
+    release.set()
+    leader.join(THREAD_TIMEOUT)
+    assert results["leader"] == "stalled"
+
+
+def test_error_of_the_read_is_raised_to_the_followers():
+    flights = SingleFlight()
+    release = threading.Event()
+    errors: list[Exception] = []
+
+    def read() -> None:
+        release.wait(THREAD_TIMEOUT)
+        raise ValueError("The read failed.")
+
+    def call() -> None:
+        try:
+            flights.do(Session(), "part", read)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    threads[0].start()
+    wait_for(lambda: flights.calls == 1)
+    threads[1].start()
+    wait_for(lambda: flights.coalesced == 1)
+    release.set()
+    for thread in threads:
+        thread.join(THREAD_TIMEOUT)
+
+    assert len(errors) == len(threads)
+    # the next call reads again
+    with pytest.raises(ValueError, match="The read failed"):
+        flights.do(Session(), "part", read)
+    assert (flights.calls, flights.coalesced) == (2, 1)
+
+
+def test_sessions_that_wrote_read_on_their_own():
+    flights = SingleFlight()
+    db_session = Session()
+    db_session.add(PartModel(name="Pending Part"))
+
+    assert flights.do(db_session, "part", lambda: None) is None
+    assert (flights.calls, flights.coalesced) == (0, 0)
+
+
+def test_reads_of_a_client_that_wrote_are_not_coalesced():
+    flights = SingleFlight()
+    db_session = Session(info={READ_PRIMARY_KEY: True})
+
+    assert flights.do(db_session, "part", lambda: None) is None
+    assert (flights.calls, flights.coalesced) == (0, 0)
+
+
+def test_savepoints_leave_the_writes_of_the_transaction(savepoint_session: Session):
+    flights = SingleFlight()
+    savepoint_session.execute(
+        update(PartModel).where(PartModel.id == uuid4()).values(name="Written")
+    )
+    # released, then rolled back
+    with savepoint_session.begin_nested():
+        pass
+    savepoint_session.begin_nested().rollback()
+
+    assert flights.do(savepoint_session, "part", lambda: None) is None
+    assert (flights.calls, flights.coalesced) == (0, 0)
+
+
+@pytest.mark.anyio
+async def test_concurrent_async_reads_share_one_read():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    reads: list[PartModel] = []
+    sessions = [AsyncSession() for _ in range(3)]
+
+    async def read() -> list[PartModel]:
+        await release.wait()
+        part = sessions[0].sync_session.merge(detached_part(), load=False)
+        reads.append(part)
+        return [part]
+
+    async def call(db_session: AsyncSession) -> list[PartModel]:
+        return await flights.do_async(db_session, "parts", read)
+
+    tasks = [asyncio.create_task(call(db_session)) for db_session in sessions]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(reads) == 1
+    assert results[0] == reads
+    for db_session, parts in zip(sessions[1:], results[1:], strict=True):
+        assert parts[0] is not reads[0]
+        assert parts[0] in db_session.sync_session
+        assert parts[0].name == "Coalesced Part"
+    assert (flights.calls, flights.coalesced) == (1, 2)
@@ -0,0 +1,68 @@
+from app.cache.ttl_cache import TTLCache
+
+TTL = 10
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_the_ttl():
+    clock = FakeClock()
+    cache = TTLCache[str, int](max_size=2, ttl=TTL, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = TTL - 1
+    assert cache.get("a") == 1
+    clock.now = TTL
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache[str, int](max_size=2, ttl=TTL)
+    values = {"a": 1, "b": 2, "c": 3}
+    cache.set("a", values["a"])
+    cache.set("b", values["b"])
+    cache.get("a")
+
+    cache.set("c", values["c"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == values["a"]
+    assert cache.get("c") == values["c"]
+
+
+def test_value_loaded_before_an_invalidation_is_not_stored():
+    cache = TTLCache[str, int](max_size=2, ttl=TTL)
+    generation = cache.generation
+
+    cache.invalidate("a")
+    cache.set("a", 1, generation=generation)
+
+    assert cache.get("a") is None
+    cache.set("a", 1, generation=cache.generation)
+    assert cache.get("a") == 1
+
+
+def test_invalidate_where_removes_the_matching_values():
+    cache = TTLCache[str, int](max_size=3, ttl=TTL)
+    values = {"a": 1, "b": 2, "c": 3}
+    for key, value in values.items():
+        cache.set(key, value)
+
+    cache.invalidate_where(lambda value: value % 2 == 1)
+
+    assert len(cache) == 1
+    assert cache.get("b") == values["b"]
+
+
+def test_cache_of_size_zero_keeps_nothing():
+    cache = TTLCache[str, int](max_size=0, ttl=TTL)
+
+    assert cache.get_or_load("a", lambda: 1) == 1
+    assert cache.get("a") is None
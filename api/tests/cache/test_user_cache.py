@@ -0,0 +1,117 @@
+import threading
+
+import psycopg
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from app.cache import invalidation
+from app.cache.invalidation import INVALIDATION_CHANNEL, InvalidationListener
+from app.cache.user_cache import USER_CACHE, user_cache
+from app.crud.user_crud import UserCRUD
+from app.models.user_model import UserModel
+from app.schemas.user_schemas import UserUpdateSchema
+from app.settings import env
+from app.utils.get_current_user import STUB_PRINCIPAL, get_current_user
+
+# seconds to wait for the listener
+LISTENER_TIMEOUT = 5
+
+
+def test_cached_user_is_resolved_without_a_query(
+    db_session: Session, current_user: UserModel, statements: list[str]
+):
+    assert get_current_user(db_session) is current_user
+    assert len(statements) == 1
+
+    statements.clear()
+    assert get_current_user(db_session) is current_user
+    assert statements == []
+
+
+def test_cached_user_is_merged_into_other_sessions(
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+    statements: list[str],
+):
+    user = get_current_user(savepoint_session)
+    savepoint_session.expunge_all()
+    statements.clear()
+
+    user = get_current_user(savepoint_session)
+
+    assert user is not savepoint_user
+    assert user.id == savepoint_user.id
+    assert user.role == "admin"
+    assert statements == []
+
+
+def test_committed_user_update_invalidates_the_cache(
+    savepoint_session: Session, savepoint_user: UserModel
+):
+    get_current_user(savepoint_session)
+    assert len(user_cache) == 1
+
+    UserCRUD.update(
+        db_session=savepoint_session,
+        entity_id=savepoint_user.id,
+        input=UserUpdateSchema(name=STUB_PRINCIPAL, role="viewer", is_active=True),
+        current_user=savepoint_user,
+    )
+
+    assert len(user_cache) == 0
+    assert get_current_user(savepoint_session).role == "viewer"
+
+
+def test_rolled_back_user_change_keeps_the_cache(
+    savepoint_session: Session, savepoint_user: UserModel
+):
+    get_current_user(savepoint_session)
+
+    savepoint_user.role = "viewer"
+    savepoint_session.flush()
+    savepoint_session.rollback()
+
+    assert len(user_cache) == 1
+
+
+def test_invalidations_are_published_with_the_commit(
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+    statements: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(env, "cache_notify", True)
+
+    savepoint_user.role = "viewer"
+    savepoint_session.commit()
+
+    assert any("pg_notify" in statement for statement in statements)
+
+
+def test_listener_applies_the_invalidations_of_other_workers(
+    db_engine: Engine, monkeypatch: pytest.MonkeyPatch
+):
+    conninfo = db_engine.url.set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+    connected, invalidated = threading.Event(), threading.Event()
+    # all the caches are invalidated once the listener is connected
+    monkeypatch.setitem(
+        invalidation.caches, USER_CACHE, lambda key: key is None and connected.set()
+    )
+    monkeypatch.setitem(
+        invalidation.caches, "parts", lambda key: key == "1" and invalidated.set()
+    )
+
+    listener = InvalidationListener(conninfo, reconnect_interval=0.1)
+    listener.start()
+    try:
+        assert connected.wait(LISTENER_TIMEOUT)
+        with psycopg.connect(conninfo, autocommit=True) as connection:
+            connection.execute(
+                "SELECT pg_notify(%s, %s)", (INVALIDATION_CHANNEL, "parts:1")
+            )
+        assert invalidated.wait(LISTENER_TIMEOUT)
+    finally:
+        listener.close()
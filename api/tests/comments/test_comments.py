@@ -1,3 +1,6 @@
+import csv
+import io
+import json
 from uuid import uuid4
 
 from fastapi import status
@@ -111,3 +114,68 @@ def test_update_nonexistent_comment_returns_404(
     response = client.put(f"/comments/{comment_id}", json=updated_data)
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_comments_with_fields_returns_creator_only_when_asked_for(
+    client: TestClient, current_user: UserModel, mock_comment: CommentModel
+):
+    response = client.get("/comments", params={"fields": "id,content"})
+    data = response.json()["data"]
+
+    assert response.status_code == status.HTTP_200_OK
+    assert data == [{"id": str(mock_comment.id), "content": mock_comment.content}]
+
+    response = client.get("/comments", params={"fields": "content,creator"})
+    data = response.json()["data"]
+
+    assert data[0]["creator"]["name"] == current_user.name
+
+
+def test_export_comments_with_creator_as_csv(
+    export_client: TestClient, current_user: UserModel, mock_comment: CommentModel
+):
+    response = export_client.get(
+        "/comments/export", params={"format": "csv", "fields": "content,creator"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    header, row = csv.reader(io.StringIO(response.text))
+    assert header == ["content", "creator"]
+    assert row[0] == mock_comment.content
+    assert json.loads(row[1])["name"] == current_user.name
+
+
+def test_bulk_create_comments_reports_comments_of_nonexistent_parts(
+    client: TestClient, mock_parts: dict[str, PartModel], mock_crud_no_commit
+):
+    part_a = mock_parts["part_a"]
+    data = [
+        {"content": "First", "part_id": str(part_a.id)},
+        {"content": "Orphan", "part_id": str(uuid4())},
+        {"content": "Second", "part_id": str(part_a.id)},
+    ]
+
+    response = client.post("/comments/bulk", json=data)
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [comment["content"] for comment in response_json["created"]] == [
+        "First",
+        "Second",
+    ]
+    (error,) = response_json["errors"]
+    assert error["index"] == 1
+    assert "part_id" in error["detail"]
+
+
+def test_bulk_delete_comments_of_a_part(
+    client: TestClient, mock_comment: CommentModel, mock_crud_no_commit
+):
+    response = client.post(
+        "/comments/bulk/delete",
+        json={"filters": {"part_id": str(mock_comment.part_id)}},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"count": 1}
+    assert client.get("/comments").json()["total"] == 0
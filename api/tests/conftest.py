@@ -1,20 +1,37 @@
+from collections.abc import Iterator
 from uuid import UUID, uuid4
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event, text
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.main import app, get_db_session
 from app.models.base_model import BaseModel
+from app.models.comment_model import CommentModel
+from app.models.part_model import PartModel
 from app.models.user_model import UserModel
-from app.settings import EnvMode, Settings
+from app.settings import EnvMode, Settings, env
 from app.utils.get_current_user import get_current_user
 
 # The fixed ID for testing system/default user
 TEST_ALICE_ID = UUID("00000000-0000-0000-0000-000000000001")
 
 
+@pytest.fixture
+def anyio_backend() -> str:
+    """Runs the async tests (marked with anyio) on asyncio."""
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def strict_query_budgets():
+    """Requests beyond the query budget of their endpoint fail the test."""
+    env.query_budget_strict = True
+    yield
+    env.query_budget_strict = False
+
+
 @pytest.fixture(scope="session")
 def test_settings() -> Settings:
     """
@@ -48,6 +65,10 @@ def db_engine(test_settings: Settings):
 
     engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=False)
 
+    # Extensions the schema depends on (created by the migrations otherwise)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
     # Create all tables before the session starts
     BaseModel.metadata.create_all(bind=engine)
 
@@ -104,6 +125,56 @@ def current_user(db_session: Session) -> UserModel:
     return alice
 
 
+@pytest.fixture
+def mock_parts(db_session: Session, current_user: UserModel) -> dict[str, PartModel]:
+    # Default Parts Data
+    default_part_first = PartModel(
+        name="Part A",
+        description="Part A description",
+        updated_by=current_user.id,
+        created_by=current_user.id,
+    )
+    default_part_second = PartModel(
+        name="Part B",
+        description="Part B description",
+        updated_by=current_user.id,
+        created_by=current_user.id,
+    )
+
+    db_session.add_all([default_part_first, default_part_second])
+
+    # to assign ID to new parts
+    db_session.flush()
+
+    return {
+        "part_a": default_part_first,
+        "part_b": default_part_second,
+    }
+
+
+@pytest.fixture
+def mock_comment(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+) -> CommentModel:
+    part_a = mock_parts["part_a"]
+
+    # Default Comment Data
+    default_comment = CommentModel(
+        content="Test Comment",
+        part_id=part_a.id,
+        updated_by=current_user.id,
+        created_by=current_user.id,
+    )
+
+    # create mock comment
+    db_session.add(default_comment)
+
+    # to assign ID to new comment
+    db_session.flush()
+
+    return default_comment
+
+
 @pytest.fixture
 def client(db_session: Session, current_user: UserModel):
     """
@@ -134,3 +205,62 @@ def client(db_session: Session, current_user: UserModel):
     # Cleanup: Remove overrides after the test is done
     app.dependency_overrides.pop(get_db_session)
     app.dependency_overrides.pop(get_current_user)
+
+
+@pytest.fixture
+def export_client(client: TestClient, db_session: Session):
+    """
+    The client with sessions closed once the response is sent, like those of
+    the app, for the routes streaming their response from the session. The
+    sessions share the connection of the test transaction.
+    """
+
+    def override_get_db_session():
+        session = Session(
+            bind=db_session.connection(), join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db_session] = override_get_db_session
+    return client
+
+
+@pytest.fixture
+def savepoint_session(db_engine: Engine):
+    """
+    Yields a session whose commits only release savepoints, for tests of what
+    happens when the code under test commits. Everything is rolled back at
+    the end.
+    """
+    with db_engine.connect() as connection:
+        transaction = connection.begin()
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            transaction.rollback()
+
+
+@pytest.fixture
+def savepoint_user(savepoint_session: Session) -> UserModel:
+    user = UserModel(id=uuid4(), name="Alice", role="admin", is_active=True)
+    savepoint_session.add(user)
+    savepoint_session.commit()
+    return user
+
+
+@pytest.fixture
+def statements(db_engine: Engine) -> Iterator[list[str]]:
+    """Collects the SQL statements sent to the database."""
+    collected: list[str] = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        collected.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", collect)
+    yield collected
+    event.remove(db_engine, "before_cursor_execute", collect)
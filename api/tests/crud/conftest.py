@@ -0,0 +1,10 @@
+import pytest
+
+from app.crud import history_capture
+from app.crud.history_writer import HistoryWriter
+
+
+@pytest.fixture(autouse=True)
+def inline_history(monkeypatch: pytest.MonkeyPatch):
+    # the history is written with the mutations, whatever the configured mode
+    monkeypatch.setattr(history_capture, "get_history_writer", HistoryWriter)
@@ -0,0 +1,166 @@
+from typing import Any, cast
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.part_crud import PartCRUD
+from app.errors import NotUniqueError
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+from app.schemas.history_schemas import HistoryAction
+from app.schemas.part_schemas import PartCreateSchema, PartUpdateSchema
+from tests.utils import get_history
+
+# the set based update and the history records
+BULK_WRITE_ROUND_TRIPS = 2
+
+
+def test_bulk_update_by_ids_is_a_single_update(
+    db_session: Session,
+    current_user: UserModel,
+    mock_parts: dict[str, PartModel],
+    statements: list[str],
+):
+    part_a, part_b = mock_parts["part_a"], mock_parts["part_b"]
+
+    count = PartCRUD.bulk_update(
+        db_session=db_session,
+        input=PartUpdateSchema(description="Retired"),
+        current_user=current_user,
+        entity_ids=[part_a.id, part_b.id],
+        commit=False,
+    )
+
+    assert count == len(mock_parts)
+    assert len(statements) == BULK_WRITE_ROUND_TRIPS
+    assert statements[0].startswith("UPDATE parts")
+    # the entities in the session are updated too, and only the given
+    # fields are set
+    assert part_a.description == part_b.description == "Retired"
+    assert part_a.name == "Part A"
+    records = get_history(db_session, action=HistoryAction.UPDATE)
+    assert {record.entity_id for record in records} == {part_a.id, part_b.id}
+    assert all(
+        set(cast(dict[str, Any], record.changes)) == {"description"}
+        for record in records
+    )
+
+
+def test_bulk_update_by_filters_records_only_the_changed_entities(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    count = PartCRUD.bulk_update(
+        db_session=db_session,
+        input=PartUpdateSchema(description="Part A description"),
+        current_user=current_user,
+        filters={"name": "Part"},
+        commit=False,
+    )
+
+    assert count == len(mock_parts)
+    (record,) = get_history(db_session, action=HistoryAction.UPDATE)
+    assert record.entity_id == mock_parts["part_b"].id
+
+
+def test_bulk_update_without_selection_raises_value_error(
+    db_session: Session, current_user: UserModel
+):
+    with pytest.raises(ValueError, match="by ids or filters"):
+        PartCRUD.bulk_update(
+            db_session=db_session,
+            input=PartUpdateSchema(description="Everything"),
+            current_user=current_user,
+            commit=False,
+        )
+
+
+def test_bulk_update_with_filters_selecting_nothing_raises_value_error(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    # an empty value filters nothing, it would select all the entities
+    with pytest.raises(ValueError, match="by ids or filters"):
+        PartCRUD.bulk_soft_delete(
+            db_session=db_session,
+            current_user=current_user,
+            filters={"name": ""},
+            commit=False,
+        )
+
+    assert all(part.deleted_at is None for part in mock_parts.values())
+
+
+def test_bulk_update_of_a_unique_field_on_several_entities_raises_value_error(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    with pytest.raises(ValueError, match="single entity"):
+        PartCRUD.bulk_update(
+            db_session=db_session,
+            input=PartUpdateSchema(name="Same name"),
+            current_user=current_user,
+            filters={"name": "Part"},
+            commit=False,
+        )
+
+
+def test_bulk_update_to_a_taken_unique_value_raises_not_unique_error(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    with pytest.raises(NotUniqueError):
+        PartCRUD.bulk_update(
+            db_session=db_session,
+            input=PartUpdateSchema(name=mock_parts["part_b"].name),
+            current_user=current_user,
+            entity_ids=[mock_parts["part_a"].id],
+            commit=False,
+        )
+
+
+def test_bulk_soft_delete_hides_the_entities_and_records_their_deletion(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    part_a = mock_parts["part_a"]
+
+    count = PartCRUD.bulk_soft_delete(
+        db_session=db_session,
+        current_user=current_user,
+        entity_ids=[part_a.id],
+        commit=False,
+    )
+
+    assert count == 1
+    assert PartCRUD.get_one_or_null_by(db_session, "id", str(part_a.id)) is None
+    (record,) = get_history(db_session, action=HistoryAction.DELETE)
+    changes = cast(dict[str, Any], record.changes)
+    assert set(changes) == {"deleted_at", "deleted_by"}
+    assert changes["deleted_by"]["new"] == str(current_user.id)
+
+    # deleted entities are not selected again
+    count = PartCRUD.bulk_soft_delete(
+        db_session=db_session,
+        current_user=current_user,
+        entity_ids=[part_a.id],
+        commit=False,
+    )
+    assert count == 0
+
+
+def test_upsert_restores_a_soft_deleted_entity(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    part_a = mock_parts["part_a"]
+    PartCRUD.bulk_soft_delete(
+        db_session=db_session,
+        current_user=current_user,
+        entity_ids=[part_a.id],
+        commit=False,
+    )
+
+    part = PartCRUD.upsert(
+        db_session=db_session,
+        input=PartCreateSchema(name=part_a.name),
+        current_user=current_user,
+        commit=False,
+    )
+
+    assert part is part_a
+    assert part.deleted_at is None
@@ -0,0 +1,53 @@
+from collections.abc import Mapping
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.history_model import HistoryModel
+from app.models.user_model import UserModel
+from app.schemas.history_schemas import HistoryAction
+from app.settings import env
+
+
+def insert_history(
+    db_session: Session, user: UserModel, changes: Mapping[str, object]
+) -> HistoryModel:
+    return db_session.scalars(
+        insert(HistoryModel).returning(HistoryModel),
+        [
+            {
+                "user_id": user.id,
+                "table_name": "parts",
+                "entity_id": uuid4(),
+                "action": HistoryAction.UPDATE,
+                "changes": changes,
+            }
+        ],
+    ).one()
+
+
+def test_changes_are_stored_as_a_json_object(
+    db_session: Session, current_user: UserModel
+):
+    changes = {"description": {"old": "a" * 1024, "new": None}}
+
+    history = insert_history(db_session, current_user, changes)
+
+    assert history.changes == changes
+    json_type = db_session.scalar(
+        select(func.jsonb_typeof(HistoryModel.changes)).where(
+            HistoryModel.id == history.id
+        )
+    )
+    assert json_type == "object"
+
+
+def test_validating_mode_rejects_invalid_changes(
+    monkeypatch: pytest.MonkeyPatch, db_session: Session, current_user: UserModel
+):
+    monkeypatch.setattr(env, "history_validate_changes", True)
+
+    with pytest.raises(ValueError, match="Invalid JSON format"):
+        insert_history(db_session, current_user, {"name": "not a change"})
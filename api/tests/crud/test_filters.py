@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.comment_crud import CommentCRUD
+from app.crud.part_crud import PartCRUD
+from app.models.comment_model import CommentModel
+from app.models.part_model import PartModel
+
+
+def filter_parts(db_session: Session, filters: dict) -> list[PartModel]:
+    query = PartCRUD.__apply_filters__(db_session.query(PartModel), filters)
+    return query.order_by(PartModel.name).all()
+
+
+def test_uuid_filter_compares_typed_value_without_cast(
+    db_session: Session, mock_comment: CommentModel
+):
+    query = CommentCRUD.__apply_filters__(
+        db_session.query(CommentModel), {"part_id": str(mock_comment.part_id)}
+    )
+
+    assert "CAST" not in str(query.statement)
+    assert query.all() == [mock_comment]
+
+
+def test_uuid_filter_with_invalid_value_raises_value_error(db_session: Session):
+    with pytest.raises(ValueError, match="UUID"):
+        CommentCRUD.__apply_filters__(
+            db_session.query(CommentModel), {"part_id": "not-a-uuid"}
+        )
+
+
+def test_fuzzy_text_field_keeps_liberal_search(
+    db_session: Session, mock_parts: dict[str, PartModel]
+):
+    assert filter_parts(db_session, {"name": "part a"}) == [mock_parts["part_a"]]
+
+
+@pytest.mark.parametrize(
+    ("filters", "expected"),
+    [
+        ({"name__eq": "Part B"}, ["part_b"]),
+        ({"name__in": "Part A,Part B"}, ["part_a", "part_b"]),
+        ({"name__prefix": "Part"}, ["part_a", "part_b"]),
+        ({"name__prefix": "art"}, []),
+        ({"description__contains": "A DESC"}, ["part_a"]),
+        ({"description__is_null": "true"}, ["part_b"]),
+        ({"description__is_null": "false"}, ["part_a"]),
+        ({"name__range": "Part B,"}, ["part_b"]),
+        ({"name__lt": "Part B"}, ["part_a"]),
+        ({"name__contains": "t_a"}, []),
+        ({"name__similar": "Prt A"}, ["part_a"]),
+    ],
+)
+def test_typed_filter_operators(
+    db_session: Session,
+    mock_parts: dict[str, PartModel],
+    filters: dict,
+    expected: list[str],
+):
+    # Part B has no description
+    mock_parts["part_b"].description = None
+    db_session.flush()
+
+    assert filter_parts(db_session, filters) == [mock_parts[key] for key in expected]
+
+
+def test_text_operator_on_non_text_field_raises_value_error(db_session: Session):
+    with pytest.raises(ValueError, match="text fields"):
+        filter_parts(db_session, {"id__prefix": "0000"})
@@ -0,0 +1,56 @@
+from typing import Any, cast
+
+from sqlalchemy.orm import Session
+
+from app.crud.history_capture import set_history_user
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+from app.schemas.history_schemas import HistoryAction
+from tests.utils import get_history
+
+
+def test_flush_records_only_the_modified_columns(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    set_history_user(db_session, current_user.id)
+    part = mock_parts["part_a"]
+
+    part.description = "Changed"
+    db_session.flush()
+
+    (history,) = get_history(db_session, entity_id=part.id, action=HistoryAction.UPDATE)
+    assert history.user_id == current_user.id
+    assert history.changes == {
+        "description": {"old": "Part A description", "new": "Changed"}
+    }
+
+
+def test_flush_records_created_and_deleted_entities(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    part = mock_parts["part_b"]
+
+    (created,) = get_history(db_session, entity_id=part.id, action=HistoryAction.CREATE)
+    assert cast(dict[str, Any], created.changes)["name"] == {
+        "old": None,
+        "new": "Part B",
+    }
+
+    db_session.delete(part)
+    db_session.flush()
+
+    (deleted,) = get_history(db_session, entity_id=part.id, action=HistoryAction.DELETE)
+    assert cast(dict[str, Any], deleted.changes)["name"] == {
+        "old": "Part B",
+        "new": None,
+    }
+
+
+def test_flush_without_a_known_user_records_nothing(
+    db_session: Session, current_user: UserModel
+):
+    # users are not blameable and no user is set for the session
+    assert (
+        get_history(db_session, entity_id=current_user.id, action=HistoryAction.CREATE)
+        == []
+    )
@@ -0,0 +1,174 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.crud import history_capture
+from app.crud.history_capture import set_history_user
+from app.crud.history_writer import (
+    HistoryWriter,
+    QueuedHistoryWriter,
+    TransactionHistoryWriter,
+)
+from app.crud.part_crud import PartCRUD
+from app.models.history_model import HistoryModel
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+from app.schemas.part_schemas import PartCreateSchema
+
+# parts created (and history records written) by each test
+PARTS = 3
+
+
+def use_history_writer(monkeypatch: pytest.MonkeyPatch, writer: HistoryWriter):
+    monkeypatch.setattr(history_capture, "get_history_writer", lambda: writer)
+
+
+def create_parts(db_session: Session, user: UserModel, count: int) -> None:
+    for index in range(count):
+        PartCRUD.create(
+            db_session=db_session,
+            input=PartCreateSchema(name=f"History Part {index}"),
+            current_user=user,
+            commit=False,
+        )
+
+
+def count_history(db_session: Session, user: UserModel) -> int:
+    return db_session.execute(
+        select(func.count())
+        .select_from(HistoryModel)
+        .where(HistoryModel.user_id == user.id)
+    ).scalar_one()
+
+
+def queued_writer(db_session: Session) -> QueuedHistoryWriter:
+    """A queued writer whose sessions write in the transaction of db_session."""
+    connection = db_session.connection()
+    return QueuedHistoryWriter(
+        lambda: Session(bind=connection, join_transaction_mode="create_savepoint"),
+        max_size=100,
+        batch_size=10,
+        flush_interval=0.01,
+    )
+
+
+def test_inline_writer_inserts_history_with_the_mutation(
+    monkeypatch: pytest.MonkeyPatch,
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+):
+    use_history_writer(monkeypatch, HistoryWriter())
+
+    create_parts(savepoint_session, savepoint_user, PARTS)
+
+    assert count_history(savepoint_session, savepoint_user) == PARTS
+
+
+def test_transaction_writer_inserts_buffered_history_on_commit(
+    monkeypatch: pytest.MonkeyPatch,
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+):
+    use_history_writer(monkeypatch, TransactionHistoryWriter())
+
+    create_parts(savepoint_session, savepoint_user, PARTS)
+    assert count_history(savepoint_session, savepoint_user) == 0
+
+    savepoint_session.commit()
+    assert count_history(savepoint_session, savepoint_user) == PARTS
+
+
+def test_transaction_writer_inserts_the_history_of_changes_flushed_by_commit(
+    monkeypatch: pytest.MonkeyPatch,
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+):
+    use_history_writer(monkeypatch, TransactionHistoryWriter())
+    set_history_user(savepoint_session, savepoint_user.id)
+
+    # nothing is flushed before the commit
+    for index in range(PARTS):
+        savepoint_session.add(
+            PartModel(
+                name=f"History Part {index}",
+                created_by=savepoint_user.id,
+                updated_by=savepoint_user.id,
+            )
+        )
+    savepoint_session.commit()
+
+    assert count_history(savepoint_session, savepoint_user) == PARTS
+
+
+def test_transaction_writer_discards_history_on_rollback(
+    monkeypatch: pytest.MonkeyPatch,
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+):
+    use_history_writer(monkeypatch, TransactionHistoryWriter())
+
+    create_parts(savepoint_session, savepoint_user, PARTS)
+    savepoint_session.rollback()
+    savepoint_session.commit()
+
+    assert count_history(savepoint_session, savepoint_user) == 0
+
+
+def test_queued_writer_writes_history_after_commit(
+    monkeypatch: pytest.MonkeyPatch,
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+):
+    writer = queued_writer(savepoint_session)
+    use_history_writer(monkeypatch, writer)
+
+    create_parts(savepoint_session, savepoint_user, PARTS)
+    savepoint_session.commit()
+    # waits for the queued records to be written
+    writer.close()
+
+    assert count_history(savepoint_session, savepoint_user) == PARTS
+
+
+def test_transaction_writer_keeps_history_when_a_savepoint_rolls_back(
+    monkeypatch: pytest.MonkeyPatch,
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+):
+    use_history_writer(monkeypatch, TransactionHistoryWriter())
+    create_parts(savepoint_session, savepoint_user, 1)
+
+    # the first chunk violates NOT NULL and rolls its savepoint back, the
+    # second one is inserted
+    result = PartCRUD.bulk_create(
+        savepoint_session,
+        [
+            PartCreateSchema.model_construct(name=None, description=None),
+            PartCreateSchema(name="Bulk History Part"),
+        ],
+        savepoint_user,
+        chunk_size=1,
+        commit=False,
+    )
+    savepoint_session.commit()
+
+    assert len(result.created) == len(result.errors) == 1
+    assert count_history(savepoint_session, savepoint_user) == 1 + len(result.created)
+
+
+def test_queued_writer_waits_for_the_transaction_to_commit(
+    monkeypatch: pytest.MonkeyPatch,
+    savepoint_session: Session,
+    savepoint_user: UserModel,
+):
+    writer = queued_writer(savepoint_session)
+    use_history_writer(monkeypatch, writer)
+
+    create_parts(savepoint_session, savepoint_user, PARTS)
+    # releasing a savepoint fires the commit events too
+    with savepoint_session.begin_nested():
+        pass
+    savepoint_session.rollback()
+    writer.close()
+
+    assert count_history(savepoint_session, savepoint_user) == 0
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.comment_crud import CommentCRUD
+from app.crud.part_crud import PartCRUD
+from app.models.comment_model import CommentModel
+from app.models.part_model import PartModel
+from app.schemas.base_schemas import TotalStrategy
+
+
+def test_fields_load_only_their_columns(
+    db_session: Session, mock_parts: dict[str, PartModel], statements: list[str]
+):
+    PartCRUD.get_paginated_list(db_session, offset=None, limit=None, fields={"name"})
+
+    (statement,) = statements
+    assert "parts.name" in statement
+    assert "parts.description" not in statement
+
+
+def test_fields_load_relationships_only_when_asked_for(
+    db_session: Session, mock_comment: CommentModel, statements: list[str]
+):
+    db_session.expunge_all()
+
+    CommentCRUD.get_paginated_list(
+        db_session,
+        offset=None,
+        limit=None,
+        total_strategy=TotalStrategy.NONE,
+        fields={"content"},
+    )
+    assert len(statements) == 1
+
+    page = CommentCRUD.get_paginated_list(
+        db_session,
+        offset=None,
+        limit=None,
+        total_strategy=TotalStrategy.NONE,
+        fields={"creator"},
+    )
+    assert any("FROM users" in statement for statement in statements[1:])
+    assert page.data[0].creator.name == "Alice"
+
+
+def test_unknown_field_raises_value_error(db_session: Session):
+    with pytest.raises(ValueError, match="Unknown field"):
+        PartCRUD.get_paginated_list(
+            db_session, offset=None, limit=None, fields={"secret"}
+        )
@@ -0,0 +1,115 @@
+import json
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from pydantic import Field, field_serializer
+from pydantic_core import to_json
+from sqlalchemy.orm import Session
+
+from app.crud.comment_crud import CommentCRUD
+from app.crud.part_crud import PartCRUD
+from app.models.comment_model import CommentModel
+from app.models.part_model import PartModel
+from app.schemas.base_schemas import (
+    AppBaseSchema,
+    PaginatedResponseSchema,
+    TotalStrategy,
+)
+from app.schemas.comment_schemas import CommentSchema
+from app.schemas.part_schemas import PartNameSchema, PartSchema
+from app.utils.page_response import get_row_serializer, serialize_page
+
+
+def test_page_serializes_like_the_response_model(
+    db_session: Session, mock_parts: dict[str, PartModel]
+):
+    page = PartCRUD.get_paginated_list(db_session, offset=None, limit=1)
+
+    expected = (
+        PaginatedResponseSchema[PartSchema]
+        .model_validate(page, from_attributes=True)
+        .model_dump(mode="json")
+    )
+    assert json.loads(serialize_page(page, PartSchema)) == expected
+    assert expected["next_cursor"] is not None
+
+
+def test_page_serializes_nested_schemas(
+    db_session: Session, mock_comment: CommentModel
+):
+    page = CommentCRUD.get_paginated_list(
+        db_session, offset=None, limit=None, total_strategy=TotalStrategy.NONE
+    )
+
+    expected = (
+        PaginatedResponseSchema[CommentSchema]
+        .model_validate(page, from_attributes=True)
+        .model_dump(mode="json")
+    )
+    assert json.loads(serialize_page(page, CommentSchema)) == expected
+    assert expected["data"][0]["creator"]["name"] == "Alice"
+
+
+def test_estimated_total_of_a_filtered_page_with_an_in_list(
+    db_session: Session, mock_parts: dict[str, PartModel]
+):
+    ids = [str(part.id) for part in mock_parts.values()]
+
+    page = PartCRUD.get_paginated_list(
+        db_session,
+        offset=None,
+        limit=1,
+        filters={"id": ids},
+        total_strategy=TotalStrategy.ESTIMATED,
+    )
+
+    assert page.total is not None
+    assert page.total >= len(mock_parts)
+
+
+PART_ID = uuid4()
+
+
+class AliasedPartSchema(AppBaseSchema):
+    id: UUID
+    name: str = Field(serialization_alias="title")
+
+
+class LabelledPartSchema(AppBaseSchema):
+    name: str
+
+    @field_serializer("name")
+    @staticmethod
+    def label(name: str) -> str:
+        return name.upper()
+
+
+class PartListSchema(AppBaseSchema):
+    parts: list[PartNameSchema]
+    by_name: dict[str, PartNameSchema]
+
+
+@pytest.mark.parametrize(
+    ("schema", "entity"),
+    [
+        (AliasedPartSchema, SimpleNamespace(id=PART_ID, name="Part A")),
+        (LabelledPartSchema, SimpleNamespace(name="Part A")),
+        (
+            PartListSchema,
+            SimpleNamespace(
+                parts=[SimpleNamespace(id=PART_ID, name="Part A")],
+                by_name={"Part A": SimpleNamespace(id=PART_ID, name="Part A")},
+            ),
+        ),
+    ],
+)
+def test_row_serializes_like_the_schema(schema: type[AppBaseSchema], entity: object):
+    expected = schema.model_validate(entity).model_dump(mode="json", by_alias=True)
+
+    assert json.loads(to_json(get_row_serializer(schema)(entity))) == expected
+
+
+def test_row_without_a_required_attribute_is_rejected():
+    with pytest.raises(AttributeError, match="'name'"):
+        get_row_serializer(AliasedPartSchema)(SimpleNamespace(id=PART_ID))
@@ -0,0 +1,50 @@
+from sqlalchemy.orm import Session
+
+from app.crud.comment_crud import CommentCRUD
+from app.crud.filter_operators import ValueShape
+from app.crud.part_crud import PartCRUD
+from app.models.comment_model import CommentModel
+from app.models.part_model import PartModel
+
+
+def test_filter_plan_is_reused_for_the_same_shape(db_session: Session):
+    PartCRUD.__apply_filters__(db_session.query(PartModel), {"name__eq": "Part A"})
+    hits = PartCRUD.__get_filter_plan__.cache_info().hits
+
+    PartCRUD.__apply_filters__(db_session.query(PartModel), {"name__eq": "Part B"})
+
+    assert PartCRUD.__get_filter_plan__.cache_info().hits == hits + 1
+
+
+def test_filter_plans_are_cached_per_crud_class(db_session: Session):
+    part_plan = PartCRUD.__get_filter_plan__((("id", ValueShape.SINGLE),))
+    comment_plan = CommentCRUD.__get_filter_plan__((("id", ValueShape.SINGLE),))
+
+    assert part_plan.items[0].column is PartModel.id  # type: ignore
+    assert comment_plan.items[0].column is CommentModel.id  # type: ignore
+
+
+def test_same_filter_shape_produces_the_same_statement_cache_key(
+    db_session: Session,
+):
+    def build(name: str, content: str):
+        query = CommentCRUD.__apply_filters__(
+            db_session.query(CommentModel),
+            {"part.name__prefix": name, "content": content},
+        )
+        query = CommentCRUD.__apply_sorting__(query, None)
+        return query.statement._generate_cache_key()
+
+    assert build("Part A", "first") == build("Part B", "second")
+
+
+def test_filter_and_sort_on_same_relationship_join_once(
+    db_session: Session, mock_comment: CommentModel
+):
+    query = CommentCRUD.__apply_filters__(
+        db_session.query(CommentModel), {"part.name": "Part A"}
+    )
+    query = CommentCRUD.__apply_sorting__(query, {"part.name": "asc"})
+
+    assert str(query.statement).count("JOIN parts") == 1
+    assert query.all() == [mock_comment]
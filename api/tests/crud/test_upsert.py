@@ -0,0 +1,96 @@
+from typing import Any, cast
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.part_crud import PartCRUD
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+from app.schemas.history_schemas import HistoryAction
+from app.schemas.part_schemas import PartCreateSchema
+from tests.utils import get_history
+
+# locking the existing rows, the upsert and the history records
+UPSERT_ROUND_TRIPS = 3
+
+
+def test_bulk_upsert_creates_and_updates_in_a_single_statement(
+    db_session: Session,
+    current_user: UserModel,
+    mock_parts: dict[str, PartModel],
+    statements: list[str],
+):
+    part_a = mock_parts["part_a"]
+
+    parts = PartCRUD.bulk_upsert(
+        db_session=db_session,
+        inputs=[
+            PartCreateSchema(name="New Part"),
+            PartCreateSchema(name="Part A", description="Updated"),
+        ],
+        current_user=current_user,
+        commit=False,
+    )
+
+    assert len(statements) == UPSERT_ROUND_TRIPS
+    assert "ON CONFLICT (name) DO UPDATE" in statements[1]
+    assert [part.name for part in parts] == ["New Part", "Part A"]
+    assert parts[1] is part_a
+    assert part_a.description == "Updated"
+
+
+def test_upsert_records_history_as_create_or_update(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    created = PartCRUD.upsert(
+        db_session=db_session,
+        input=PartCreateSchema(name="New Part", description="New"),
+        current_user=current_user,
+        commit=False,
+    )
+    updated = PartCRUD.upsert(
+        db_session=db_session,
+        input=PartCreateSchema(name="Part A", description="Updated"),
+        current_user=current_user,
+        commit=False,
+    )
+
+    (record,) = get_history(db_session, entity_id=created.id)
+    assert record.action == HistoryAction.CREATE
+    assert cast(dict[str, Any], record.changes)["description"] == {
+        "old": None,
+        "new": "New",
+    }
+    record = get_history(db_session, entity_id=updated.id)[-1]
+    assert record.action == HistoryAction.UPDATE
+    assert record.changes == {
+        "description": {"old": "Part A description", "new": "Updated"}
+    }
+
+
+def test_upsert_without_changes_records_no_history(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    part_a = mock_parts["part_a"]
+    records = len(get_history(db_session, entity_id=part_a.id))
+
+    PartCRUD.upsert(
+        db_session=db_session,
+        input=PartCreateSchema(name=part_a.name, description=part_a.description),
+        current_user=current_user,
+        commit=False,
+    )
+
+    assert len(get_history(db_session, entity_id=part_a.id)) == records
+
+
+def test_bulk_upsert_of_the_same_name_twice_raises_value_error(
+    db_session: Session, current_user: UserModel
+):
+    with pytest.raises(ValueError, match="upserted more than once"):
+        PartCRUD.bulk_upsert(
+            db_session=db_session,
+            inputs=[PartCreateSchema(name="Twice"), PartCreateSchema(name="Twice")],
+            current_user=current_user,
+            commit=False,
+        )
@@ -0,0 +1,105 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.comment_crud import CommentCRUD
+from app.crud.part_crud import PartCRUD
+from app.errors import NotFoundError
+from app.models.comment_model import CommentModel
+from app.models.part_model import PartModel
+from app.models.user_model import UserModel
+from app.schemas.comment_schemas import CommentCreateSchema, CommentUpdateSchema
+from app.schemas.history_schemas import HistoryAction
+from app.schemas.part_schemas import PartCreateSchema, PartUpdateSchema
+from tests.utils import get_history
+
+# the mutation and its (inline written) history record
+WRITE_ROUND_TRIPS = 2
+
+
+def test_create_is_a_single_insert_returning(
+    db_session: Session, current_user: UserModel, statements: list[str]
+):
+    part = PartCRUD.create(
+        db_session=db_session,
+        input=PartCreateSchema(name="Round Trip Part"),
+        current_user=current_user,
+        commit=False,
+    )
+
+    assert len(statements) == WRITE_ROUND_TRIPS
+    assert statements[0].startswith("INSERT INTO parts")
+    assert "RETURNING" in statements[0]
+    assert part.created_at is not None
+    assert part.updated_by == current_user.id
+
+
+def test_create_takes_related_user_from_the_session(
+    db_session: Session,
+    current_user: UserModel,
+    mock_parts: dict[str, PartModel],
+    statements: list[str],
+):
+    comment = CommentCRUD.create(
+        db_session=db_session,
+        input=CommentCreateSchema(content="Hello", part_id=mock_parts["part_a"].id),
+        current_user=current_user,
+        commit=False,
+    )
+
+    assert comment.creator is current_user
+    assert len(statements) == WRITE_ROUND_TRIPS
+
+
+def test_update_is_a_single_update_returning(
+    db_session: Session,
+    current_user: UserModel,
+    mock_comment: CommentModel,
+    statements: list[str],
+):
+    comment = CommentCRUD.update(
+        db_session=db_session,
+        entity_id=mock_comment.id,
+        input=CommentUpdateSchema(content="Updated"),
+        current_user=current_user,
+        commit=False,
+    )
+
+    assert comment is mock_comment
+    assert comment.content == "Updated"
+    assert comment.creator is current_user
+    assert len(statements) == WRITE_ROUND_TRIPS
+    assert statements[0].startswith("UPDATE comments")
+
+
+def test_update_records_the_returned_before_image(
+    db_session: Session, current_user: UserModel, mock_parts: dict[str, PartModel]
+):
+    part = mock_parts["part_a"]
+
+    PartCRUD.update(
+        db_session=db_session,
+        entity_id=part.id,
+        input=PartUpdateSchema(name=part.name, description="New description"),
+        current_user=current_user,
+        commit=False,
+    )
+
+    (history,) = get_history(db_session, entity_id=part.id, action=HistoryAction.UPDATE)
+    assert history.changes == {
+        "description": {"old": "Part A description", "new": "New description"}
+    }
+
+
+def test_update_of_unknown_entity_raises_not_found(
+    db_session: Session, current_user: UserModel
+):
+    with pytest.raises(NotFoundError):
+        PartCRUD.update(
+            db_session=db_session,
+            entity_id=uuid4(),
+            input=PartUpdateSchema(name="Missing"),
+            current_user=current_user,
+            commit=False,
+        )
@@ -0,0 +1,115 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.metrics import (
+    CACHE_LOOKUPS,
+    Counter,
+    Family,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    MultiprocessStore,
+    exposition,
+    hit_ratios,
+)
+
+THREADS = 4
+OBSERVATIONS = 100
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_threads_record_their_own_shards():
+    registry = MetricsRegistry()
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), registry=registry)
+
+    def observe() -> None:
+        for _ in range(OBSERVATIONS):
+            histogram.observe(0.003, "/parts")
+
+    threads = [threading.Thread(target=observe) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    (family,) = registry.collect()
+    *counts, total = family.samples[("/parts",)]
+    assert sum(counts) == len(threads) * OBSERVATIONS
+    assert total == pytest.approx(len(threads) * OBSERVATIONS * 0.003)
+
+
+def test_shards_of_exited_threads_are_folded():
+    registry = MetricsRegistry()
+    counter = Counter("requests_total", "Requests.", ("route",), registry=registry)
+
+    for _ in range(THREADS):
+        thread = threading.Thread(target=counter.inc, args=("/parts",))
+        thread.start()
+        thread.join()
+    counter.inc("/parts")
+
+    # only the shard of the current thread is left
+    assert len(counter._shards) == 1
+    (family,) = registry.collect()
+    assert family.samples == {("/parts",): [THREADS + 1]}
+
+
+def test_exposition_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = Histogram(
+        "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1), registry=registry
+    )
+    histogram.observe(0.05, '/a"b')
+    histogram.observe(0.5, '/a"b')
+    histogram.observe(5, '/a"b')
+
+    text = exposition(registry.collect())
+
+    assert text.splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        r'latency_seconds_bucket{route="/a\"b",le="0.1"} 1.0',
+        r'latency_seconds_bucket{route="/a\"b",le="1.0"} 2.0',
+        r'latency_seconds_bucket{route="/a\"b",le="+Inf"} 3.0',
+        r'latency_seconds_sum{route="/a\"b"} 5.55',
+        r'latency_seconds_count{route="/a\"b"} 3.0',
+    ]
+
+
+def test_hit_ratio_adds_up_the_lookups():
+    lookups = Family(
+        CACHE_LOOKUPS,
+        "counter",
+        "Lookups.",
+        ("cache", "result"),
+        {("parts", "hit"): [3], ("parts", "miss"): [1], ("users", "miss"): [0]},
+    )
+
+    assert hit_ratios([lookups]).samples == {("parts",): [0.75]}
+
+
+def test_multiprocess_store_adds_up_the_workers(tmp_path: Path):
+    registry = MetricsRegistry()
+    requests = Counter("requests_total", "Requests.", registry=registry)
+    in_flight = Gauge("in_flight", "In flight.", registry=registry)
+    requests.inc(amount=2)
+    in_flight.inc()
+    store = MultiprocessStore(str(tmp_path), interval=60, registry=registry)
+    store.write(registry.collect())
+    # the same metrics, written by a worker that exited since
+    (written,) = tmp_path.glob("*.json")
+    (tmp_path / f"{dead_pid()}.json").write_text(written.read_text())
+
+    families = {family.name: family for family in store.read()}
+
+    assert families["requests_total"].samples == {(): [4]}
+    assert families["in_flight"].samples == {(): [1]}
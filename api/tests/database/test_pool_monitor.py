@@ -0,0 +1,123 @@
+import time
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
+
+from app.pool_monitor import MonitoredQueuePool, PoolAdmission, PoolMonitor
+
+# seconds to wait for a connection of the small pool
+POOL_TIMEOUT = 0.1
+# the small pool holds a single connection, without overflow
+MAX_OVERFLOW = 0
+
+
+@pytest.fixture
+def small_engine(db_engine: Engine):
+    engine = create_engine(
+        db_engine.url,
+        poolclass=MonitoredQueuePool,
+        pool_size=1,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_monitor_records_checkouts_and_waits(small_engine: Engine):
+    monitor = PoolMonitor.attach(small_engine, max_overflow=MAX_OVERFLOW)
+
+    with small_engine.connect():
+        assert monitor.in_use == 1
+        assert monitor.waiting == 0
+        time.sleep(0.01)
+
+    snapshot = monitor.snapshot()
+    assert snapshot["in_use"] == 0
+    assert snapshot["checkouts"] == 1
+    assert snapshot["hold_time_avg_ms"] > 0
+
+
+def test_pool_monitor_measures_the_wait_for_a_connection(small_engine: Engine):
+    monitor = PoolMonitor.attach(small_engine, max_overflow=MAX_OVERFLOW)
+
+    with small_engine.connect(), pytest.raises(SQLAlchemyTimeoutError):
+        small_engine.connect()
+
+    assert monitor.waiting == 0
+    assert monitor.wait_time_max >= POOL_TIMEOUT
+
+
+def test_pool_monitor_keeps_measuring_after_dispose(small_engine: Engine):
+    monitor = PoolMonitor.attach(small_engine, max_overflow=MAX_OVERFLOW)
+    small_engine.dispose()
+
+    with small_engine.connect():
+        pass
+
+    assert monitor.checkouts == 1
+
+
+def test_admission_rejects_requests_beyond_the_wait_budget(small_engine: Engine):
+    admission = PoolAdmission(
+        PoolMonitor.attach(small_engine, max_overflow=MAX_OVERFLOW), wait_budget_ms=50
+    )
+
+    with admission.admit():
+        assert admission.admitted == 1
+
+        # the only slot is taken, the request waits out the budget
+        with pytest.raises(HTTPException) as error, admission.admit():
+            pass
+
+    assert error.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert error.value.headers == {"Retry-After": "1"}
+    assert admission.snapshot()["rejected"] == 1
+
+    with admission.admit():
+        assert admission.queued == 0
+
+
+def test_admission_rejects_right_away_when_the_expected_wait_is_too_long(
+    small_engine: Engine,
+):
+    monitor = PoolMonitor.attach(small_engine, max_overflow=MAX_OVERFLOW)
+    admission = PoolAdmission(monitor, wait_budget_ms=1000)
+    # connections have been held for 2 seconds on average
+    monitor.hold_time_avg = 2.0
+
+    with admission.admit():
+        start = time.perf_counter()
+        with pytest.raises(HTTPException) as error, admission.admit():
+            pass
+
+    assert time.perf_counter() - start < admission.wait_budget
+    assert error.value.headers == {"Retry-After": "2"}
+
+
+def test_admission_without_budget_admits_every_request(small_engine: Engine):
+    admission = PoolAdmission(
+        PoolMonitor.attach(small_engine, max_overflow=MAX_OVERFLOW), wait_budget_ms=0
+    )
+
+    with admission.admit(), admission.admit():
+        pass
+
+
+@pytest.mark.anyio
+async def test_async_admission_rejects_requests_beyond_the_wait_budget(
+    small_engine: Engine,
+):
+    admission = PoolAdmission(
+        PoolMonitor.attach(small_engine, max_overflow=MAX_OVERFLOW), wait_budget_ms=50
+    )
+
+    async with admission.admit_async():
+        with pytest.raises(HTTPException) as error:
+            async with admission.admit_async():
+                pass
+
+    assert error.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert admission.admitted == 0
@@ -0,0 +1,149 @@
+import time
+from collections.abc import Iterator
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine, text
+
+from app import database
+from app.database import READ_PRIMARY_COOKIE, reads_primary, session_dependency
+from app.pool_monitor import PoolAdmission, PoolMonitor
+from app.replicas import ON_REPLICA_KEY, READ_PRIMARY_KEY, DatabaseNode, ReplicaRouter
+from app.settings import ReplicaBalancing, Settings
+from app.utils.read_your_writes import ReadYourWritesMiddleware
+
+# seconds the reads of a client go to the primary after a write
+STICKINESS = 5
+
+
+def node(name: str) -> DatabaseNode[str]:
+    return DatabaseNode(name, PoolAdmission(PoolMonitor(capacity=5), 0))
+
+
+def request(method: str, cookie: str | None = None) -> Request:
+    headers = [] if cookie is None else [(b"cookie", cookie.encode())]
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+@pytest.fixture
+def replica_engine(db_engine: Engine) -> Iterator[Engine]:
+    """A second engine on the test database, standing in for a replica."""
+    engine = create_engine(db_engine.url)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica_router(
+    monkeypatch: pytest.MonkeyPatch, db_engine: Engine, replica_engine: Engine
+) -> ReplicaRouter[Engine]:
+    admission = PoolAdmission(PoolMonitor(capacity=None), 0)
+    router = ReplicaRouter(
+        DatabaseNode(db_engine, admission),
+        [DatabaseNode(replica_engine, admission)],
+        ReplicaBalancing.ROUND_ROBIN,
+    )
+    monkeypatch.setattr(database, "replica_router", router)
+    return router
+
+
+def test_round_robin_takes_turns_over_the_replicas():
+    primary, replicas = node("primary"), [node("replica 1"), node("replica 2")]
+    router = ReplicaRouter(primary, replicas, ReplicaBalancing.ROUND_ROBIN)
+
+    routed = [router.route(read_only=True).engine for _ in range(3)]
+
+    assert routed == ["replica 1", "replica 2", "replica 1"]
+    assert router.route(read_only=False) is primary
+    assert router.route(read_only=True, primary=True) is primary
+
+
+def test_least_connections_picks_the_least_busy_replica():
+    primary, replicas = node("primary"), [node("replica 1"), node("replica 2")]
+    router = ReplicaRouter(primary, replicas, ReplicaBalancing.LEAST_CONNECTIONS)
+    replicas[0].admission.monitor.in_use = 2
+    replicas[1].admission.monitor.in_use = 1
+
+    assert router.route(read_only=True) is replicas[1]
+
+
+def test_without_replicas_everything_goes_to_the_primary():
+    primary = node("primary")
+    router = ReplicaRouter(primary, [], ReplicaBalancing.ROUND_ROBIN)
+
+    assert router.route(read_only=True) is primary
+
+
+@pytest.mark.parametrize(
+    ("method", "cookie", "on_replica"),
+    [
+        ("GET", None, True),
+        ("GET", f"{READ_PRIMARY_COOKIE}={time.time() + STICKINESS}", False),
+        ("GET", f"{READ_PRIMARY_COOKIE}={time.time() - STICKINESS}", True),
+        ("POST", None, False),
+    ],
+)
+def test_session_dependency_routes_the_reads_to_the_replicas(
+    replica_router: ReplicaRouter[Engine],
+    replica_engine: Engine,
+    method: str,
+    cookie: str | None,
+    on_replica: bool,
+):
+    sessions = session_dependency()(request(method, cookie))
+    db_session = next(sessions)
+    bind = db_session.get_bind()
+
+    assert isinstance(bind, Engine)
+    assert (bind.pool is replica_engine.pool) is on_replica
+    read_only = db_session.scalar(text("SHOW transaction_read_only"))
+    assert read_only == ("on" if method == "GET" else "off")
+    # tells the caches where the reads of the session come from
+    assert (ON_REPLICA_KEY in db_session.info) is on_replica
+    assert (READ_PRIMARY_KEY in db_session.info) is (method == "GET" and not on_replica)
+    sessions.close()
+
+
+def test_reads_primary_ignores_invalid_cookies():
+    assert not reads_primary({})
+    assert not reads_primary({READ_PRIMARY_COOKIE: "soon"})
+
+
+def test_writes_send_the_next_reads_to_the_primary():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, stickiness=STICKINESS)
+
+    @app.post("/write")
+    def write() -> None:
+        return None
+
+    @app.get("/read")
+    def read(request: Request) -> bool:
+        return reads_primary(request.cookies)
+
+    with TestClient(app) as client:
+        assert client.get("/read").json() is False
+        response = client.post("/write")
+        assert READ_PRIMARY_COOKIE in response.cookies
+        assert client.get("/read").json() is True
+
+
+def test_configured_replica_is_a_standby(test_settings: Settings):
+    """
+    Runs against a streaming replica of the test database, given with
+    DB_REPLICAS='["host:port"]'.
+    """
+    if not test_settings.db_replicas:
+        pytest.skip("no replica configured")
+    credentials = f"{test_settings.db_user}:{test_settings.db_password}"
+    url = (
+        f"postgresql+psycopg://{credentials}@{test_settings.db_replicas[0]}"
+        f"/{test_settings.db_database}"
+    )
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            assert connection.scalar(text("SELECT pg_is_in_recovery()")) is True
+    finally:
+        engine.dispose()
@@ -0,0 +1,70 @@
+import logging
+import re
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, text
+
+from app.request_metrics import (
+    InstrumentedRoute,
+    RequestMetricsMiddleware,
+    query_budget,
+)
+from app.settings import env
+
+# the statement the endpoints of the test app run for each item
+ITEM_STATEMENT = "SELECT 1"
+
+
+def server_timing(header: str) -> dict[str, str]:
+    return dict(re.findall(r"(\w+);dur=([\d.]+)", header))
+
+
+@pytest.fixture
+def metrics_client(db_engine: Engine):
+    """A client of an app whose endpoints run a statement per item."""
+    router = APIRouter(route_class=InstrumentedRoute)
+
+    @router.get("/items/{count}")
+    @query_budget(env.repeated_statement_threshold)
+    def get_items(count: int) -> list[int]:
+        with db_engine.connect() as connection:
+            return [connection.scalar(text(ITEM_STATEMENT)) for _ in range(count)]
+
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_server_timing_reports_the_statements_and_timings(
+    metrics_client: TestClient,
+):
+    response = metrics_client.get("/items/2")
+
+    header = response.headers["server-timing"]
+    assert 'desc="2 statements"' in header
+    assert server_timing(header).keys() == {"db", "pool", "serialize", "total"}
+
+
+def test_repeated_statements_are_logged_like_an_n_plus_one(
+    metrics_client: TestClient, caplog: pytest.LogCaptureFixture
+):
+    with caplog.at_level(logging.INFO, logger="app.request_metrics"):
+        metrics_client.get(f"/items/{env.repeated_statement_threshold}")
+
+    (request_record, repeated_record) = caplog.records
+    fields = request_record.request_metrics  # type: ignore
+    assert fields["route"] == "/items/{count}"
+    assert fields["statements"] == env.repeated_statement_threshold
+    assert fields["repeated_statements"] == {
+        ITEM_STATEMENT: env.repeated_statement_threshold
+    }
+    assert "like an N+1" in repeated_record.getMessage()
+
+
+def test_request_beyond_the_query_budget_fails(metrics_client: TestClient):
+    with pytest.raises(AssertionError, match="its query budget is"):
+        metrics_client.get(f"/items/{env.repeated_statement_threshold + 1}")
@@ -0,0 +1,130 @@
+from collections.abc import Iterator
+from uuid import uuid4
+
+import pytest
+from fastapi import Request
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import InternalError
+from sqlalchemy.orm import Session
+
+from app.crud.part_crud import PartCRUD
+from app.database import (
+    READ_POLICY,
+    WRITE_POLICY,
+    SessionPolicy,
+    get_request_policy,
+    policy_sessionmaker,
+)
+from app.models.user_model import UserModel
+from app.schemas.part_schemas import PartCreateSchema, PartSchema, PartUpdateSchema
+
+# a new transaction (a savepoint here) and the SELECT reloading the entity
+RELOAD_ROUND_TRIPS = 2
+
+
+def policy_session(db_engine: Engine, policy: SessionPolicy) -> Iterator[Session]:
+    """A session of the policy whose commits only release savepoints."""
+    with db_engine.connect() as connection:
+        transaction = connection.begin()
+        session = policy_sessionmaker(policy, db_engine)(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield session
+        finally:
+            session.close()
+            transaction.rollback()
+
+
+@pytest.fixture
+def write_session(db_engine: Engine) -> Iterator[Session]:
+    yield from policy_session(db_engine, WRITE_POLICY)
+
+
+@pytest.fixture
+def expiring_session(db_engine: Engine) -> Iterator[Session]:
+    yield from policy_session(
+        db_engine, SessionPolicy(read_only=False, expire_on_commit=True)
+    )
+
+
+def add_user(db_session: Session) -> UserModel:
+    user = UserModel(id=uuid4(), name="Alice", role="admin", is_active=True)
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+@pytest.mark.parametrize(
+    ("method", "policy"),
+    [("GET", READ_POLICY), ("HEAD", READ_POLICY), ("POST", WRITE_POLICY)],
+)
+def test_request_policy_follows_the_method(method: str, policy: SessionPolicy):
+    request = Request({"type": "http", "method": method, "headers": []})
+
+    assert get_request_policy(request) is policy
+
+
+def test_read_session_rejects_writes(db_engine: Engine):
+    with policy_sessionmaker(READ_POLICY, db_engine)() as db_session:
+        assert db_session.scalar(text("SHOW transaction_read_only")) == "on"
+        with pytest.raises(InternalError, match="read-only transaction"):
+            db_session.execute(text("CREATE TEMPORARY TABLE read_only (id int)"))
+
+    # the connection is a read-write one again for the other sessions
+    with policy_sessionmaker(WRITE_POLICY, db_engine)() as db_session:
+        assert db_session.scalar(text("SHOW transaction_read_only")) == "off"
+
+
+def test_created_entity_is_serialized_without_a_reload(
+    write_session: Session, statements: list[str]
+):
+    user = add_user(write_session)
+    part = PartCRUD.create(
+        db_session=write_session,
+        input=PartCreateSchema(name="Policy Part"),
+        current_user=user,
+    )
+    statements.clear()
+
+    PartSchema.model_validate(part)
+
+    assert statements == []
+
+
+def test_updated_entity_is_serialized_without_a_reload(
+    write_session: Session, statements: list[str]
+):
+    user = add_user(write_session)
+    part = PartCRUD.create(
+        db_session=write_session,
+        input=PartCreateSchema(name="Policy Part"),
+        current_user=user,
+    )
+    part = PartCRUD.update(
+        db_session=write_session,
+        entity_id=part.id,
+        input=PartUpdateSchema(name="Policy Part", description="Updated"),
+        current_user=user,
+    )
+    statements.clear()
+
+    assert PartSchema.model_validate(part).description == "Updated"
+    assert statements == []
+
+
+def test_expiring_session_reloads_the_entity_it_serializes(
+    expiring_session: Session, statements: list[str]
+):
+    user = add_user(expiring_session)
+    part = PartCRUD.create(
+        db_session=expiring_session,
+        input=PartCreateSchema(name="Policy Part"),
+        current_user=user,
+    )
+    statements.clear()
+
+    PartSchema.model_validate(part)
+
+    assert len(statements) == RELOAD_ROUND_TRIPS
+    assert statements[1].startswith("SELECT parts.name")
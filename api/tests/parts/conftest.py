@@ -1,40 +1,10 @@
 import pytest
-from sqlalchemy.orm import Session
 
 from app.crud.comment_crud import CommentCRUD
 from app.crud.part_crud import PartCRUD
-from app.models.part_model import PartModel
-from app.models.user_model import UserModel
 from tests.utils import create_safe_patch
 
 
-@pytest.fixture
-def mock_parts(db_session: Session, current_user: UserModel) -> dict[str, PartModel]:
-    # Default Parts Data
-    default_part_first = PartModel(
-        name="Part A",
-        description="Part A description",
-        updated_by=current_user.id,
-        created_by=current_user.id,
-    )
-    default_part_second = PartModel(
-        name="Part B",
-        description="Part B description",
-        updated_by=current_user.id,
-        created_by=current_user.id,
-    )
-
-    db_session.add_all([default_part_first, default_part_second])
-
-    # to assign ID to new parts
-    db_session.flush()
-
-    return {
-        "part_a": default_part_first,
-        "part_b": default_part_second,
-    }
-
-
 @pytest.fixture
 def mock_crud_no_commit():
     """
@@ -46,6 +16,11 @@ def mock_crud_no_commit():
     patches = [
         create_safe_patch(PartCRUD, "create"),
         create_safe_patch(PartCRUD, "update"),
+        create_safe_patch(PartCRUD, "bulk_create"),
+        create_safe_patch(PartCRUD, "bulk_update"),
+        create_safe_patch(PartCRUD, "bulk_soft_delete"),
+        create_safe_patch(PartCRUD, "upsert"),
+        create_safe_patch(PartCRUD, "bulk_upsert"),
         create_safe_patch(CommentCRUD, "create"),
     ]
 
@@ -1,10 +1,19 @@
-from uuid import uuid4
+import csv
+import gzip
+import io
+import json
+from uuid import UUID, uuid4
 
+import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 
+from app.models.history_model import HistoryModel
 from app.models.part_model import PartModel
 from app.models.user_model import UserModel
+from app.schemas.history_schemas import HistoryAction
+from app.settings import env
 from tests.utils import compare_uuids
 
 
@@ -17,6 +26,16 @@ def test_get_parts_returns_empty_list_when_no_parts_exist(client: TestClient):
     assert len(response_json["data"]) == 0
 
 
+@pytest.mark.parametrize(
+    "query",
+    ["limit=-1", "limit=0", f"limit={env.page_max_limit + 1}", "offset=-1"],
+)
+def test_get_parts_rejects_invalid_pages(client: TestClient, query: str):
+    response = client.get(f"/parts?{query}")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_get_parts_returns_pars_list(
     client: TestClient, mock_parts: dict[str, PartModel]
 ):
@@ -222,9 +241,400 @@ def test_get_part_comments_returns_comments_list(
     assert len(response_json) == 1
 
 
+def test_get_part_comments_reports_its_statements(
+    client: TestClient, mock_parts: dict[str, PartModel], mock_crud_no_commit
+):
+    part = mock_parts["part_a"]
+    client.post(f"/parts/{part.id}/comments", json={"content": "Test Comment"})
+
+    response = client.get(f"/parts/{part.id}/comments")
+
+    # the part, its comments and their creators
+    assert 'desc="3 statements"' in response.headers["server-timing"]
+
+
 def test_get_part_comments_with_nonexistent_part_returns_404(client: TestClient):
     part_id = uuid4()
 
     response = client.get(f"/parts/{part_id}/comments")
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_parts_with_cursor_walks_all_pages(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    first_page = client.get("/parts", params={"limit": 1}).json()
+
+    assert len(first_page["data"]) == 1
+    assert first_page["next_cursor"] is not None
+    assert first_page["previous_cursor"] is None
+
+    second_page = client.get(
+        "/parts", params={"limit": 1, "after": first_page["next_cursor"]}
+    ).json()
+
+    assert len(second_page["data"]) == 1
+    assert second_page["total"] == len(mock_parts)
+    assert second_page["next_cursor"] is None
+    assert {first_page["data"][0]["id"], second_page["data"][0]["id"]} == {
+        str(part.id) for part in mock_parts.values()
+    }
+
+    # Walking back from the second page returns the first page again
+    previous_page = client.get(
+        "/parts", params={"limit": 1, "before": second_page["previous_cursor"]}
+    ).json()
+
+    assert previous_page["data"] == first_page["data"]
+    assert previous_page["next_cursor"] is not None
+
+
+def test_get_parts_with_invalid_cursor_returns_400(client: TestClient):
+    response = client.get("/parts", params={"after": "not-a-cursor"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_parts_with_cursor_and_offset_returns_400(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    cursor = client.get("/parts", params={"limit": 1}).json()["next_cursor"]
+
+    response = client.get("/parts", params={"offset": 1, "after": cursor})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_parts_without_total_skips_count(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = client.get("/parts", params={"total": "none"})
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response_json["total"] is None
+    assert response_json["total_strategy"] == "none"
+    assert len(response_json["data"]) == len(mock_parts)
+
+
+def test_get_parts_with_estimated_total_returns_lower_bound(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    last_page = client.get("/parts", params={"total": "estimated"}).json()
+    first_page = client.get("/parts", params={"total": "estimated", "limit": 1}).json()
+
+    # The whole list fits into the page, so the estimate is exact
+    assert last_page["total"] == len(mock_parts)
+    # The planner estimate is never lower than what the page has shown
+    assert first_page["total"] >= len(mock_parts)
+
+
+def test_get_parts_with_offset_past_the_end_returns_exact_total(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response_json = client.get("/parts", params={"offset": 10, "limit": 5}).json()
+
+    assert response_json["total"] == len(mock_parts)
+    assert len(response_json["data"]) == 0
+
+
+def test_get_parts_with_search_returns_prefix_matches(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = client.get("/parts", params={"search": "part a desc"})
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response_json["total"] == 1
+    assert response_json["data"][0]["id"] == str(mock_parts["part_a"].id)
+
+
+def test_get_parts_with_search_matches_words_by_prefix(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response_json = client.get("/parts", params={"search": "descr"}).json()
+
+    assert response_json["total"] == len(mock_parts)
+
+
+def test_get_parts_with_ranked_search_and_cursor_returns_400(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    cursor = client.get("/parts", params={"limit": 1}).json()["next_cursor"]
+
+    response = client.get("/parts", params={"search": "part", "after": cursor})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_autocomplete_parts_returns_id_and_name_of_best_matches(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = client.get("/parts/autocomplete", params={"q": "Part A"})
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response_json[0] == {
+        "id": str(mock_parts["part_a"].id),
+        "name": mock_parts["part_a"].name,
+    }
+
+
+def test_autocomplete_parts_tolerates_typos_and_limits_results(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = client.get("/parts/autocomplete", params={"q": "partt", "limit": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+
+
+def test_autocomplete_parts_without_query_returns_400(client: TestClient):
+    response = client.get("/parts/autocomplete")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_parts_with_fields_returns_only_those_fields(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = client.get("/parts", params={"fields": "id,name"})
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response_json["total"] == len(mock_parts)
+    assert [set(part) for part in response_json["data"]] == [{"id", "name"}] * 2
+
+
+def test_get_parts_with_filters_and_sorting(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = client.get(
+        "/parts", params={"filter[description__contains]": "part", "sort": "name:desc"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [part["name"] for part in response.json()["data"]] == ["Part B", "Part A"]
+
+
+def test_get_parts_with_unknown_field_returns_400(client: TestClient):
+    response = client.get("/parts", params={"fields": "name,secret"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_part_by_id_with_fields_returns_only_those_fields(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    part = mock_parts["part_a"]
+
+    response = client.get(f"/parts/{part.id}", params={"fields": "name"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"name": part.name}
+
+
+def test_export_parts_streams_ndjson(
+    export_client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = export_client.get("/parts/export")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["name"] for row in rows} == {"Part A", "Part B"}
+
+
+def test_export_parts_as_gzip_compressed_csv_with_fields(
+    export_client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = export_client.get(
+        "/parts/export", params={"format": "csv", "gzip": True, "fields": "id,name"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "parts.csv.gz" in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.content).decode())))
+    # in the order of the schema fields
+    assert rows[0] == ["name", "id"]
+    assert sorted(row[0] for row in rows[1:]) == ["Part A", "Part B"]
+
+
+def test_export_parts_with_filters_and_sorting(
+    export_client: TestClient, mock_parts: dict[str, PartModel]
+):
+    response = export_client.get(
+        "/parts/export",
+        params={"filter[name__prefix]": "Part", "sort": "name:desc"},
+    )
+    filtered = export_client.get("/parts/export", params={"filter[name]": "Part B"})
+
+    assert response.status_code == status.HTTP_200_OK
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Part B", "Part A"]
+    (row,) = [json.loads(line) for line in filtered.text.splitlines()]
+    assert row["id"] == str(mock_parts["part_b"].id)
+
+
+def test_export_history_of_an_entity(
+    export_client: TestClient, mock_parts: dict[str, PartModel]
+):
+    part = mock_parts["part_a"]
+
+    response = export_client.get("/history/export", params={"entity_id": str(part.id)})
+
+    assert response.status_code == status.HTTP_200_OK
+    (row,) = [json.loads(line) for line in response.text.splitlines()]
+    assert row["action"] == "CREATE"
+    assert row["changes"]["name"] == {"old": None, "new": "Part A"}
+
+
+def test_bulk_create_parts_reports_duplicates_and_creates_the_others(
+    client: TestClient,
+    db_session: Session,
+    current_user: UserModel,
+    mock_parts: dict[str, PartModel],
+    mock_crud_no_commit,
+):
+    data = [
+        {"name": "Bulk A", "description": "First"},
+        {"name": "Part A"},  # an existing part
+        {"name": "Bulk B"},
+        {"name": "Bulk A"},  # a duplicate in the request
+    ]
+
+    response = client.post("/parts/bulk", json=data)
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [part["name"] for part in response_json["created"]] == ["Bulk A", "Bulk B"]
+    assert [error["index"] for error in response_json["errors"]] == [1, 3]
+    compare_uuids({"id": response_json["created"][0]["created_by"]}, current_user, "id")
+
+    created_ids = {UUID(part["id"]) for part in response_json["created"]}
+    history = (
+        db_session.query(HistoryModel)
+        .filter(HistoryModel.entity_id.in_(created_ids))
+        .all()
+    )
+    assert {record.entity_id for record in history} == created_ids
+    assert {record.action for record in history} == {HistoryAction.CREATE}
+
+
+def test_bulk_create_parts_with_too_many_items_returns_400(client: TestClient):
+    response = client.post(
+        "/parts/bulk",
+        json=[{"name": f"Part {index}"} for index in range(env.bulk_max_items + 1)],
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_upsert_part_updates_the_part_with_the_same_name(
+    client: TestClient, mock_parts: dict[str, PartModel], mock_crud_no_commit
+):
+    part = mock_parts["part_a"]
+
+    response = client.put("/parts", json={"name": part.name, "description": "Upserted"})
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response_json["id"] == str(part.id)
+    assert response_json["description"] == "Upserted"
+
+
+def test_bulk_upsert_parts_returns_the_parts_in_request_order(
+    client: TestClient, mock_parts: dict[str, PartModel], mock_crud_no_commit
+):
+    data = [{"name": "Upserted"}, {"name": "Part B", "description": "Described"}]
+
+    response = client.put("/parts/bulk", json=data)
+    response_json = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [part["name"] for part in response_json] == ["Upserted", "Part B"]
+    assert response_json[1]["id"] == str(mock_parts["part_b"].id)
+    assert response_json[1]["description"] == "Described"
+
+
+def test_bulk_upsert_parts_with_the_same_name_twice_returns_400(
+    client: TestClient, mock_crud_no_commit
+):
+    response = client.put("/parts/bulk", json=[{"name": "Twice"}, {"name": "Twice"}])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_bulk_update_parts_by_ids(
+    client: TestClient, mock_parts: dict[str, PartModel], mock_crud_no_commit
+):
+    ids = [str(part.id) for part in mock_parts.values()]
+
+    response = client.patch(
+        "/parts/bulk", json={"ids": ids, "changes": {"description": "Bulk"}}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"count": len(ids)}
+    response = client.get("/parts", params={"fields": "description"})
+    assert [part["description"] for part in response.json()["data"]] == [
+        "Bulk",
+        "Bulk",
+    ]
+
+
+def test_bulk_delete_parts_by_filters(
+    client: TestClient, mock_parts: dict[str, PartModel], mock_crud_no_commit
+):
+    part = mock_parts["part_a"]
+
+    response = client.post("/parts/bulk/delete", json={"filters": {"name": "Part A"}})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"count": 1}
+    response = client.get(f"/parts/{part.id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_bulk_delete_parts_without_ids_or_filters_returns_400(
+    client: TestClient, mock_crud_no_commit
+):
+    response = client.post("/parts/bulk/delete", json={})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_bulk_update_parts_name_to_null_returns_400(
+    client: TestClient, mock_parts: dict[str, PartModel], mock_crud_no_commit
+):
+    response = client.patch(
+        "/parts/bulk",
+        json={"ids": [str(mock_parts["part_a"].id)], "changes": {"name": None}},
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_update_part_with_existing_name_returns_400(
+    client: TestClient, mock_parts: dict[str, PartModel], mock_crud_no_commit
+):
+    response = client.put(
+        f"/parts/{mock_parts['part_a'].id}", json={"name": mock_parts["part_b"].name}
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_metrics_report_the_routes_and_crud_methods(
+    client: TestClient, mock_parts: dict[str, PartModel]
+):
+    client.get("/parts")
+    client.get("/no-such-route")
+
+    metrics = client.get("/metrics").text
+
+    assert 'route="/parts",status="200"' in metrics
+    assert 'route="unmatched",status="404"' in metrics
+    assert 'crud="PartCRUD",method="get_paginated_list"' in metrics
+    assert "db_pool_connections_in_use" in metrics
@@ -2,6 +2,12 @@
 import uuid
 from unittest.mock import patch
 
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.history_model import HistoryModel
+from app.schemas.history_schemas import HistoryAction
+
 
 def compare_uuids(response_data, model_data, key):
     """Safely converts response string UUIDs to UUID objects for comparison."""
@@ -29,3 +35,18 @@ def create_safe_patch(crud_class, method_name):
 
     # Return the unstarted patch object
     return patch(path, new=mock_safe)
+
+
+def get_history(
+    db_session: Session,
+    *,
+    entity_id: uuid.UUID | None = None,
+    action: HistoryAction | None = None,
+) -> list[HistoryModel]:
+    """Returns the history records of an entity and/or an action, oldest first."""
+    query = select(HistoryModel).order_by(HistoryModel.created_at, HistoryModel.action)
+    if entity_id is not None:
+        query = query.where(HistoryModel.entity_id == entity_id)
+    if action is not None:
+        query = query.where(HistoryModel.action == action)
+    return list(db_session.scalars(query))